@@ -0,0 +1,140 @@
+"""
+Batched package-manager runs: all choco packages in one `choco install`, all
+winget packages in one `winget import`, with per-package results recovered
+from the combined output.
+"""
+
+import json
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from PackageCommands import WINGET, CHOCO
+
+WINGET_SOURCE_DETAILS = {
+    "Argument": "https://cdn.winget.microsoft.com/cache",
+    "Identifier": "Microsoft.Winget.Source_8wekyb3d8bbwe",
+    "Name": "winget",
+    "Type": "Microsoft.PreIndexed.Package"
+}
+
+CHOCO_PACKAGE_PATTERN = re.compile(r'^(\S+) v\d[\w.\-]*(?: \[.*\])?$')
+CHOCO_SUCCESS_PATTERN = re.compile(r'The install of (\S+) was successful\.')
+CHOCO_ALREADY_PATTERN = re.compile(r'^(\S+) v\d[\w.\-]* already installed\.')
+CHOCO_FAILURE_PATTERN = re.compile(r'^\s*-\s+(\S+?)(?: \(exited (-?\d+)\))? - (.*)$')
+
+WINGET_FOUND_PATTERN = re.compile(r'^Found .* \[(\S+)\]')
+WINGET_ALREADY_PATTERN = re.compile(r'Package is already installed: (\S+)')
+WINGET_FAILURE_PATTERN = re.compile(r'(Installer failed with exit code: -?\d+|.*failed.*)', re.IGNORECASE)
+
+# (succeeded, message) per requested package id
+BatchResults = Dict[str, Tuple[bool, str]]
+
+
+def choco_batch_command(package_ids: List[str]) -> List[str]:
+    return [CHOCO, 'install'] + package_ids + ['-y']
+
+
+def winget_import_command(manifest_path: str) -> List[str]:
+    return [WINGET, 'import', '--import-file', manifest_path, '--ignore-versions',
+            '--accept-package-agreements', '--accept-source-agreements']
+
+
+def write_winget_import_manifest(package_ids: List[str], path: str) -> None:
+    """
+    Write a `winget export`-style manifest that `winget import` accepts.
+    """
+    manifest = {
+        "$schema": "https://aka.ms/winget-packages.schema.2.0.json",
+        "CreationDate": datetime.now(timezone.utc).isoformat(),
+        "Sources": [{
+            "Packages": [{"PackageIdentifier": package_id} for package_id in package_ids],
+            "SourceDetails": WINGET_SOURCE_DETAILS
+        }],
+        "WinGetVersion": "1.6"
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+class BatchOutputParser(ABC):
+    """
+    Incremental parser for a batched run's output.
+
+    feed() takes one line at a time; current is the package the output is
+    about right now, and results collects the outcome of every requested
+    package seen so far.
+    """
+
+    def __init__(self, package_ids: List[str]):
+        # Package managers are case-insensitive about ids; report with ours
+        self._requested = {package_id.lower(): package_id for package_id in package_ids}
+        self.current: Optional[str] = None
+        self.results: BatchResults = {}
+
+    def _requested_id(self, package_id: str) -> Optional[str]:
+        return self._requested.get(package_id.lower())
+
+    def _set_result(self, package_id: str, succeeded: bool, message: str) -> None:
+        requested = self._requested_id(package_id)
+        if requested is not None:
+            self.results[requested] = (succeeded, message)
+
+    @abstractmethod
+    def feed(self, line: str) -> None:
+        ...
+
+    def finish(self, returncode: int) -> BatchResults:
+        """
+        Fill in packages the output never reported on.
+        """
+        for package_id in self._requested.values():
+            if package_id not in self.results:
+                self.results[package_id] = (False, f"no result in batch output (exit code {returncode})")
+        return self.results
+
+
+class ChocoBatchParser(BatchOutputParser):
+
+    def feed(self, line: str) -> None:
+        line = line.rstrip()
+        match = CHOCO_PACKAGE_PATTERN.match(line)
+        if match and self._requested_id(match.group(1)):
+            self.current = self._requested_id(match.group(1))
+            return
+        match = CHOCO_SUCCESS_PATTERN.search(line)
+        if match:
+            self._set_result(match.group(1), True, "installed")
+            return
+        match = CHOCO_ALREADY_PATTERN.match(line)
+        if match:
+            self._set_result(match.group(1), True, "already installed")
+            return
+        match = CHOCO_FAILURE_PATTERN.match(line)
+        if match and self._requested_id(match.group(1)):
+            package_id = self._requested_id(match.group(1))
+            # The Warnings section lists "already installed" with the same layout
+            if 'already installed' in match.group(3):
+                self._set_result(package_id, True, "already installed")
+            elif self.results.get(package_id, (False,))[0] is not True:
+                self._set_result(package_id, False, match.group(3))
+
+
+class WingetImportParser(BatchOutputParser):
+
+    def feed(self, line: str) -> None:
+        line = line.strip()
+        match = WINGET_FOUND_PATTERN.match(line)
+        if match:
+            self.current = self._requested_id(match.group(1))
+            return
+        match = WINGET_ALREADY_PATTERN.search(line)
+        if match:
+            self._set_result(match.group(1), True, "already installed")
+            return
+        if self.current is None or self.current in self.results:
+            return
+        if line == 'Successfully installed':
+            self._set_result(self.current, True, "installed")
+        elif WINGET_FAILURE_PATTERN.match(line):
+            self._set_result(self.current, False, line)
@@ -0,0 +1,271 @@
+import json
+import os
+import sqlite3
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from CatalogSnapshot import load_snapshot, save_snapshot
+from CatalogStore import CatalogStore, FTS_COLUMNS, FTS_WEIGHTS, TOKEN_PATTERN, UNCATEGORIZED
+import Tracing
+
+# Placeholder the catalog uses when a package manager does not ship a program
+MISSING_ID = "na"
+
+
+def parse_applications_json(catalog_path: str) -> Dict[str, Dict]:
+    try:
+        # Try UTF-8 encoding first
+        with open(catalog_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except UnicodeDecodeError:
+        # If UTF-8 fails, try with 'cp1252' encoding
+        try:
+            with open(catalog_path, 'r', encoding='cp1252') as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON: {e}")
+            return {}
+    except FileNotFoundError:
+        print("applications.json not found. Please ensure the file exists.")
+        return {}
+
+
+def build_indexes(applications_data: Dict[str, Dict]) -> Dict[str, Dict[str, str]]:
+    """
+    Build the name, winget and choco lookup indexes, all mapping to the
+    catalog key in applications_data.
+    """
+    name_index: Dict[str, str] = {}
+    winget_index: Dict[str, str] = {}
+    choco_index: Dict[str, str] = {}
+    for program_id, program_data in applications_data.items():
+        # The catalog also carries a few non-program entries (e.g. "Transform")
+        if not isinstance(program_data, dict):
+            continue
+        if 'content' in program_data:
+            name_index.setdefault(program_data['content'], program_id)
+        winget_id = program_data.get('winget')
+        if winget_id and winget_id != MISSING_ID:
+            winget_index.setdefault(winget_id.lower(), program_id)
+        choco_id = program_data.get('choco')
+        if choco_id and choco_id != MISSING_ID:
+            choco_index.setdefault(choco_id.lower(), program_id)
+    return {'name': name_index, 'winget': winget_index, 'choco': choco_index}
+
+
+class Catalog:
+    """
+    The program catalog, loaded once and never changed afterwards, so one
+    instance can be shared by every window and thread.
+
+    With the "json" backend the catalog is held in memory (from the compiled
+    snapshot when it is valid); with "sqlite" lookups and searches are
+    answered by CatalogStore.
+    """
+
+    def __init__(self, catalog_path: str = './applications.json', backend: Optional[str] = None):
+        self.catalog_path = catalog_path
+        self.backend = backend or os.environ.get('REPLICATOR_CATALOG_BACKEND', 'json')
+        self.store: Optional[CatalogStore] = None
+        applications_data: Dict[str, Dict] = {}
+        indexes: Dict[str, Dict[str, str]] = {'name': {}, 'winget': {}, 'choco': {}}
+
+        with Tracing.span("load catalog", "catalog", backend=self.backend) as span:
+            if self.backend == 'sqlite':
+                try:
+                    self.store = CatalogStore(catalog_path)
+                except sqlite3.Error as e:
+                    print(f"SQLite catalog unavailable, falling back to JSON: {e}")
+                    self.store = None
+
+            if not self.store:
+                snapshot = load_snapshot(catalog_path)
+                span.set(snapshot=snapshot is not None)
+                if snapshot is not None:
+                    applications_data, indexes = snapshot['applications_data'], snapshot['indexes']
+                else:
+                    with Tracing.span("parse catalog", "catalog"):
+                        applications_data = parse_applications_json(catalog_path)
+                        indexes = build_indexes(applications_data)
+                    if applications_data:
+                        with Tracing.span("save catalog snapshot", "catalog"):
+                            save_snapshot(catalog_path, applications_data, indexes)
+
+        self.applications_data: Mapping[str, Dict] = MappingProxyType(applications_data)
+        self.indexes = indexes
+        self.name_index = indexes['name']
+        self.winget_index = indexes['winget']
+        self.choco_index = indexes['choco']
+
+        # The JSON backend keeps every program's id in catalog order, its
+        # display name and the ids in each category; SQLite answers these
+        # from the store, so its memory stays flat as the catalog grows
+        self._ids: Optional[Tuple[str, ...]] = None
+        self._names: Optional[Tuple[str, ...]] = None
+        self._names_by_id: Optional[Dict[str, str]] = None
+        self._categories: Optional[Dict[str, Tuple[str, ...]]] = None
+        # JSON backend: each program's name and the lowercase words of its
+        # searchable fields, built on the first search
+        self._search_words: Optional[List[Tuple[str, Tuple[str, ...]]]] = None
+        if not self.store:
+            self._load_entries((program_id, program_data['content'], program_data.get('category'))
+                               for program_id, program_data in applications_data.items()
+                               if isinstance(program_data, dict) and 'content' in program_data)
+
+    def _load_entries(self, entries: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        ids: List[str] = []
+        names: List[str] = []
+        categories: Dict[str, List[str]] = {}
+        for program_id, name, category in entries:
+            ids.append(program_id)
+            names.append(name)
+            categories.setdefault(category or UNCATEGORIZED, []).append(program_id)
+        self._ids, self._names = tuple(ids), tuple(names)
+        self._names_by_id = dict(zip(self._ids, self._names))
+        self._categories = {category: tuple(ids) for category, ids in categories.items()}
+
+    def _loaded(self) -> 'Catalog':
+        # With SQLite the full lists are only built for callers that ask for them
+        if self._ids is None:
+            self._load_entries(self.store.iter_entries())
+        return self
+
+    @property
+    def ids(self) -> Tuple[str, ...]:
+        return self._loaded()._ids
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return self._loaded()._names
+
+    @property
+    def names_by_id(self) -> Dict[str, str]:
+        return self._loaded()._names_by_id
+
+    @property
+    def categories(self) -> Dict[str, Tuple[str, ...]]:
+        return self._loaded()._categories
+
+    def iter_programs(self) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (id, display name) for every program in catalog order.
+        """
+        if self._ids is None:
+            return self.store.iter_programs()
+        return zip(self._ids, self._names)
+
+    def name_of(self, program_id: str) -> Optional[str]:
+        """
+        The display name of a catalog key, or None if it is unknown.
+        """
+        if self._names_by_id is None:
+            return self.store.name_of(program_id)
+        return self._names_by_id.get(program_id)
+
+    def category_names(self) -> List[str]:
+        if self._categories is None:
+            return self.store.categories()
+        return sorted(self._categories)
+
+    def category_ids(self, category: str) -> Tuple[str, ...]:
+        """
+        Ids of the programs in a category, in catalog order.
+        """
+        if self._categories is None:
+            return self.store.category_ids(category)
+        return self._categories.get(category, ())
+
+    def resolve_program_id(self, program: str) -> Optional[str]:
+        """
+        Resolve a display name, catalog key, winget id or choco id to a catalog key.
+        """
+        if self.store:
+            return self.store.resolve_program_id(program)
+        if program in self._names_by_id:
+            return program
+        if program in self.name_index:
+            return self.name_index[program]
+        key = program.lower()
+        return self.winget_index.get(key) or self.choco_index.get(key)
+
+    def find_package(self, source: str, package_id: str) -> Optional[str]:
+        """
+        Find the catalog key of the program a package manager ships as
+        package_id ("winget" or "choco"), ignoring case.
+        """
+        if source not in ('winget', 'choco'):
+            return None
+        if self.store:
+            return self.store.find_package(source, package_id)
+        return self.indexes[source].get(package_id.lower())
+
+    def get_program_data(self, program: str) -> Dict:
+        """
+        Get the catalog entry for a program, or an empty dict if it is unknown.
+        """
+        program_id = self.resolve_program_id(program)
+        if program_id is None:
+            return {}
+        if self.store:
+            return self.store.get(program_id)
+        return self.applications_data[program_id]
+
+    def _words(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        if self._search_words is None:
+            # " word word ...": a word starting with token contains " token"
+            self._search_words = [
+                (program_data['content'], tuple(
+                    ' ' + ' '.join(TOKEN_PATTERN.findall(
+                        value.lower() if isinstance(value, str) and value != MISSING_ID else ""
+                    ))
+                    for value in (program_data.get(column) for column in FTS_COLUMNS)
+                ))
+                for program_data in self.applications_data.values()
+                if isinstance(program_data, dict) and 'content' in program_data
+            ]
+        return self._search_words
+
+    def search(self, text: str) -> List[str]:
+        """
+        Search the catalog by name, description, category and package ids.
+
+        Every word in the query must be the start of a word in one of those
+        fields. SQLite ranks with bm25; the JSON backend ranks by the summed
+        weights of the fields each word was found in (the same FTS_WEIGHTS),
+        then by catalog order.
+
+        Returns:
+            list: Matching display names, best matches first
+        """
+        if self.store:
+            return self.store.search(text)
+        tokens = [' ' + token for token in TOKEN_PATTERN.findall(text.lower())]
+        if not tokens:
+            return list(self.names)
+        ranked = []
+        for order, (name, columns) in enumerate(self._words()):
+            score = 0.0
+            for token in tokens:
+                weights = [weight for weight, field in zip(FTS_WEIGHTS, columns) if token in field]
+                if not weights:
+                    break
+                score += sum(weights)
+            else:
+                ranked.append((-score, order, name))
+        return [name for _, _, name in sorted(ranked)]
+
+
+_shared: Dict[Tuple[str, Optional[str]], Catalog] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_catalog(catalog_path: str = './applications.json', backend: Optional[str] = None) -> Catalog:
+    """
+    The process-wide Catalog for a catalog file, loaded on first use. Safe
+    to call from a background thread to load it ahead of time.
+    """
+    key = (os.path.abspath(catalog_path), backend)
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = Catalog(catalog_path, backend)
+        return _shared[key]
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional
+
+# Bump when the snapshot layout or the derived indexes change
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(catalog_path: str) -> str:
+    """
+    Path of the compiled snapshot stored next to the catalog JSON.
+    """
+    return os.path.splitext(catalog_path)[0] + '.snapshot'
+
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_snapshot(catalog_path: str) -> Optional[Dict]:
+    """
+    Load the snapshot for a catalog if it is still valid.
+
+    The snapshot is trusted when the catalog's size and mtime match. If only
+    the mtime moved (e.g. a fresh checkout) the content hash decides, and the
+    stored stat is refreshed so the next start skips hashing again.
+
+    Returns:
+        dict: The snapshot, or None if it is missing or stale
+    """
+    try:
+        stat = os.stat(catalog_path)
+        with open(snapshot_path(catalog_path), 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    if snapshot['size'] != stat.st_size:
+        return None
+    if snapshot['mtime_ns'] != stat.st_mtime_ns:
+        if snapshot['sha256'] != file_hash(catalog_path):
+            return None
+        snapshot['mtime_ns'] = stat.st_mtime_ns
+        _write(catalog_path, snapshot)
+    return snapshot
+
+
+def save_snapshot(catalog_path: str, applications_data: Dict, indexes: Dict) -> None:
+    """
+    Compile the parsed catalog and its indexes into a snapshot next to the JSON.
+    """
+    try:
+        stat = os.stat(catalog_path)
+        sha256 = file_hash(catalog_path)
+    except OSError:
+        return
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'applications_data': applications_data,
+        'indexes': indexes,
+    }
+    _write(catalog_path, snapshot)
+
+
+def _write(catalog_path: str, snapshot: Dict) -> None:
+    path = snapshot_path(catalog_path)
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Replace atomically so a crash never leaves a half-written snapshot
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write catalog snapshot: {e}")
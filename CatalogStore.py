@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import sqlite3
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from CatalogSnapshot import file_hash
+
+# Columns indexed for full-text search, with their bm25 weights
+FTS_COLUMNS = ('content', 'description', 'category', 'winget', 'choco')
+FTS_WEIGHTS = (10.0, 1.0, 2.0, 5.0, 5.0)
+
+PROGRAM_COLUMNS = ('id', 'content', 'description', 'category', 'winget', 'choco', 'link', 'logo')
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Category of programs the catalog gives none
+UNCATEGORIZED = "Uncategorized"
+
+
+class CatalogStore:
+    """
+    SQLite-backed catalog with an FTS5 index for ranked program search.
+
+    The database lives next to applications.json and is re-imported whenever
+    the JSON's size, mtime or content hash changes. Lookups and searches are
+    answered by SQLite, so nothing but the open connection stays in memory.
+    """
+
+    def __init__(self, catalog_path: str = './applications.json', db_path: Optional[str] = None):
+        self.catalog_path = catalog_path
+        self.db_path = db_path or os.path.splitext(catalog_path)[0] + '.db'
+        # Read-only after import, so it may be opened on a loader thread and
+        # queried from the GUI thread
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._create_schema()
+        if self._is_stale():
+            self.import_json()
+
+    def _create_schema(self) -> None:
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS programs ("
+                "id TEXT PRIMARY KEY, content TEXT, description TEXT, category TEXT, "
+                "winget TEXT, choco TEXT, link TEXT, logo TEXT)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS programs_content ON programs(content)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS programs_winget ON programs(winget COLLATE NOCASE)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS programs_choco ON programs(choco COLLATE NOCASE)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS programs_category ON programs(category)")
+            # External-content FTS table, so the text is not stored twice
+            self.connection.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS programs_fts USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, content='programs', content_rowid='rowid')"
+            )
+
+    def _source_key(self) -> Dict[str, str]:
+        stat = os.stat(self.catalog_path)
+        return {'size': str(stat.st_size), 'mtime_ns': str(stat.st_mtime_ns)}
+
+    def _get_meta(self) -> Dict[str, str]:
+        return dict(self.connection.execute("SELECT key, value FROM meta").fetchall())
+
+    def _set_meta(self, meta: Dict[str, str]) -> None:
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items()
+        )
+
+    def _is_stale(self) -> bool:
+        try:
+            source = self._source_key()
+        except OSError:
+            return False
+        meta = self._get_meta()
+        if meta.get('size') != source['size']:
+            return True
+        if meta.get('mtime_ns') != source['mtime_ns']:
+            if meta.get('sha256') != file_hash(self.catalog_path):
+                return True
+            with self.connection:
+                self._set_meta(source)
+        return False
+
+    def _read_json(self) -> Dict:
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except UnicodeDecodeError:
+            with open(self.catalog_path, 'r', encoding='cp1252') as f:
+                return json.load(f)
+
+    def import_json(self) -> None:
+        """
+        Re-import applications.json into the programs table and rebuild the FTS index.
+        """
+        try:
+            applications_data = self._read_json()
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error importing catalog into SQLite: {e}")
+            return
+
+        rows = (
+            (program_id,) + tuple(program_data.get(column) for column in PROGRAM_COLUMNS[1:])
+            for program_id, program_data in applications_data.items()
+            if isinstance(program_data, dict) and 'content' in program_data
+        )
+        with self.connection:
+            self.connection.execute("DELETE FROM programs")
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO programs ({', '.join(PROGRAM_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(PROGRAM_COLUMNS))})",
+                rows
+            )
+            self.connection.execute("INSERT INTO programs_fts(programs_fts) VALUES ('rebuild')")
+            meta = self._source_key()
+            meta['sha256'] = file_hash(self.catalog_path)
+            self._set_meta(meta)
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM programs").fetchone()[0]
+
+    def iter_names(self) -> Iterator[str]:
+        """
+        Yield every program's display name in catalog order.
+        """
+        for row in self.connection.execute("SELECT content FROM programs ORDER BY rowid"):
+            yield row[0]
+
+    def iter_entries(self) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Yield (id, display name, category) for every program in catalog order.
+        """
+        yield from self.connection.execute("SELECT id, content, category FROM programs ORDER BY rowid")
+
+    def iter_programs(self) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (id, display name) for every program in catalog order.
+        """
+        yield from self.connection.execute("SELECT id, content FROM programs ORDER BY rowid")
+
+    def name_of(self, program_id: str) -> Optional[str]:
+        row = self.connection.execute("SELECT content FROM programs WHERE id = ?", (program_id,)).fetchone()
+        return row[0] if row else None
+
+    def categories(self) -> List[str]:
+        """
+        Every category, with programs that have none under "Uncategorized".
+        """
+        rows = self.connection.execute("SELECT DISTINCT category FROM programs")
+        return sorted({row[0] or UNCATEGORIZED for row in rows})
+
+    def category_ids(self, category: str) -> Tuple[str, ...]:
+        """
+        Ids of the programs in a category, in catalog order.
+        """
+        if category == UNCATEGORIZED:
+            rows = self.connection.execute(
+                "SELECT id FROM programs WHERE category IS NULL OR category IN ('', ?) ORDER BY rowid",
+                (category,)
+            )
+        else:
+            rows = self.connection.execute("SELECT id FROM programs WHERE category = ? ORDER BY rowid", (category,))
+        return tuple(row[0] for row in rows)
+
+    def get(self, program_id: str) -> Dict:
+        row = self.connection.execute(
+            "SELECT * FROM programs WHERE id = ?", (program_id,)
+        ).fetchone()
+        return self._row_to_dict(row)
+
+    def resolve_program_id(self, program: str) -> Optional[str]:
+        """
+        Resolve a display name, catalog key, winget id or choco id to a catalog key.
+
+        A catalog key wins over a display name, and both over package ids,
+        as with the JSON backend.
+        """
+        row = self.connection.execute(
+            "SELECT id FROM programs WHERE content = ? OR id = ? "
+            "OR winget = ? COLLATE NOCASE OR choco = ? COLLATE NOCASE "
+            "ORDER BY id = ? DESC, content = ? DESC, rowid LIMIT 1",
+            (program, program, program, program, program, program)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_package(self, source: str, package_id: str) -> Optional[str]:
+        """
+        The catalog key of the program source ships as package_id, looked up
+        through that column's case-insensitive index.
+        """
+        if source not in ('winget', 'choco'):
+            return None
+        row = self.connection.execute(
+            f"SELECT id FROM programs WHERE {source} = ? COLLATE NOCASE LIMIT 1", (package_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def search(self, text: str, limit: int = -1) -> List[str]:
+        """
+        Full-text search over the catalog, best matches first.
+
+        Every word in the query is matched as a prefix, so "fire" finds
+        "Firefox" and "zip" finds "7-Zip".
+
+        Returns:
+            list: Display names of the matching programs
+        """
+        tokens = TOKEN_PATTERN.findall(text)
+        if not tokens:
+            return list(islice(self.iter_names(), None if limit < 0 else limit))
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        rows = self.connection.execute(
+            f"SELECT programs.content FROM programs_fts "
+            f"JOIN programs ON programs.rowid = programs_fts.rowid "
+            f"WHERE programs_fts MATCH ? ORDER BY bm25(programs_fts, {weights}) LIMIT ?",
+            (query, limit)
+        )
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def _row_to_dict(row: Optional[sqlite3.Row]) -> Dict:
+        if row is None:
+            return {}
+        # Match the JSON shape: absent fields are left out rather than None
+        return {key: row[key] for key in row.keys() if key != 'id' and row[key] is not None}
@@ -0,0 +1,83 @@
+"""
+Install options shared by the GUI (main.py) and the command line
+(replicator.py): their command-line arguments and the InstallEngine keyword
+arguments built from them.
+
+Kept apart from replicator.py so the GUI can parse its options without
+loading the command line's own imports at start-up.
+"""
+
+import argparse
+from typing import Dict
+from InstallerCache import InstallerCache, DEFAULT_MAX_BYTES
+from InstalledState import InstalledState, DEFAULT_TTL
+from InstallJournal import InstallJournal
+from ProgressAggregator import DEFAULT_RATE_HZ
+from RunLog import RunLog
+
+DEFAULT_DOWNLOAD_CONCURRENCY = 4
+
+# Seconds a single package-manager command may run before it is killed
+DEFAULT_PACKAGE_TIMEOUT = 600
+
+
+def add_engine_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Options shared by the GUI and the command line.
+    """
+    parser.add_argument('--cache-dir', help="directory for cached installers")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help="installer cache size limit in MiB")
+    parser.add_argument('--cache-only', action='store_true',
+                        help="offline mode: install only from the installer cache")
+    parser.add_argument('--download-concurrency', type=int, default=DEFAULT_DOWNLOAD_CONCURRENCY,
+                        help="number of packages downloaded at the same time")
+    parser.add_argument('--package-timeout', type=float, default=DEFAULT_PACKAGE_TIMEOUT,
+                        help="seconds a single download or install may take")
+    parser.add_argument('--timeout', type=float,
+                        help="seconds the whole installation may take")
+    parser.add_argument('--batch', action='store_true',
+                        help="install with one choco and one winget run instead of one per package")
+    parser.add_argument('--reinstall', action='store_true',
+                        help="install selected programs even if they are already installed")
+    parser.add_argument('--installed-ttl', type=float, default=DEFAULT_TTL,
+                        help="seconds to trust the list of installed programs")
+    parser.add_argument('--journal', help="file recording install progress, for resuming")
+    parser.add_argument('--no-journal', action='store_true',
+                        help="do not record install progress")
+    parser.add_argument('--progress-hz', type=float, default=DEFAULT_RATE_HZ,
+                        help="maximum progress updates shown per second")
+    parser.add_argument('--shell-workers', type=int, default=0,
+                        help="run package-manager commands in this many long-lived shells "
+                             "instead of a process each (at least download concurrency + 1)")
+    parser.add_argument('--run-log', help="file the per-package results of every run are appended to")
+    parser.add_argument('--no-run-log', action='store_true',
+                        help="do not record per-package results")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="write a timeline of the run to PATH (Chrome/Perfetto trace JSON)")
+
+
+def _shell_pool(workers: int):
+    # Only imported when asked for, so the GUI does not load it at start-up
+    from ShellPool import ShellPool
+    return ShellPool(workers)
+
+
+def build_engine_options(args: argparse.Namespace) -> Dict:
+    """
+    Keyword arguments for InstallEngine from the parsed shared options.
+    """
+    # Never fewer sessions than concurrent downloads plus the installer
+    workers = max(args.shell_workers, args.download_concurrency + 1) if args.shell_workers else 0
+    return {
+        'installer_cache': InstallerCache(args.cache_dir, args.cache_size * 1024 ** 2, args.cache_only),
+        'download_concurrency': args.download_concurrency,
+        'package_timeout': args.package_timeout,
+        'timeout': args.timeout,
+        'batch': args.batch,
+        'installed_state': None if args.reinstall else InstalledState(args.installed_ttl),
+        'progress_rate_hz': args.progress_hz,
+        'journal': None if args.no_journal else InstallJournal(args.journal),
+        'shell_pool': _shell_pool(workers) if workers else None,
+        'run_log': None if args.no_run_log else RunLog(args.run_log),
+    }
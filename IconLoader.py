@@ -0,0 +1,112 @@
+from typing import Dict, Iterable, Optional
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+from LogoAtlas import LogoAtlas, THUMBNAIL_SIZES
+import Tracing
+
+# Most threads the icon pool runs; decoding is short and the GUI needs the cores too
+MAX_ICON_THREADS = 4
+
+
+class IconLoadSignals(QObject):
+    """
+    Signals for IconLoadTask; QRunnable itself cannot emit.
+    """
+    loaded = pyqtSignal(str, QImage)
+
+
+class IconLoadTask(QRunnable):
+    """
+    Decode one logo into a QImage on a pool thread.
+    """
+
+    def __init__(self, key: str, icon_path: str, logo_atlas: Optional[LogoAtlas], size: int):
+        super().__init__()
+        # Python keeps the reference until the result is delivered
+        self.setAutoDelete(False)
+        self.key = key
+        self.icon_path = icon_path
+        self.logo_atlas = logo_atlas
+        self.size = size
+        self.signals = IconLoadSignals()
+
+    def run(self) -> None:
+        with Tracing.span("load icon", "icons", key=self.key) as span:
+            image = self.logo_atlas.image(self.icon_path, self.size) if self.logo_atlas else None
+            span.set(atlas=image is not None)
+            if image is None:
+                image = QImage(self.icon_path)
+                if not image.isNull():
+                    image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        # A null image tells the receiver the logo could not be loaded
+        self.signals.loaded.emit(self.key, image)
+
+
+class IconLoader(QObject):
+    """
+    Loads icons on a QThreadPool of its own and caches them on the GUI thread.
+
+    Not on the global pool: smooth QImage scaling splits its work across the
+    global pool and waits for it, so icon tasks filling that pool would wait
+    on work queued behind themselves.
+
+    The most recent request runs first, which is the row the view just asked
+    to paint. Requests for rows that scrolled away can be dropped with retain()
+    before a worker picks them up. Until an icon arrives callers get a blank
+    placeholder of the same size, so rows keep their layout.
+    """
+    icon_loaded = pyqtSignal(str)
+
+    def __init__(self, logo_atlas: Optional[LogoAtlas] = None, size: int = THUMBNAIL_SIZES[0], parent=None):
+        super().__init__(parent)
+        self.logo_atlas = logo_atlas
+        self.size = size
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, min(MAX_ICON_THREADS, QThread.idealThreadCount() - 1)))
+        self._icons: Dict[str, Optional[QIcon]] = {}
+        self._pending: Dict[str, IconLoadTask] = {}
+        self._priority = 0
+        placeholder = QPixmap(size, size)
+        placeholder.fill(Qt.transparent)
+        self.placeholder = QIcon(placeholder)
+
+    def has_icon(self, key: str) -> bool:
+        return key in self._icons
+
+    def get_icon(self, key: str) -> Optional[QIcon]:
+        """
+        Get a loaded icon; None if it is not loaded or the logo was unreadable.
+        """
+        return self._icons.get(key)
+
+    def request(self, key: str, icon_path: str) -> None:
+        if key in self._pending or key in self._icons:
+            return
+        task = IconLoadTask(key, icon_path, self.logo_atlas, self.size)
+        task.signals.loaded.connect(self._on_loaded)
+        self._pending[key] = task
+        self._priority += 1
+        self.pool.start(task, self._priority)
+
+    def cancel(self, key: str) -> None:
+        task = self._pending.get(key)
+        # tryTake only succeeds for tasks no worker has started yet
+        if task is not None and self.pool.tryTake(task):
+            del self._pending[key]
+
+    def retain(self, keys: Iterable[str]) -> None:
+        """
+        Cancel every pending request whose key is not in keys.
+        """
+        keep = set(keys)
+        for key in [key for key in self._pending if key not in keep]:
+            self.cancel(key)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _on_loaded(self, key: str, image: QImage) -> None:
+        self._pending.pop(key, None)
+        # QPixmap may only be created on the GUI thread, which is where this slot runs
+        self._icons[key] = None if image.isNull() else QIcon(QPixmap.fromImage(image))
+        self.icon_loaded.emit(key)
@@ -0,0 +1,759 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from ProgramManager import ProgramManager
+from InstallerCache import InstallerCache
+from InstalledState import InstalledState
+from ProgressParser import ProgressParser, ProgressEvent
+from ProgressAggregator import ProgressAggregator, ProgressSnapshot, DEFAULT_RATE_HZ
+from InstallJournal import InstallJournal
+from ShellPool import ShellPool, ShellSessionError
+from InstallPlan import InstallPlan, compile_plan
+from Profile import Profile
+from RunLog import PackageResult, RunLog
+import RunLog as error_classes
+import InstallJournal as journal_states
+import BatchInstall
+from EngineOptions import DEFAULT_DOWNLOAD_CONCURRENCY, DEFAULT_PACKAGE_TIMEOUT
+import PackageCommands
+import Tracing
+
+READ_SIZE = 64 * 1024
+
+# Lines of stdout kept as the failure message when stderr is empty
+FAILURE_TAIL_LINES = 5
+
+MEBIBYTE = 1024 ** 2
+
+# Share of a package's progress bar covered by its download
+DOWNLOAD_WEIGHT = 0.5
+
+# Stages a package's time is split into, besides waiting for its turn
+DOWNLOAD = 'download'
+INSTALL = 'install'
+
+
+class PackageTask:
+    """
+    One package moving through the download and install stages.
+    """
+
+    def __init__(self, program: str, source: str, package_id: str,
+                 fallback_source: Optional[str] = None, fallback_id: Optional[str] = None,
+                 program_id: str = ""):
+        self.program = program
+        self.program_id = program_id
+        self.source = source
+        self.package_id = package_id
+        # Package from the other package manager, tried if this one fails
+        self.fallback_source = fallback_source
+        self.fallback_id = fallback_id
+        self.download_directory: Optional[str] = None
+        self.installer_path: Optional[str] = None
+        self.download_progress = 0.0
+        self.install_progress = 0.0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.result = ""
+        self.exit_code: Optional[int] = None
+        self.error_class: Optional[str] = None
+        self.bytes_transferred = 0
+        self.queue_seconds = 0.0
+        self.download_seconds = 0.0
+        self.install_seconds = 0.0
+        # Since when the package has been waiting, or running a stage
+        self.queued_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        return DOWNLOAD_WEIGHT * self.download_progress + (1 - DOWNLOAD_WEIGHT) * self.install_progress
+
+    def begin(self, at: Optional[float] = None) -> None:
+        """
+        Start a stage; the time since the last one ended was spent queued.
+        """
+        self.started_at = at or time.perf_counter()
+        self.queue_seconds += max(0.0, self.started_at - self.queued_at)
+        Tracing.interval("queued", "install", self.queued_at, self.started_at, self.program)
+
+    def end(self, stage: str) -> None:
+        if self.started_at is None:
+            return
+        now = time.perf_counter()
+        if stage == DOWNLOAD:
+            self.download_seconds += now - self.started_at
+        else:
+            self.install_seconds += now - self.started_at
+        Tracing.interval(stage, "install", self.started_at, now, self.program,
+                         source=self.source, package=self.package_id, result=self.result)
+        self.queued_at, self.started_at = now, None
+
+    def split(self) -> None:
+        """
+        An online install finished downloading: the stage so far was download.
+        """
+        if self.started_at is not None:
+            now = time.perf_counter()
+            self.download_seconds += now - self.started_at
+            Tracing.interval(DOWNLOAD, "install", self.started_at, now, self.program,
+                             source=self.source, package=self.package_id, online=True)
+            self.started_at = now
+
+    @property
+    def packages(self) -> List[Tuple[str, str]]:
+        """
+        Every (source, package id) the program is known under.
+        """
+        packages = [(self.source, self.package_id)]
+        if self.fallback_source:
+            packages.append((self.fallback_source, self.fallback_id))
+        return packages
+
+    def fail(self, result: str, error_class: str, exit_code: Optional[int] = None) -> None:
+        self.result = result
+        self.error_class = error_class
+        self.exit_code = exit_code
+
+    def to_result(self) -> PackageResult:
+        return PackageResult(self.program, self.result, self.program_id, self.source, self.package_id,
+                             self.exit_code, self.error_class, self.queue_seconds, self.download_seconds,
+                             self.install_seconds, self.bytes_transferred)
+
+
+class InstallEngine:
+    """
+    Pipelined installer: downloads several packages at once while installers
+    run strictly one at a time, in the order their downloads finish.
+
+    With an InstallerCache, cached installers skip the download stage and
+    fresh downloads are added to the cache.
+
+    With batch set, the pipeline is replaced by one `choco install` for all
+    choco packages and one `winget import` for all winget packages, so the
+    package managers' start-up and source refresh are paid once per source.
+
+    With an InstalledState, packages already on the machine are dropped from
+    the plan before anything is downloaded; on_skipped gets their names.
+
+    The engine runs on asyncio and has no Qt dependency. Any command that
+    runs longer than package_timeout is killed and its package fails; the
+    whole run is stopped the same way after timeout seconds. cancel() may be
+    called from any thread: running downloads are killed and nothing new is
+    started, but an installer that is already running is left to finish.
+
+    run() takes display names; run_plan() takes a compiled InstallPlan,
+    whose steps may name a fallback package that is installed when the
+    first choice fails.
+
+    With an InstallJournal, every package's state is recorded as it changes,
+    and programs the journal marks as completed (see InstallJournal.resume)
+    are not installed again.
+
+    Progress is reported through the on_progress(percent, status) callback
+    on every update, or coalesced into at most progress_rate_hz
+    ProgressSnapshots a second through on_snapshot.
+
+    After a run, records holds a PackageResult for every program (exit code,
+    error class, time queued, downloading and installing, bytes downloaded);
+    with a RunLog they are also appended to it.
+    """
+
+    def __init__(self, program_manager: Optional[ProgramManager] = None,
+                 download_concurrency: int = DEFAULT_DOWNLOAD_CONCURRENCY,
+                 on_progress: Optional[Callable[[int, str], None]] = None,
+                 installer_cache: Optional[InstallerCache] = None,
+                 batch: bool = False,
+                 installed_state: Optional[InstalledState] = None,
+                 on_skipped: Optional[Callable[[List[str]], None]] = None,
+                 on_snapshot: Optional[Callable[[ProgressSnapshot], None]] = None,
+                 progress_rate_hz: float = DEFAULT_RATE_HZ,
+                 package_timeout: Optional[float] = DEFAULT_PACKAGE_TIMEOUT,
+                 timeout: Optional[float] = None,
+                 journal: Optional[InstallJournal] = None,
+                 shell_pool: Optional[ShellPool] = None,
+                 run_log: Optional[RunLog] = None):
+        self.program_manager = program_manager
+        self.download_concurrency = max(1, download_concurrency)
+        self.on_progress = on_progress
+        self.installer_cache = installer_cache
+        self.batch = batch
+        self.installed_state = installed_state
+        self.on_skipped = on_skipped
+        self.package_timeout = package_timeout
+        self.timeout = timeout
+        self.journal = journal
+        # Long-lived shells to run package-manager commands in, if any
+        self.shell_pool = shell_pool
+        self.run_log = run_log
+        self.aggregator: Optional[ProgressAggregator] = None
+        if on_snapshot:
+            self.aggregator = ProgressAggregator(on_snapshot, self.package_progress, progress_rate_hz)
+        # Programs left out of the last run because they were already installed
+        self.skipped: List[str] = []
+        # One PackageResult per program of the last run, in plan order
+        self.records: List[PackageResult] = []
+        self.cancelled = False
+        self._tasks: List[PackageTask] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Running processes (or shell sessions) that cancel() may kill
+        self._cancellable: Set = set()
+
+    def package_progress(self) -> Dict[str, float]:
+        """
+        Percentage done of every package in the current plan.
+        """
+        return {task.program: task.progress * 100 for task in self._tasks}
+
+    def _report(self, status: str) -> None:
+        if self.aggregator:
+            self.aggregator.notify(status)
+        if not self.on_progress or not self._tasks:
+            return
+        overall = sum(task.progress for task in self._tasks) / len(self._tasks)
+        self.on_progress(int(overall * 100), status)
+
+    def _record(self, task: PackageTask, state: str) -> None:
+        if self.journal:
+            self.journal.record(task.program, state)
+
+    def _record_outcome(self, task: PackageTask) -> None:
+        # Cancelled packages stay unfinished in the journal, to be resumed
+        if not self.journal or not task.result or task.result.startswith('Cancelled'):
+            return
+        state = journal_states.DONE if task.result.startswith('Successfully') else journal_states.FAILED
+        self.journal.record(task.program, state, task.result)
+
+    def cancel(self) -> None:
+        """
+        Stop the run as soon as it is safe; may be called from any thread.
+        """
+        self.cancelled = True
+        Tracing.instant("cancel", "install")
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._kill_cancellable)
+
+    def _kill_cancellable(self) -> None:
+        self._report("Cancelling: waiting for the current installer to finish...")
+        for process in self._cancellable:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def _run_process(self, command: List[str], on_event: Optional[Callable[[ProgressEvent], None]] = None,
+                           on_line: Optional[Callable[[str], None]] = None, timeout: Optional[float] = None,
+                           cancellable: bool = False, track: Optional[str] = None) -> subprocess.CompletedProcess:
+        """
+        Run a command with a single reader on its stdout.
+
+        Output is split on "\r" as well as "\n", so in-place progress bars are
+        seen as they are drawn. Each segment goes to on_line and the newest
+        progress reading in every chunk to on_event. stderr is drained
+        concurrently and returned separately.
+
+        The process is killed if it outlives timeout (asyncio.TimeoutError is
+        raised) or the run is cancelled under it; with cancellable set,
+        cancel() kills it too.
+
+        With a shell pool the command runs in one of its long-lived sessions
+        instead of a process of its own.
+
+        Parsing of each chunk is traced on track.
+        """
+        parser = ProgressParser()
+        output: List[str] = []
+
+        def feed(chunk: bytes) -> None:
+            with Tracing.span("parse output", "progress", track, bytes=len(chunk)):
+                segments = parser.feed(chunk) if chunk else parser.finish()
+                output.extend(segments)
+                if on_line:
+                    for segment in segments:
+                        on_line(segment)
+                event = parser.take_event()
+                if event and on_event:
+                    on_event(event)
+
+        if self.shell_pool and self.shell_pool.supports(command):
+            try:
+                returncode, error = await self._run_pooled(command, feed, timeout, cancellable)
+                feed(b'')
+                return subprocess.CompletedProcess(command, returncode, '\n'.join(output), error)
+            except OSError as e:
+                if not self.shell_pool.broken:
+                    raise
+                print(f"Shell sessions unavailable, starting a process per command: {e}")
+
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stderr = asyncio.ensure_future(process.stderr.read())
+
+        async def read_stdout() -> None:
+            while True:
+                chunk = await process.stdout.read(READ_SIZE)
+                feed(chunk)
+                if not chunk:
+                    break
+            await process.wait()
+
+        if cancellable:
+            self._cancellable.add(process)
+        try:
+            await asyncio.wait_for(read_stdout(), timeout)
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr.cancel()
+            raise
+        finally:
+            self._cancellable.discard(process)
+        error = (await stderr).decode('utf-8', errors='replace')
+        return subprocess.CompletedProcess(command, process.returncode, '\n'.join(output), error)
+
+    async def _run_pooled(self, command: List[str], feed: Callable[[bytes], None],
+                          timeout: Optional[float], cancellable: bool):
+        """
+        Run a command in one of the pool's shell sessions; output chunks are
+        handed to feed on the event loop. Returns (exit code, stderr).
+        """
+        loop = asyncio.get_running_loop()
+        session = await loop.run_in_executor(None, self.shell_pool.acquire)
+        if cancellable:
+            self._cancellable.add(session)
+        try:
+            process = await loop.run_in_executor(
+                None, session.run, command, lambda chunk: loop.call_soon_threadsafe(feed, chunk), timeout
+            )
+            return process.returncode, process.stderr
+        except subprocess.TimeoutExpired:
+            raise asyncio.TimeoutError
+        except ShellSessionError:
+            # cancel() killed the session; report it like a killed process
+            if cancellable and self.cancelled:
+                return -1, ""
+            raise
+        except BaseException:
+            # Cancelled under us: the executor thread returns once the session is gone
+            session.kill()
+            raise
+        finally:
+            self._cancellable.discard(session)
+            self.shell_pool.release(session)
+
+    @staticmethod
+    def _failure_message(process: subprocess.CompletedProcess) -> str:
+        if process.stderr.strip():
+            return process.stderr.strip()
+        # Package managers often report errors on stdout; keep the tail
+        return '\n'.join(process.stdout.splitlines()[-FAILURE_TAIL_LINES:])
+
+    def _timed_out(self, task: PackageTask, stage: str, timeout: Optional[float]) -> str:
+        return f"Failed to install {task.program}: {stage} timed out after {timeout:g} s"
+
+    async def _current_version(self, task: PackageTask) -> Optional[str]:
+        """
+        Version the source would install now, or None when it cannot tell.
+        """
+        command = PackageCommands.version_command(task.source, task.package_id)
+        try:
+            with Tracing.span("check version", "install", task.program):
+                process = await self._run_process(command, timeout=self.package_timeout, cancellable=True,
+                                                  track=task.program)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        if process.returncode != 0:
+            return None
+        return PackageCommands.parse_version(task.source, task.package_id, process.stdout)
+
+    async def _cached_installer(self, task: PackageTask) -> Optional[str]:
+        """
+        The cached installer of the version the source ships now. Offline,
+        any cached version will do.
+        """
+        if self.installer_cache.cache_only:
+            return self.installer_cache.lookup(task.source, task.package_id)
+        if not self.installer_cache.has(task.source, task.package_id):
+            return None
+        version = await self._current_version(task)
+        if version is None:
+            return None
+        return self.installer_cache.lookup(task.source, task.package_id, version)
+
+    async def _download(self, task: PackageTask, work_directory: str) -> None:
+        if self.installer_cache:
+            task.installer_path = await self._cached_installer(task)
+            if task.installer_path:
+                task.download_progress = 1.0
+                self._report(f"Using cached installer for {task.program}")
+                return
+            if self.installer_cache.cache_only:
+                task.fail(f"Failed to install {task.program}: not in the installer cache (cache-only mode)",
+                          error_classes.ERROR_NOT_CACHED)
+                task.download_progress = 1.0
+                return
+
+        directory = os.path.join(work_directory, f"{task.source}-{task.package_id}")
+        os.makedirs(directory, exist_ok=True)
+        command = PackageCommands.download_command(task.source, task.package_id, directory)
+
+        def on_event(event: ProgressEvent) -> None:
+            task.download_progress = event.fraction
+            if event.bytes_total:
+                task.bytes_done, task.bytes_total = event.bytes_done, event.bytes_total
+                self._report(f"Downloading {task.program}: "
+                             f"{event.bytes_done / MEBIBYTE:.1f} / {event.bytes_total / MEBIBYTE:.1f} MB")
+            else:
+                self._report(f"Downloading {task.program}: {event.fraction * 100:.1f}%")
+
+        self._report(f"Downloading {task.program}...")
+        self._record(task, journal_states.DOWNLOADING)
+        try:
+            process = await self._run_process(command, on_event, timeout=self.package_timeout, cancellable=True,
+                                              track=task.program)
+            if self.cancelled:
+                task.fail(f"Cancelled {task.program}", error_classes.ERROR_CANCELLED)
+            elif process.returncode == 0:
+                task.download_directory = directory
+                task.installer_path = PackageCommands.find_installer(directory)
+                task.bytes_transferred += (
+                    os.path.getsize(task.installer_path) if task.installer_path else task.bytes_done
+                )
+                if task.installer_path and self.installer_cache:
+                    # Copying into the cache must not stall the other downloads
+                    with Tracing.span("store in cache", "install", task.program):
+                        task.installer_path = await asyncio.get_running_loop().run_in_executor(
+                            None, self.installer_cache.store, task.source, task.package_id, task.installer_path
+                        )
+        except asyncio.TimeoutError:
+            task.fail(self._timed_out(task, "download", self.package_timeout), error_classes.ERROR_TIMEOUT)
+        except OSError as e:
+            print(f"Download of {task.program} failed, installing online: {e}")
+        task.download_progress = 1.0
+        self._report(f"Downloaded {task.program}")
+
+    def _should_fall_back(self, task: PackageTask) -> bool:
+        return bool(task.fallback_source) and not self.cancelled and task.result.startswith(('Failed', 'Error'))
+
+    def _use_fallback(self, task: PackageTask) -> None:
+        print(f"{task.result}; trying {task.fallback_source} instead")
+        Tracing.instant("fall back", "install", task.program, source=task.fallback_source, error=task.error_class)
+        self._report(f"Retrying {task.program} with {task.fallback_source}...")
+        task.source, task.package_id = task.fallback_source, task.fallback_id
+        task.fallback_source = task.fallback_id = None
+        task.installer_path = None
+        task.fail("", None)
+
+    async def _install(self, task: PackageTask) -> None:
+        await self._install_package(task)
+        if self._should_fall_back(task):
+            self._use_fallback(task)
+            await self._install_package(task)
+        task.install_progress = 1.0
+        self._record_outcome(task)
+        self._report(f"Finished installing {task.program}")
+
+    async def _install_package(self, task: PackageTask) -> None:
+        if task.installer_path:
+            command = PackageCommands.local_install_command(task.source, task.package_id, task.installer_path)
+        else:
+            command = PackageCommands.install_command(task.source, task.package_id)
+            task.bytes_done = 0
+        # Online installs download first; their time and bytes count as downloading
+        downloading = not task.installer_path
+
+        def on_event(event: ProgressEvent) -> None:
+            nonlocal downloading
+            if downloading:
+                if event.bytes_total:
+                    task.bytes_done = event.bytes_done
+                if event.fraction >= 1.0:
+                    downloading = False
+                    task.split()
+            if task.download_progress < 1.0:
+                task.download_progress = event.fraction
+                if event.bytes_total:
+                    task.bytes_done, task.bytes_total = event.bytes_done, event.bytes_total
+            else:
+                task.install_progress = event.fraction
+            self._report(f"Installing {task.program}: {event.fraction * 100:.1f}%")
+
+        self._report(f"Installing {task.program}...")
+        self._record(task, journal_states.INSTALLING)
+        try:
+            process = await self._run_process(command, on_event, timeout=self.package_timeout, track=task.program)
+            task.exit_code = process.returncode
+            if process.returncode == 0:
+                task.result = f"Successfully installed {task.program}"
+            else:
+                task.fail(f"Failed to install {task.program}: {self._failure_message(process)}",
+                          error_classes.ERROR_EXIT_CODE, process.returncode)
+        except asyncio.TimeoutError:
+            task.fail(self._timed_out(task, "install", self.package_timeout), error_classes.ERROR_TIMEOUT)
+        except Exception as e:
+            task.fail(f"Error installing {task.program}: {str(e)}", type(e).__name__)
+        if not task.installer_path:
+            task.bytes_transferred += task.bytes_done
+
+    async def _install_batch(self, source: str, tasks: List[PackageTask], work_directory: str) -> None:
+        """
+        Install every package of one source with a single package-manager run.
+
+        The batch gets package_timeout for each of its packages.
+        """
+        package_ids = [task.package_id for task in tasks]
+        by_id = {task.package_id: task for task in tasks}
+        if source == PackageCommands.CHOCO:
+            command = BatchInstall.choco_batch_command(package_ids)
+            parser = BatchInstall.ChocoBatchParser(package_ids)
+        else:
+            manifest_path = os.path.join(work_directory, 'winget-import.json')
+            BatchInstall.write_winget_import_manifest(package_ids, manifest_path)
+            command = BatchInstall.winget_import_command(manifest_path)
+            parser = BatchInstall.WingetImportParser(package_ids)
+
+        # Packages install one after another, so one that was never announced
+        # started when the one before it finished
+        last_finished = time.perf_counter()
+        timed = set()
+
+        def on_line(line: str) -> None:
+            nonlocal last_finished
+            current = parser.current
+            reported = len(parser.results)
+            parser.feed(line)
+            for package_id in list(parser.results)[reported:]:
+                task = by_id[package_id]
+                if task.started_at is None:
+                    task.begin(last_finished)
+                task.end(INSTALL)
+                timed.add(package_id)
+                last_finished = time.perf_counter()
+                task.download_progress = task.install_progress = 1.0
+                self._report(f"Finished installing {task.program}")
+            if parser.current and parser.current != current:
+                by_id[parser.current].begin()
+                by_id[parser.current].download_progress = 1.0
+                self._report(f"Installing {by_id[parser.current].program}...")
+
+        self._report(f"Installing {len(tasks)} {source} packages in one batch...")
+        for task in tasks:
+            self._record(task, journal_states.INSTALLING)
+        timeout = self.package_timeout * len(tasks) if self.package_timeout else None
+        returncode: Optional[int] = None
+        error_class = None
+        try:
+            with Tracing.span(f"{source} batch", "install", f"{source} batch", packages=package_ids):
+                process = await self._run_process(command, on_line=on_line, timeout=timeout,
+                                                  track=f"{source} batch")
+            returncode = process.returncode
+            outcomes = parser.finish(returncode)
+        except asyncio.TimeoutError:
+            # Packages reported before the kill keep their outcome
+            outcomes = parser.results
+            for task in tasks:
+                if task.package_id not in outcomes:
+                    task.end(INSTALL)
+                    task.fail(self._timed_out(task, f"{source} batch", timeout), error_classes.ERROR_TIMEOUT)
+        except OSError as e:
+            outcomes = {package_id: (None, str(e)) for package_id in package_ids}
+            error_class = type(e).__name__
+
+        for package_id, (succeeded, message) in outcomes.items():
+            task = by_id[package_id]
+            if package_id not in timed:
+                # Reported only once the batch was over
+                if task.started_at is None:
+                    task.begin(last_finished)
+                task.end(INSTALL)
+            if succeeded:
+                task.result = f"Successfully installed {task.program}"
+                task.exit_code = 0
+            elif succeeded is None:
+                task.fail(f"Error installing {task.program}: {message}", error_class)
+            else:
+                # The batch's exit code is the only one there is
+                task.fail(f"Failed to install {task.program}: {message}", error_classes.ERROR_EXIT_CODE,
+                          returncode)
+            task.download_progress = task.install_progress = 1.0
+        for task in tasks:
+            self._record_outcome(task)
+        self._report(f"Finished {source} batch")
+
+    async def _run_batched(self, work_directory: str) -> None:
+        for source in (PackageCommands.CHOCO, PackageCommands.WINGET):
+            tasks = [task for task in self._tasks if task.source == source]
+            if tasks and not self.cancelled:
+                await self._install_batch(source, tasks, work_directory)
+        # Failures with a fallback are retried one by one with the other source
+        for task in self._tasks:
+            if self._should_fall_back(task):
+                self._use_fallback(task)
+                task.begin()
+                await self._install_package(task)
+                task.end(INSTALL)
+                self._record_outcome(task)
+
+    async def _run_package(self, task: PackageTask, work_directory: str,
+                           downloads: asyncio.Semaphore, installs: asyncio.Lock) -> None:
+        async with downloads:
+            if self.cancelled:
+                return
+            task.begin()
+            await self._download(task, work_directory)
+            task.end(DOWNLOAD)
+        if task.result:
+            self._record_outcome(task)
+            return
+        # Installers never overlap; the lock hands out turns in the order
+        # downloads finish
+        async with installs:
+            if not self.cancelled:
+                task.begin()
+                await self._install(task)
+                task.end(INSTALL)
+
+    async def _run_pipelined(self, work_directory: str) -> None:
+        downloads = asyncio.Semaphore(self.download_concurrency)
+        installs = asyncio.Lock()
+        await asyncio.gather(*(self._run_package(task, work_directory, downloads, installs)
+                               for task in self._tasks))
+
+    async def _skip_installed(self, results: Dict[str, str]) -> None:
+        """
+        Drop packages that are already installed from the plan.
+        """
+        self.skipped = []
+        if not self.installed_state or not self._tasks:
+            return
+        self._report("Checking installed programs...")
+        with Tracing.span("check installed", "install"):
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.installed_state.refresh,
+                {source for task in self._tasks for source, _ in task.packages}
+            )
+        remaining = []
+        for task in self._tasks:
+            if self.installed_state.is_any_installed(task.packages):
+                results[task.program] = f"Skipped {task.program}: already installed"
+                if self.journal:
+                    self.journal.record(task.program, journal_states.DONE, results[task.program])
+                self.skipped.append(task.program)
+            else:
+                remaining.append(task)
+        self._tasks = remaining
+        if self.skipped and self.on_skipped:
+            self.on_skipped(self.skipped)
+
+    def run(self, programs: List[str]) -> List[str]:
+        """
+        Install programs and return one result message per program, in the
+        order they were given.
+        """
+        return asyncio.run(self.run_async(programs))
+
+    def run_plan(self, plan: InstallPlan) -> List[str]:
+        """
+        Execute a compiled plan and return one result message per step,
+        followed by one per entry that could not be planned.
+        """
+        return asyncio.run(self.run_plan_async(plan))
+
+    async def run_async(self, programs: List[str]) -> List[str]:
+        plan = compile_plan(Profile(programs), self.program_manager.catalog)
+        results = await self._execute(plan)
+        return [results[plan.display_names[program]] for program in programs]
+
+    async def run_plan_async(self, plan: InstallPlan) -> List[str]:
+        results = await self._execute(plan)
+        return [results[step.program] for step in plan.steps] + \
+               [results[program] for program in plan.unavailable + plan.unresolved]
+
+    async def _execute(self, plan: InstallPlan) -> Dict[str, str]:
+        self._loop = asyncio.get_running_loop()
+        results: Dict[str, str] = {}
+        for program in plan.unavailable + plan.unresolved:
+            results[program] = f"No installation command found for {program}"
+        self._tasks = []
+        for step in plan.steps:
+            if self.journal and step.program in self.journal.completed:
+                results[step.program] = f"Successfully installed {step.program} (before resuming)"
+            else:
+                self._tasks.append(PackageTask(step.program, step.source, step.package_id,
+                                               step.fallback_source, step.fallback_id, step.program_id))
+        planned = {task.program: task for task in self._tasks}
+
+        if self.aggregator:
+            self.aggregator.start()
+        if self.journal:
+            self.journal.begin([step.program for step in plan.steps])
+        await self._skip_installed(results)
+        for task in self._tasks:
+            task.queued_at = time.perf_counter()
+
+        work_directory = tempfile.mkdtemp(prefix='replicator-')
+        # An exception or a cancel leaves the run in the journal for resuming
+        finished = False
+        try:
+            stages = self._run_batched(work_directory) if self.batch else self._run_pipelined(work_directory)
+            try:
+                with Tracing.span("install programs", "install", packages=len(self._tasks), batch=self.batch):
+                    await asyncio.wait_for(stages, self.timeout)
+            except asyncio.TimeoutError:
+                for task in self._tasks:
+                    if not task.result:
+                        task.end(INSTALL if task.download_progress >= 1.0 else DOWNLOAD)
+                        task.fail(f"Failed to install {task.program}: run timed out after {self.timeout:g} s",
+                                  error_classes.ERROR_RUN_TIMEOUT)
+                        self._record_outcome(task)
+            for task in self._tasks:
+                if not task.result:
+                    task.fail(f"Cancelled {task.program}", error_classes.ERROR_CANCELLED)
+                results[task.program] = task.result
+                if self.installed_state and task.result.startswith('Successfully'):
+                    self.installed_state.mark_installed(task.source, task.package_id)
+            finished = not self.cancelled
+        finally:
+            shutil.rmtree(work_directory, ignore_errors=True)
+            if self.installer_cache:
+                self.installer_cache.evict()
+                self.installer_cache.save()
+            if self.aggregator:
+                self.aggregator.stop()
+            if self.journal:
+                self.journal.close(finished)
+            self._loop = None
+            self._keep_records(plan, planned, results)
+
+        return results
+
+    def _keep_records(self, plan: InstallPlan, planned: Dict[str, PackageTask], results: Dict[str, str]) -> None:
+        """
+        Turn the run's outcome into PackageResults, and log them.
+        """
+        self.records = []
+        for step in plan.steps:
+            task = planned.get(step.program)
+            if task and task.result:
+                self.records.append(task.to_result())
+            elif step.program in results:
+                # Skipped, or installed by the run being resumed
+                self.records.append(PackageResult(step.program, results[step.program], step.program_id,
+                                                  step.source, step.package_id))
+        for program in plan.unavailable:
+            self.records.append(PackageResult(program, results[program],
+                                              error_class=error_classes.ERROR_NO_PACKAGE))
+        for program in plan.unresolved:
+            self.records.append(PackageResult(program, results[program],
+                                              error_class=error_classes.ERROR_UNKNOWN_PROGRAM))
+        if self.run_log and self.records:
+            try:
+                self.run_log.append(self.records)
+            except OSError as e:
+                print(f"Error writing run log {self.run_log.path}: {e}")
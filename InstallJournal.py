@@ -0,0 +1,146 @@
+import json
+import os
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+QUEUED = 'queued'
+DOWNLOADING = 'downloading'
+INSTALLING = 'installing'
+DONE = 'done'
+FAILED = 'failed'
+
+# States worth an fsync: the outcome of an installer that actually ran
+DURABLE_STATES = (DONE, FAILED)
+
+
+def default_journal_path() -> str:
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'Replicator', 'journal.jsonl')
+
+
+class JournalRun:
+    """
+    An installation run read back from the journal.
+    """
+
+    def __init__(self, run_id: str, programs: List[str], started: float):
+        self.run_id = run_id
+        self.programs = programs
+        self.started = started
+        # Latest state of each program, with the time it was recorded
+        self.states: Dict[str, str] = {program: QUEUED for program in programs}
+        self.times: Dict[str, float] = {}
+
+    @property
+    def completed(self) -> List[str]:
+        return [program for program in self.programs if self.states[program] == DONE]
+
+    @property
+    def remaining(self) -> List[str]:
+        return [program for program in self.programs if self.states[program] != DONE]
+
+
+class InstallJournal:
+    """
+    Append-only record of every package's state during an installation, so a
+    run that was closed, crashed or cut short by a reboot can be resumed.
+
+    Each line is one JSON record. Records are appended and flushed to the OS
+    as they happen; fsync is only paid when an installer's outcome is
+    recorded, and once more at the end. A run that finishes (not cancelled)
+    empties the file, since there is nothing left to resume.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_journal_path()
+        self.run_id: Optional[str] = None
+        # Set by resume(): programs the interrupted run already installed
+        self.completed: Set[str] = set()
+        self._resumed: Optional[JournalRun] = None
+        self._file = None
+
+    def unfinished(self) -> Optional[JournalRun]:
+        """
+        The last run in the journal, if it never finished.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+
+        run: Optional[JournalRun] = None
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A write torn by a crash; everything before it still counts
+                continue
+            event = record.get('event')
+            if event == 'run':
+                run = JournalRun(record['run'], record['programs'], record['time'])
+            elif run is None or record.get('run') != run.run_id:
+                continue
+            elif event == 'state' and record['program'] in run.states:
+                run.states[record['program']] = record['state']
+                run.times[record['program']] = record['time']
+        return run
+
+    def resume(self, run: JournalRun) -> None:
+        """
+        Continue run on the next begin(): its completed programs are skipped.
+        """
+        self._resumed = run
+        self.completed = set(run.completed)
+
+    def discard(self) -> None:
+        """
+        Forget any unfinished run.
+        """
+        self._resumed = None
+        self.completed = set()
+        if os.path.exists(self.path):
+            open(self.path, 'w').close()
+
+    def _append(self, record: Dict, sync: bool = False) -> None:
+        if self._file is None:
+            return
+        record['time'] = round(time.time(), 3)
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def begin(self, programs: List[str]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._resumed:
+            self.run_id = self._resumed.run_id
+            self._append({'event': 'resume', 'run': self.run_id}, sync=True)
+        else:
+            self.run_id = uuid.uuid4().hex
+            self._append({'event': 'run', 'run': self.run_id, 'programs': programs}, sync=True)
+
+    def record(self, program: str, state: str, detail: str = "") -> None:
+        record = {'event': 'state', 'run': self.run_id, 'program': program, 'state': state}
+        if detail:
+            record['detail'] = detail
+        self._append(record, sync=state in DURABLE_STATES)
+
+    def close(self, finished: bool) -> None:
+        """
+        End the run. An unfinished (cancelled) run stays in the journal to
+        be resumed later.
+        """
+        if self._file is None:
+            return
+        if finished:
+            # Nothing is left to resume, so the history can go
+            self._file.truncate(0)
+        else:
+            self._append({'event': 'pause', 'run': self.run_id}, sync=True)
+        self._file.close()
+        self._file = None
+        self._resumed = None
+        self.completed = set()
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+from Catalog import Catalog, MISSING_ID
+from Profile import Profile
+import PackageCommands
+
+# Bump when the plan layout or the way steps are resolved changes
+PLAN_VERSION = 1
+
+
+def default_plan_cache_directory() -> str:
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'Replicator', 'plans')
+
+
+class PlanStep:
+    """
+    One program in an install plan, with its package and concrete command,
+    and the other package manager's package to fall back on if it fails.
+    """
+
+    def __init__(self, program: str, program_id: str, source: str, package_id: str,
+                 fallback_source: Optional[str] = None, fallback_id: Optional[str] = None):
+        self.program = program
+        self.program_id = program_id
+        self.source = source
+        self.package_id = package_id
+        self.command = PackageCommands.install_command(source, package_id)
+        self.fallback_source = fallback_source
+        self.fallback_id = fallback_id
+        self.fallback_command = (
+            PackageCommands.install_command(fallback_source, fallback_id) if fallback_source else None
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'program': self.program,
+            'program_id': self.program_id,
+            'source': self.source,
+            'package_id': self.package_id,
+            'command': self.command,
+            'fallback': {
+                'source': self.fallback_source,
+                'package_id': self.fallback_id,
+                'command': self.fallback_command,
+            } if self.fallback_source else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlanStep':
+        fallback = data.get('fallback') or {}
+        return cls(data['program'], data['program_id'], data['source'], data['package_id'],
+                   fallback.get('source'), fallback.get('package_id'))
+
+
+class InstallPlan:
+    """
+    A profile resolved against the catalog: de-duplicated steps in profile
+    order, plus the entries that could not be planned.
+    """
+
+    def __init__(self, steps: List[PlanStep], tweaks: Optional[List[str]] = None,
+                 unavailable: Optional[List[str]] = None, unresolved: Optional[List[str]] = None,
+                 display_names: Optional[Dict[str, str]] = None, profile_hash: str = ""):
+        self.steps = steps
+        self.tweaks = list(tweaks or [])
+        # In the catalog, but shipped by neither winget nor choco
+        self.unavailable = list(unavailable or [])
+        # Not in the catalog at all
+        self.unresolved = list(unresolved or [])
+        # Profile entry -> the name its result is reported under
+        self.display_names = dict(display_names or {})
+        self.profile_hash = profile_hash
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': PLAN_VERSION,
+            'profile_hash': self.profile_hash,
+            'steps': [step.to_dict() for step in self.steps],
+            'tweaks': self.tweaks,
+            'unavailable': self.unavailable,
+            'unresolved': self.unresolved,
+            'display_names': self.display_names,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'InstallPlan':
+        return cls([PlanStep.from_dict(step) for step in data['steps']], data['tweaks'],
+                   data['unavailable'], data['unresolved'], data['display_names'], data['profile_hash'])
+
+
+def compile_plan(profile: Profile, catalog: Catalog) -> InstallPlan:
+    """
+    Resolve a profile's programs to packages.
+
+    winget is preferred and choco becomes the fallback; a program only choco
+    ships has no fallback. Entries naming the same program are planned once.
+    """
+    steps: List[PlanStep] = []
+    unavailable: List[str] = []
+    unresolved: List[str] = []
+    display_names: Dict[str, str] = {}
+    seen = set()
+    for entry in profile.programs:
+        program_id = catalog.resolve_program_id(entry)
+        if program_id is None:
+            display_names[entry] = entry
+            unresolved.append(entry)
+            continue
+        program_data = catalog.get_program_data(program_id)
+        program = program_data.get('content', program_id)
+        display_names[entry] = program
+        if program_id in seen:
+            continue
+        seen.add(program_id)
+
+        packages = [
+            (source, program_data[source]) for source in (PackageCommands.WINGET, PackageCommands.CHOCO)
+            if program_data.get(source, MISSING_ID) != MISSING_ID
+        ]
+        if not packages:
+            unavailable.append(program)
+            continue
+        fallback = packages[1] if len(packages) > 1 else (None, None)
+        steps.append(PlanStep(program, program_id, *packages[0], *fallback))
+    return InstallPlan(steps, profile.tweaks, unavailable, unresolved, display_names, profile.hash())
+
+
+class PlanCache:
+    """
+    Compiled plans on disk, keyed by the profile's hash and the catalog
+    file's identity, so identical machines skip loading the catalog and
+    resolving the profile.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or default_plan_cache_directory()
+
+    @staticmethod
+    def key(profile: Profile, catalog_path: str) -> str:
+        stat = os.stat(catalog_path)
+        identity = f"{PLAN_VERSION}:{profile.hash()}:{os.path.abspath(catalog_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def load(self, key: str) -> Optional[InstallPlan]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != PLAN_VERSION:
+                return None
+            return InstallPlan.from_dict(data)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, key: str, plan: InstallPlan) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = self._path(key) + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(plan.to_dict(), f)
+        os.replace(temporary_path, self._path(key))
+
+    def compile(self, profile: Profile, catalog_path: str, load_catalog: Callable[[], Catalog]) -> InstallPlan:
+        """
+        The cached plan for profile, or a freshly compiled (and cached) one.
+        load_catalog is only called on a miss.
+        """
+        try:
+            key = self.key(profile, catalog_path)
+        except OSError:
+            return compile_plan(profile, load_catalog())
+        plan = self.load(key)
+        if plan is None:
+            plan = compile_plan(profile, load_catalog())
+            try:
+                self.store(key, plan)
+            except OSError as e:
+                print(f"Could not cache the install plan: {e}")
+        return plan
@@ -1,13 +1,18 @@
 # InstallWindow.py
-from typing import List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                           QListWidget, QListWidgetItem, QPushButton, QLabel, 
-                           QProgressBar, QLineEdit)
-from PyQt5.QtCore import Qt, pyqtSignal, QSize
+                           QListView, QAbstractItemView, QPushButton, QLabel,
+                           QProgressBar, QLineEdit, QMessageBox, QComboBox, QFileDialog)
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QPoint, QTimer
 from PyQt5.QtGui import QIcon, QFontDatabase
 from ProgramManager import ProgramManager
+from Profile import Profile, load_profile, save_profile
 from InstallationThread import InstallationThread
-import os
+from RunSummaryDialog import RunSummaryDialog
+from ProgramListModel import ProgramListModel, ProgramFilterProxyModel
+from LogoAtlas import LogoAtlas
+from IconLoader import IconLoader
 from PyQt5.QtGui import QFont
 from Style import *
 
@@ -19,7 +24,7 @@ class InstallWindow(QMainWindow):
     back_clicked = pyqtSignal()
     next_clicked = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, program_manager: ProgramManager, engine_options: Optional[Dict] = None):
         super().__init__()
         self.setWindowTitle("Replicator - Install Manager")
         self.setGeometry(560, 240, 800, 600)
@@ -35,7 +40,7 @@ class InstallWindow(QMainWindow):
             QLabel { 
                 color: #CC784E; 
             }
-            QListWidget {
+            QListView {
                 background-color: #393E46;
                 color: #CC784E;
                 border: 1px solid #ea560a;
@@ -66,11 +71,10 @@ class InstallWindow(QMainWindow):
         """)
 
 
-        self.program_manager = ProgramManager()
-        self.program_manager.fetch_available_programs()
-            
+        self.program_manager = program_manager
+
         # Create and set central widget
-        self.central_widget = InstallWindowContent(self.program_manager)
+        self.central_widget = InstallWindowContent(self.program_manager, engine_options)
         self.setCentralWidget(self.central_widget)
         
         # Connect navigation signals from content widget to window signals
@@ -85,16 +89,29 @@ class InstallWindowContent(QWidget):
     back_clicked = pyqtSignal()
     next_clicked = pyqtSignal()
 
-    def __init__(self, program_manager: ProgramManager):
+    def __init__(self, program_manager: ProgramManager, engine_options: Optional[Dict] = None):
         super().__init__()
         self.program_manager = program_manager
+        self.engine_options = engine_options or {}
         self.layout = QVBoxLayout(self)
-        self.available_list = QListWidget()
-        self.selected_list = QListWidget()
+        self.icon_loader = IconLoader(LogoAtlas())
+        self.available_model = ProgramListModel(program_manager, self.icon_loader)
+        self.selected_model = ProgramListModel(program_manager, self.icon_loader)
+        self.available_proxy = ProgramFilterProxyModel()
+        self.available_proxy.setSourceModel(self.available_model)
+        self.selected_proxy = ProgramFilterProxyModel()
+        self.selected_proxy.setSourceModel(self.selected_model)
+        self.available_list = self._create_program_view(self.available_proxy)
+        self.selected_list = self._create_program_view(self.selected_proxy)
         self.available_search = QLineEdit()
         self.selected_search = QLineEdit()
+        self.category_box = QComboBox()
         self.progress_bar = QProgressBar()
+        self.cancel_button = QPushButton("Cancel")
         self.status_label = QLabel()
+        self.install_thread: Optional[InstallationThread] = None
+        # Tweaks of the last loaded profile, written back when it is saved
+        self.profile_tweaks: List[str] = []
         self.setup_ui()
         
     def setup_ui(self) -> None:
@@ -102,12 +119,42 @@ class InstallWindowContent(QWidget):
         self._create_list_layout()
         self._create_install_button()
         self._create_progress_bar()
+        self._create_cancel_button()
         self._create_status_label()
         self._create_navigation_buttons()
         self._populate_available_list()
+        # Ask once the window is up, not while it is being built
+        QTimer.singleShot(0, self._offer_resume)
+
+    def _create_program_view(self, model: ProgramFilterProxyModel) -> QListView:
+        view = QListView()
+        view.setModel(model)
+        view.setIconSize(QSize(32, 32))
+        view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Every row is the same height, so the view never measures off-screen rows
+        view.setUniformItemSizes(True)
+        view.verticalScrollBar().valueChanged.connect(self._retain_visible_icons)
+        return view
+
+    def _visible_programs(self, view: QListView, proxy: ProgramFilterProxyModel) -> List[str]:
+        top = view.indexAt(QPoint(0, 0))
+        if not top.isValid():
+            return []
+        bottom = view.indexAt(QPoint(0, view.viewport().height() - 1))
+        last_row = bottom.row() if bottom.isValid() else proxy.rowCount() - 1
+        source = proxy.sourceModel()
+        return [source.program_at(proxy.mapToSource(proxy.index(row, 0)).row())
+                for row in range(top.row(), last_row + 1)]
 
-        self.available_list.setIconSize(QSize(32, 32))
-        self.selected_list.setIconSize(QSize(32, 32))
+    def _retain_visible_icons(self) -> None:
+        """
+        Drop queued icon loads for rows that scrolled out of view.
+        """
+        self.icon_loader.retain(
+            self._visible_programs(self.available_list, self.available_proxy)
+            + self._visible_programs(self.selected_list, self.selected_proxy)
+        )
         
     def _create_header(self) -> None:
         header_label = QLabel("Program Installation Manager")
@@ -157,6 +204,13 @@ class InstallWindowContent(QWidget):
         available_layout.addWidget(available_label)
         available_layout.addWidget(self.available_search)
         available_layout.addWidget(self.available_list)
+        category_layout = QHBoxLayout()
+        self.category_box.addItems(self.program_manager.categories())
+        add_category_button = QPushButton("Add category >>")
+        add_category_button.clicked.connect(self._add_category)
+        category_layout.addWidget(self.category_box, 1)
+        category_layout.addWidget(add_category_button)
+        available_layout.addLayout(category_layout)
         list_layout.addLayout(available_layout)
         
         # Control buttons section
@@ -166,8 +220,11 @@ class InstallWindowContent(QWidget):
         remove_button = QPushButton("<< Remove")
         add_button.clicked.connect(self._add_selected_programs)
         remove_button.clicked.connect(self._remove_selected_programs)
+        clear_button = QPushButton("<< Clear")
+        clear_button.clicked.connect(self._clear_selection)
         button_layout.addWidget(add_button)
         button_layout.addWidget(remove_button)
+        button_layout.addWidget(clear_button)
         button_layout.addStretch()
         list_layout.addLayout(button_layout)
         
@@ -183,67 +240,138 @@ class InstallWindowContent(QWidget):
         list_layout.addLayout(selected_layout)
         
         self.layout.addLayout(list_layout)
-
-    def _filter_available_list(self, text: str) -> None:
-        for i in range(self.available_list.count()):
-            item = self.available_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
-
-    def _filter_selected_list(self, text: str) -> None:
-        for i in range(self.selected_list.count()):
-            item = self.selected_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
     
     def _create_install_button(self) -> None:
-        install_button = QPushButton("Install Selected Programs")
-        install_button.clicked.connect(self._install_programs)
-        self.layout.addWidget(install_button)
+        profile_layout = QHBoxLayout()
+        load_button = QPushButton("Load Profile...")
+        save_button = QPushButton("Save Profile...")
+        load_button.clicked.connect(self._load_profile)
+        save_button.clicked.connect(self._save_profile)
+        profile_layout.addWidget(load_button)
+        profile_layout.addWidget(save_button)
+        self.layout.addLayout(profile_layout)
+
+        self.install_button = QPushButton("Install Selected Programs")
+        self.install_button.clicked.connect(self._install_programs)
+        self.layout.addWidget(self.install_button)
 
     def _create_progress_bar(self) -> None:
         self.progress_bar.setVisible(False)
         self.layout.addWidget(self.progress_bar)
 
+    def _create_cancel_button(self) -> None:
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self._cancel_installation)
+        self.layout.addWidget(self.cancel_button)
+
     def _create_status_label(self) -> None:
         self.status_label.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(self.status_label)
 
-    def _add_item_with_icon(self, list_widget: QListWidget, program: str) -> None:
-        item = QListWidgetItem(program)
-        icon_path = self.program_manager.get_logo_path(program)
-        if icon_path and os.path.exists(icon_path):
-            icon = QIcon(icon_path)
-            item.setSizeHint(QSize(item.sizeHint().width(), 40))
-            item.setIcon(icon)
-        list_widget.addItem(item)
-
     def _populate_available_list(self) -> None:
-        self.available_list.clear()
-        for program in self.program_manager.available_programs:
-            self._add_item_with_icon(self.available_list, program)
+        self.available_model.set_programs(self.program_manager.available_programs)
+
+    def _offer_resume(self) -> None:
+        journal = self.engine_options.get('journal')
+        run = journal.unfinished() if journal else None
+        if not run:
+            return
+        answer = QMessageBox.question(
+            self, "Resume installation",
+            f"The last installation did not finish: {len(run.completed)} of {len(run.programs)} "
+            f"programs were installed. Install the remaining {len(run.remaining)} now?"
+        )
+        if answer != QMessageBox.Yes:
+            journal.discard()
+            return
+        journal.resume(run)
+        self._move_to_selected(self.program_manager.select(run.remaining))
+        self._install_programs()
+
+    @contextmanager
+    def _suspended_updates(self) -> Iterator[None]:
+        """
+        Hold off repainting both lists while a bulk change is applied.
+        """
+        views = (self.available_list, self.selected_list)
+        for view in views:
+            view.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            for view in views:
+                view.setUpdatesEnabled(True)
+
+    def _move_to_selected(self, programs: List[str]) -> None:
+        with self._suspended_updates():
+            self.available_model.remove_programs(programs)
+            self.selected_model.add_programs(programs)
+
+    def _selected_source_rows(self, view: QListView, proxy: ProgramFilterProxyModel) -> List[int]:
+        return [proxy.mapToSource(index).row() for index in view.selectionModel().selectedIndexes()]
 
     def _add_selected_programs(self) -> None:
-        for item in self.available_list.selectedItems():
-            program = item.text()
-            self.program_manager.add_program(program)
-            self._add_item_with_icon(self.selected_list, program)
-            self.available_list.takeItem(self.available_list.row(item))
+        rows = self._selected_source_rows(self.available_list, self.available_proxy)
+        self._move_to_selected(self.program_manager.select(
+            [self.available_model.program_at(row) for row in rows]
+        ))
+
+    def _add_category(self) -> None:
+        self._move_to_selected(self.program_manager.select_category(self.category_box.currentText()))
 
     def _remove_selected_programs(self) -> None:
-        for item in self.selected_list.selectedItems():
-            program = item.text()
-            self.program_manager.remove_program(program)
-            self._add_item_with_icon(self.available_list, program)
-            self.selected_list.takeItem(self.selected_list.row(item))
+        rows = self._selected_source_rows(self.selected_list, self.selected_proxy)
+        programs = self.program_manager.deselect([self.selected_model.program_at(row) for row in rows])
+        with self._suspended_updates():
+            self.selected_model.remove_programs(programs)
+            self.available_model.add_programs(programs)
+
+    def _load_profile(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(self, "Load Profile", "", "Replicator profiles (*.json)")
+        if not path:
+            return
+        try:
+            profile = load_profile(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Load Profile", f"Could not load {path}: {e}")
+            return
+        self._clear_selection()
+        self.profile_tweaks = profile.tweaks
+        self._move_to_selected(self.program_manager.select(profile.programs))
+        self.status_label.setText(f"Loaded profile with {self.selected_count()} programs.")
+
+    def _save_profile(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "", "Replicator profiles (*.json)")
+        if not path:
+            return
+        try:
+            save_profile(Profile(self.program_manager.selected_ids, self.profile_tweaks), path)
+        except OSError as e:
+            QMessageBox.warning(self, "Save Profile", f"Could not save {path}: {e}")
+
+    def _clear_selection(self) -> None:
+        self.program_manager.clear_selection()
+        with self._suspended_updates():
+            self.selected_model.clear()
+            # Back in catalog order
+            self.available_model.set_programs(self.program_manager.available_programs)
 
     def _filter_available_list(self, text: str) -> None:
-        for i in range(self.available_list.count()):
-            item = self.available_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
+        # Ask the catalog instead of matching every row's text
+        self.available_proxy.set_matches(self.program_manager.search_programs(text) if text else None)
+        self._retain_visible_icons()
 
     def _filter_selected_list(self, text: str) -> None:
-        for i in range(self.selected_list.count()):
-            item = self.selected_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
+        if not text:
+            self.selected_proxy.set_matches(None)
+            return
+        text = text.lower()
+        self.selected_proxy.set_matches(
+            [program for program in self.selected_model.programs() if text in program.lower()]
+        )
+
+    def selected_count(self) -> int:
+        return self.selected_model.rowCount()
 
     def _install_programs(self) -> None:
         # Check if there are any programs selected
@@ -255,31 +383,65 @@ class InstallWindowContent(QWidget):
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 100)  # Ensure full range is set
         self.progress_bar.setValue(0)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
         self.status_label.setText("Preparing installation...")
     
         # Disable install button during installation
-        sender = self.sender()
-        if sender:
-            sender.setEnabled(False)
+        sender = self.install_button
+        sender.setEnabled(False)
     
         # Create and start installation thread
-        self.install_thread = InstallationThread(self.program_manager)
+        self.install_thread = InstallationThread(self.program_manager, self.engine_options, self.profile_tweaks)
         self.install_thread.progress_update.connect(self._update_progress)
+        self.install_thread.already_installed.connect(self._mark_already_installed)
+        self.avoided_installs = 0
+        self.package_results = []
+        self.install_thread.package_results.connect(self._keep_package_results)
         self.install_thread.installation_complete.connect(lambda results: self._installation_complete(results, sender))
         self.install_thread.start()
     
+    def _cancel_installation(self) -> None:
+        # Running downloads stop at once; a running installer is left to finish
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText("Cancelling...")
+        if self.install_thread:
+            self.install_thread.cancel()
+
+    def _mark_already_installed(self, programs: List[str]) -> None:
+        self.avoided_installs = len(programs)
+        for program in programs:
+            self.selected_model.set_note(program, "already installed")
+
+    def _keep_package_results(self, records: List) -> None:
+        self.package_results = records
+
     def _installation_complete(self, results: List[str], install_button=None) -> None:
-        self.status_label.setText("Installation complete!")
+        cancelled = sum(1 for result in results if result.startswith('Cancelled'))
+        if cancelled:
+            self.status_label.setText(f"Installation cancelled, {cancelled} not installed.")
+        elif self.avoided_installs:
+            self.status_label.setText(
+                f"Installation complete! {self.avoided_installs} already installed, "
+                f"install{'s' if self.avoided_installs > 1 else ''} avoided."
+            )
+        else:
+            self.status_label.setText("Installation complete!")
         self.progress_bar.setVisible(False)
-        self.selected_list.clear()
-        self.program_manager.selected_programs.clear()
+        self.cancel_button.setVisible(False)
+        self.program_manager.clear_selection()
+        with self._suspended_updates():
+            self.selected_model.clear()
+            # The installed programs are available again, in catalog order
+            self.available_model.set_programs(self.program_manager.available_programs)
         
         # Re-enable install button if it was passed
         if install_button:
             install_button.setEnabled(True)
-    
-        # Optionally, show a dialog or log with detailed results
-        print("\n".join(results))
+
+        # Every result is in the run log already; the dialog shows them
+        if self.package_results:
+            RunSummaryDialog(self.package_results, self).exec_()
         
     def _update_progress(self, value: int, status: str) -> None:
         self.progress_bar.setValue(value)
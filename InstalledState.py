@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Set, Tuple
+from PackageCommands import WINGET, CHOCO
+
+DEFAULT_TTL = 300
+
+
+def iter_winget_export() -> Iterator[str]:
+    """
+    Yield the id of every winget-known package on this machine, from one
+    `winget export`.
+    """
+    fd, export_path = tempfile.mkstemp(suffix='.json', prefix='replicator-export-')
+    os.close(fd)
+    try:
+        subprocess.run(
+            [WINGET, 'export', '--output', export_path, '--accept-source-agreements'],
+            capture_output=True, text=True
+        )
+        with open(export_path, 'r', encoding='utf-8') as f:
+            export = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return
+    finally:
+        os.remove(export_path)
+    for source in export.get('Sources', []):
+        for package in source.get('Packages', []):
+            yield package['PackageIdentifier']
+
+
+def iter_choco_list() -> Iterator[str]:
+    """
+    Yield the id of every installed choco package from one `choco list`,
+    line by line as choco prints them.
+    """
+    try:
+        # Chocolatey 2 lists local packages only; --limit-output prints "id|version"
+        process = subprocess.Popen([CHOCO, 'list', '--limit-output'], stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return
+    with process:
+        for line in process.stdout:
+            if '|' in line:
+                yield line.split('|', 1)[0].strip()
+
+
+def winget_installed() -> Set[str]:
+    """
+    Ids of every winget-known package on this machine, lowercased.
+    """
+    return {package_id.lower() for package_id in iter_winget_export()}
+
+
+def choco_installed() -> Set[str]:
+    """
+    Ids of every installed choco package, lowercased.
+    """
+    return {package_id.lower() for package_id in iter_choco_list()}
+
+
+PACKAGE_LISTS = {WINGET: iter_winget_export, CHOCO: iter_choco_list}
+QUERIES = {WINGET: winget_installed, CHOCO: choco_installed}
+
+
+class InstalledState:
+    """
+    What is already installed on this machine, per package manager.
+
+    Each source is queried with one bulk command and the answer is kept for
+    ttl seconds, so a run that starts right after another does not ask again.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._installed: Dict[str, Tuple[float, Set[str]]] = {}
+
+    def refresh(self, sources=(WINGET, CHOCO)) -> None:
+        """
+        Query every stale source, all sources at the same time.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = [source for source in sources
+                     if source not in self._installed or now - self._installed[source][0] > self.ttl]
+        if not stale:
+            return
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            answers = dict(zip(stale, pool.map(lambda source: QUERIES[source](), stale)))
+        with self._lock:
+            for source, installed in answers.items():
+                self._installed[source] = (time.monotonic(), installed)
+
+    def installed(self, source: str) -> Set[str]:
+        self.refresh((source,))
+        return self._installed[source][1]
+
+    def is_installed(self, source: str, package_id: str) -> bool:
+        return package_id.lower() in self.installed(source)
+
+    def is_any_installed(self, packages: Iterable[Tuple[str, str]]) -> bool:
+        """
+        Whether any of a program's (source, package id) pairs is installed: a
+        program installed through choco counts even when winget is preferred.
+        """
+        return any(self.is_installed(source, package_id) for source, package_id in packages)
+
+    def mark_installed(self, source: str, package_id: str) -> None:
+        """
+        Record a package the engine just installed, without querying again.
+        """
+        with self._lock:
+            if source in self._installed:
+                self._installed[source][1].add(package_id.lower())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._installed.clear()
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+VERSION_PATTERN = re.compile(r'^\s*PackageVersion:\s*(\S+)\s*$', re.MULTILINE)
+NUPKG_VERSION_PATTERN = re.compile(r'\.(\d+(?:\.\d+)*(?:-[\w.]+)?)\.nupkg$', re.IGNORECASE)
+
+
+def default_cache_directory() -> str:
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'Replicator', 'installers')
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _directory_size(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory) for name in names
+    )
+
+
+def detect_version(installer_path: str) -> str:
+    """
+    Read the package version from the winget manifest or the .nupkg file name.
+    """
+    match = NUPKG_VERSION_PATTERN.search(os.path.basename(installer_path))
+    if match:
+        return match.group(1)
+    directory = os.path.dirname(installer_path)
+    for name in os.listdir(directory):
+        if name.lower().endswith('.yaml'):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8', errors='replace') as f:
+                match = VERSION_PATTERN.search(f.read())
+            if match:
+                return match.group(1).strip('\'"')
+    return 'unknown'
+
+
+class InstallerCache:
+    """
+    On-disk cache of downloaded installers, so re-provisioning a machine does
+    not fetch the same installers again.
+
+    Entries live in <directory>/<source>/<package id>/<version>/<sha256 prefix>/
+    together with the manifest that came with them, and are looked up by
+    package id and version: an installer is only reused while its version is
+    still the one the source would install. Storing a newer version replaces
+    the older ones.
+
+    index.json records each entry's size and last use; it is written when
+    entries are stored or evicted, and by save() once per run for the use
+    times. Once the cache grows past max_bytes the least recently used
+    entries are evicted by evict().
+
+    With cache_only set the engine never downloads: packages that are not
+    cached fail instead (offline mode), and whatever version is cached is used.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 cache_only: bool = False):
+        self.directory = directory or default_cache_directory()
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load_index()
+        # Whether _entries has changes index.json does not
+        self._dirty = False
+
+    @staticmethod
+    def _key(source: str, package_id: str, version: str) -> str:
+        return f"{source}/{package_id.lower()}/{version}"
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        # Re-keyed from the entries themselves, so indexes written before
+        # entries were keyed by version still load
+        return {self._key(entry['source'], entry['package_id'], entry['version']): entry
+                for entry in entries.values()}
+
+    def _save_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def save(self) -> None:
+        """
+        Write the index if lookups changed it since it was last written.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _package_entries(self, source: str, package_id: str) -> Dict[str, Dict]:
+        prefix = self._key(source, package_id, '')
+        return {key: entry for key, entry in self._entries.items() if key.startswith(prefix)}
+
+    def _remove_files(self, entry: Dict) -> None:
+        entry_directory = os.path.join(self.directory, entry['path'])
+        shutil.rmtree(entry_directory, ignore_errors=True)
+        # Drop the version and package directories too once they are empty
+        try:
+            os.removedirs(os.path.dirname(entry_directory))
+        except OSError:
+            pass
+
+    def has(self, source: str, package_id: str) -> bool:
+        """
+        Whether any version of a package is cached.
+        """
+        with self._lock:
+            return bool(self._package_entries(source, package_id))
+
+    def lookup(self, source: str, package_id: str, version: Optional[str] = None) -> Optional[str]:
+        """
+        Get the cached installer of a package's version and mark it as
+        recently used. Without a version, the newest cached one is taken.
+
+        Returns:
+            str: Path of the cached installer, or None on a miss
+        """
+        with self._lock:
+            if version is None:
+                entries = self._package_entries(source, package_id)
+                key = max(entries, key=lambda key: entries[key]['last_used'], default=None)
+            else:
+                key = self._key(source, package_id, version)
+            entry = self._entries.get(key) if key else None
+            if entry is None:
+                return None
+            installer_path = os.path.join(self.directory, entry['installer'])
+            if not os.path.isfile(installer_path) or os.path.getsize(installer_path) != entry['installer_size']:
+                # Deleted or truncated behind our back
+                del self._entries[key]
+                self._dirty = True
+                return None
+            entry['last_used'] = time.time()
+            self._dirty = True
+            return installer_path
+
+    def store(self, source: str, package_id: str, installer_path: str) -> str:
+        """
+        Copy a freshly downloaded installer (and its manifest) into the cache,
+        replacing any other cached version of the package.
+
+        Returns:
+            str: Path of the installer inside the cache
+        """
+        download_directory = os.path.dirname(installer_path)
+        version = detect_version(installer_path)
+        sha256 = _sha256(installer_path)
+        relative_directory = os.path.join(source, package_id.lower(), version, sha256[:16])
+        entry_directory = os.path.join(self.directory, relative_directory)
+
+        with self._lock:
+            if not os.path.isdir(entry_directory):
+                os.makedirs(os.path.dirname(entry_directory), exist_ok=True)
+                shutil.copytree(download_directory, entry_directory)
+            for key, old_entry in self._package_entries(source, package_id).items():
+                if old_entry['path'] != relative_directory:
+                    self._remove_files(old_entry)
+                del self._entries[key]
+            installer = os.path.join(relative_directory, os.path.basename(installer_path))
+            self._entries[self._key(source, package_id, version)] = {
+                'source': source,
+                'package_id': package_id,
+                'version': version,
+                'sha256': sha256,
+                'path': relative_directory,
+                'installer': installer,
+                'installer_size': os.path.getsize(installer_path),
+                'size': _directory_size(entry_directory),
+                'last_used': time.time(),
+            }
+            self._save_index()
+        return os.path.join(self.directory, installer)
+
+    def total_size(self) -> int:
+        return sum(entry['size'] for entry in self._entries.values())
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries until the cache fits in max_bytes.
+
+        The engine calls this after a run, so installers fetched during the
+        run are never evicted before they have been installed.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        evicted = 0
+        with self._lock:
+            total = self.total_size()
+            for key, entry in sorted(self._entries.items(), key=lambda item: item[1]['last_used']):
+                if total <= self.max_bytes:
+                    break
+                self._remove_files(entry)
+                del self._entries[key]
+                total -= entry['size']
+                evicted += 1
+            if evicted:
+                self._save_index()
+        return evicted
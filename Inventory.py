@@ -0,0 +1,62 @@
+import platform
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from Catalog import Catalog
+from InstalledState import PACKAGE_LISTS
+from PackageCommands import WINGET, CHOCO
+from Profile import Profile
+
+
+class Inventory:
+    """
+    The catalog programs found on this machine, and the installed packages
+    the catalog does not know.
+    """
+
+    def __init__(self, programs: Dict[str, Tuple[str, str]], unmatched: Dict[str, List[str]]):
+        # Catalog key -> (source, package id) it was found as
+        self.programs = programs
+        # Source -> installed package ids with no catalog entry
+        self.unmatched = unmatched
+
+    def to_profile(self, name: str = "") -> Profile:
+        """
+        A profile selecting every captured program, by catalog key, in
+        catalog-key order so captures of similar machines diff cleanly.
+        """
+        return Profile(sorted(self.programs), name=name or platform.node())
+
+
+def _match_packages(catalog: Catalog, source: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Match each package a source lists against the catalog as the listing
+    yields it, instead of collecting the whole listing first.
+    """
+    found: Dict[str, str] = {}
+    unmatched: List[str] = []
+    for package_id in PACKAGE_LISTS[source]():
+        program_id = catalog.find_package(source, package_id)
+        if program_id is None:
+            unmatched.append(package_id)
+        else:
+            found.setdefault(program_id, package_id)
+    return found, unmatched
+
+
+def capture_inventory(catalog: Catalog, sources=(WINGET, CHOCO)) -> Inventory:
+    """
+    List what is installed with one bulk query per package manager, both at
+    the same time, and match each package to the catalog through its
+    winget/choco index while the listing streams in.
+    """
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        matched = dict(zip(sources, pool.map(lambda source: _match_packages(catalog, source), sources)))
+
+    programs: Dict[str, Tuple[str, str]] = {}
+    unmatched: Dict[str, List[str]] = {}
+    # winget first, so a program both know is recorded under its winget id
+    for source in sources:
+        found, unmatched[source] = matched[source]
+        for program_id, package_id in found.items():
+            programs.setdefault(program_id, (source, package_id))
+    return Inventory(programs, unmatched)
@@ -0,0 +1,190 @@
+"""
+Pre-scaled logo thumbnails packed into one memory-mapped atlas file.
+
+The logos in ./logs are full-size PNGs (some over 1 MB) but the install window
+only ever shows them at 32x32. build_atlas() scales every logo referenced by
+applications.json once and packs the raw pixels into logos.atlas; at runtime
+LogoAtlas maps that file and hands out ready-to-paint QImages without decoding
+a single PNG. The GUI builds the atlas in the background on first start
+(ensure_atlas); until then, and for logos changed since, it decodes the PNGs.
+
+Atlas layout:
+    header  MAGIC, version, index offset, index length
+    pixels  ARGB32-premultiplied thumbnails, back to back
+    index   JSON mapping logo path -> size, mtime_ns, sha256, {size: [offset, width, height]}
+
+Usage:
+    python LogoAtlas.py [applications.json] [logos.atlas]
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Optional
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+from Catalog import parse_applications_json
+import Tracing
+
+MAGIC = b'RLAT'
+ATLAS_VERSION = 1
+HEADER = struct.Struct('<4sIQQ')
+# Icon sizes the UI paints logos at
+THUMBNAIL_SIZES = (32,)
+DEFAULT_ATLAS_PATH = './logos.atlas'
+
+
+def _read_index(data) -> Dict:
+    magic, version, index_offset, index_length = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != ATLAS_VERSION:
+        raise ValueError("not a logo atlas or unsupported version")
+    return json.loads(bytes(data[index_offset:index_offset + index_length]).decode('utf-8'))
+
+
+def _scale(image: QImage, size: int) -> QImage:
+    scaled = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return scaled.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+
+def build_atlas(catalog_path: str = './applications.json', atlas_path: str = DEFAULT_ATLAS_PATH) -> Dict[str, int]:
+    """
+    Build or refresh the atlas for every logo referenced by the catalog.
+
+    Logos whose content hash matches the existing atlas are copied over as-is;
+    only new or changed logos are decoded and scaled.
+
+    Returns:
+        dict: Counts of reused, rebuilt and missing logos
+    """
+    applications_data = parse_applications_json(catalog_path)
+    logo_paths = sorted({
+        program_data['logo'] for program_data in applications_data.values()
+        if isinstance(program_data, dict) and program_data.get('logo')
+    })
+
+    old_atlas = LogoAtlas(atlas_path)
+    stats = {'reused': 0, 'rebuilt': 0, 'missing': 0}
+    index = {}
+    blobs = bytearray()
+
+    for logo_path in logo_paths:
+        try:
+            with open(logo_path, 'rb') as f:
+                content = f.read()
+            stat = os.stat(logo_path)
+        except OSError:
+            stats['missing'] += 1
+            continue
+        sha256 = hashlib.sha256(content).hexdigest()
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256, 'thumbnails': {}}
+
+        old_entry = old_atlas.index.get(logo_path)
+        if old_entry and old_entry['sha256'] == sha256:
+            for size, (offset, width, height) in old_entry['thumbnails'].items():
+                entry['thumbnails'][size] = [HEADER.size + len(blobs), width, height]
+                blobs += old_atlas.data[offset:offset + width * height * 4]
+            stats['reused'] += 1
+        else:
+            image = QImage.fromData(content)
+            if image.isNull():
+                stats['missing'] += 1
+                continue
+            for size in THUMBNAIL_SIZES:
+                thumbnail = _scale(image, size)
+                entry['thumbnails'][str(size)] = [HEADER.size + len(blobs), thumbnail.width(), thumbnail.height()]
+                # Scan lines may be padded; copy row by row at width * 4 bytes
+                bits = thumbnail.constBits().asstring(thumbnail.sizeInBytes())
+                row_bytes = thumbnail.width() * 4
+                for y in range(thumbnail.height()):
+                    start = y * thumbnail.bytesPerLine()
+                    blobs += bits[start:start + row_bytes]
+            stats['rebuilt'] += 1
+        index[logo_path] = entry
+    old_atlas.close()
+
+    index_bytes = json.dumps(index).encode('utf-8')
+    tmp_path = atlas_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, ATLAS_VERSION, HEADER.size + len(blobs), len(index_bytes)))
+        f.write(blobs)
+        f.write(index_bytes)
+    os.replace(tmp_path, atlas_path)
+    return stats
+
+
+def ensure_atlas(catalog_path: str = './applications.json', atlas_path: str = DEFAULT_ATLAS_PATH) -> None:
+    """
+    Build the atlas if there is none yet. Meant for a background thread: a
+    LogoAtlas opened in the meantime is empty and its callers decode PNGs.
+    """
+    if os.path.exists(atlas_path):
+        return
+    try:
+        with Tracing.span("build logo atlas", "icons"):
+            build_atlas(catalog_path, atlas_path)
+    except OSError as e:
+        print(f"Error building logo atlas {atlas_path}: {e}")
+
+
+class LogoAtlas:
+    """
+    Read-only, memory-mapped view of logos.atlas.
+
+    A logo whose file no longer matches the size and mtime recorded at build
+    time is treated as absent, so callers fall back to decoding the PNG.
+    """
+
+    def __init__(self, atlas_path: str = DEFAULT_ATLAS_PATH):
+        self.atlas_path = atlas_path
+        self.data = None
+        self.index: Dict[str, Dict] = {}
+        self._file = None
+        try:
+            self._file = open(atlas_path, 'rb')
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index = _read_index(self.data)
+        except (OSError, ValueError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Ignoring logo atlas {atlas_path}: {e}")
+            self.close()
+
+    def _is_current(self, logo_path: str, entry: Dict) -> bool:
+        try:
+            stat = os.stat(logo_path)
+        except OSError:
+            return False
+        return stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']
+
+    def image(self, logo_path: str, size: int = THUMBNAIL_SIZES[0]) -> Optional[QImage]:
+        """
+        Get the pre-scaled thumbnail for a logo, or None if the atlas has no
+        current copy of it.
+        """
+        entry = self.index.get(logo_path)
+        if entry is None or not self._is_current(logo_path, entry):
+            return None
+        thumbnail = entry['thumbnails'].get(str(size))
+        if thumbnail is None:
+            return None
+        offset, width, height = thumbnail
+        pixels = self.data[offset:offset + width * height * 4]
+        # QImage does not own the buffer; copy() detaches it from the slice
+        return QImage(pixels, width, height, width * 4, QImage.Format_ARGB32_Premultiplied).copy()
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.index = {}
+
+
+if __name__ == "__main__":
+    catalog = sys.argv[1] if len(sys.argv) > 1 else './applications.json'
+    atlas = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_ATLAS_PATH
+    print(build_atlas(catalog, atlas))
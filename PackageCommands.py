@@ -0,0 +1,207 @@
+"""
+Command lines for the package managers Replicator drives.
+
+Commands are built as argument lists, not shell strings, so they can be run
+without a shell and package ids never need quoting.
+"""
+
+import os
+import platform
+import re
+from typing import Dict, List, Optional, Tuple
+
+WINGET = 'winget'
+CHOCO = 'choco'
+
+# Installer types winget download can produce that run without winget
+INSTALLER_EXTENSIONS = ('.msi', '.exe', '.msix', '.appx', '.msixbundle', '.appxbundle')
+
+SILENT_SWITCH_PATTERN = re.compile(r'^\s*Silent:\s*(.+?)\s*$', re.MULTILINE)
+# A command-line argument: quoted parts may sit anywhere in it and keep their quotes
+ARGUMENT_PATTERN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+MANIFEST_FIELD_PATTERN = r'^\s*(?:- )?{}:\s*(\S+)\s*$'
+# winget installer types that are a plain .exe
+EXE_INSTALLER_TYPES = ('exe', 'nullsoft', 'inno', 'burn')
+MACHINE_ARCHITECTURES = {'amd64': 'x64', 'x86_64': 'x64', 'arm64': 'arm64', 'aarch64': 'arm64', 'x86': 'x86'}
+WINGET_VERSION_PATTERN = re.compile(r'^\s*Version:\s*(\S+)\s*$', re.MULTILINE)
+
+
+def download_command(source: str, package_id: str, directory: str) -> Optional[List[str]]:
+    """
+    Command that fetches a package's installer into directory without installing it.
+    """
+    if source == WINGET:
+        return [WINGET, 'download', '--id', package_id, '--exact',
+                '--download-directory', directory,
+                '--accept-package-agreements', '--accept-source-agreements']
+    if source == CHOCO:
+        # choco download needs Chocolatey for Business; on the open-source
+        # edition it fails and the package is installed online instead
+        return [CHOCO, 'download', package_id, '--output-directory', directory, '-y']
+    return None
+
+
+def install_command(source: str, package_id: str) -> List[str]:
+    """
+    Command that downloads and installs a package in one go.
+    """
+    if source == WINGET:
+        return [WINGET, 'install', '--id', package_id, '--exact', '--silent',
+                '--accept-package-agreements', '--accept-source-agreements']
+    return [CHOCO, 'install', package_id, '-y']
+
+
+def version_command(source: str, package_id: str) -> List[str]:
+    """
+    Command that prints the version of a package the source would install now.
+    """
+    if source == WINGET:
+        return [WINGET, 'show', '--id', package_id, '--exact', '--accept-source-agreements']
+    # --limit-output prints "id|version"
+    return [CHOCO, 'search', package_id, '--exact', '--limit-output']
+
+
+def parse_version(source: str, package_id: str, output: str) -> Optional[str]:
+    """
+    Read the version from version_command's output; None when it has none.
+    """
+    if source == WINGET:
+        match = WINGET_VERSION_PATTERN.search(output)
+        return match.group(1) if match else None
+    for line in output.splitlines():
+        name, _, version = line.strip().partition('|')
+        if name.lower() == package_id.lower() and version:
+            return version
+    return None
+
+
+def find_installer(directory: str) -> Optional[str]:
+    """
+    Find the installer or .nupkg a download command left in directory.
+    """
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return None
+    for name in names:
+        if name.lower().endswith(INSTALLER_EXTENSIONS + ('.nupkg',)):
+            return os.path.join(directory, name)
+    return None
+
+
+def _manifest_field(text: str, field: str) -> Optional[str]:
+    match = re.search(MANIFEST_FIELD_PATTERN.format(field), text, re.MULTILINE)
+    return match.group(1).strip('\'"').lower() if match else None
+
+
+def _unquote(value: str) -> str:
+    # Only a quote around the whole YAML value; quotes inside are the installer's
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '\'"':
+        return value[1:-1]
+    return value
+
+
+def _split_manifest(manifest: str) -> Tuple[str, List[str]]:
+    """
+    Split a winget manifest into its root fields and one text per entry of
+    its Installers list.
+    """
+    root: List[str] = []
+    installers: List[List[str]] = []
+    in_installers = False
+    item_indent: Optional[int] = None
+    for line in manifest.splitlines():
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        if not stripped or stripped.startswith('#'):
+            continue
+        if in_installers:
+            if stripped.startswith('- ') and indent == (item_indent if item_indent is not None else indent):
+                item_indent = indent
+                installers.append([line])
+                continue
+            if installers and indent > item_indent:
+                installers[-1].append(line)
+                continue
+            in_installers = False
+        if indent == 0 and stripped.startswith('Installers:'):
+            in_installers = True
+        else:
+            root.append(line)
+    return '\n'.join(root), ['\n'.join(lines) for lines in installers]
+
+
+def manifest_silent_switches(manifest: str, installer_name: str) -> Optional[str]:
+    """
+    Silent switches of the manifest's installer entry a downloaded .exe came
+    from.
+
+    A manifest may list several installers (architectures, scopes, installer
+    types), each with switches of its own, and root-level switches apply to
+    entries without any. The entry is picked by the architecture, scope and
+    type in the file name winget download gives the installer, then by this
+    machine's architecture; None when the entries still disagree.
+    """
+    root, installers = _split_manifest(manifest)
+    root_switches = SILENT_SWITCH_PATTERN.search(root)
+    default = _unquote(root_switches.group(1)) if root_switches else None
+    if not installers:
+        return default
+
+    entries: List[Dict[str, Optional[str]]] = []
+    for text in installers:
+        switches = SILENT_SWITCH_PATTERN.search(text)
+        entries.append({
+            'architecture': _manifest_field(text, 'Architecture'),
+            'scope': _manifest_field(text, 'Scope') or _manifest_field(root, 'Scope'),
+            'type': _manifest_field(text, 'InstallerType') or _manifest_field(root, 'InstallerType'),
+            'switches': _unquote(switches.group(1)) if switches else default,
+        })
+    entries = [entry for entry in entries if entry['type'] in EXE_INSTALLER_TYPES + (None,)]
+
+    name_parts = set(os.path.splitext(installer_name)[0].lower().split('_'))
+    machine = MACHINE_ARCHITECTURES.get(platform.machine().lower())
+    for field, wanted in (('architecture', None), ('scope', None), ('type', None), ('architecture', machine)):
+        matching = [entry for entry in entries
+                    if entry[field] and (entry[field] == wanted if wanted else entry[field] in name_parts)]
+        if matching:
+            entries = matching
+    switches = {entry['switches'] for entry in entries}
+    return switches.pop() if len(switches) == 1 else None
+
+
+def _silent_switches(installer_path: str) -> Optional[str]:
+    # winget download writes the package manifest next to the installer
+    directory = os.path.dirname(installer_path)
+    for name in os.listdir(directory):
+        if name.lower().endswith('.yaml'):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8', errors='replace') as f:
+                switches = manifest_silent_switches(f.read(), os.path.basename(installer_path))
+            if switches:
+                return switches
+    return None
+
+
+def local_install_command(source: str, package_id: str, installer_path: str) -> List[str]:
+    """
+    Command that installs a package from an already downloaded installer.
+
+    Falls back to the online install_command when the installer type cannot be
+    run silently on its own.
+    """
+    directory = os.path.dirname(installer_path)
+    extension = os.path.splitext(installer_path)[1].lower()
+    if extension == '.nupkg':
+        return [CHOCO, 'install', package_id, '-y', '--source', directory]
+    if extension == '.msi':
+        return ['msiexec', '/i', installer_path, '/qn', '/norestart']
+    if extension in ('.msix', '.appx', '.msixbundle', '.appxbundle'):
+        quoted_path = installer_path.replace("'", "''")
+        return ['powershell', '-NoProfile', '-Command',
+                f"Add-AppxPackage -Path '{quoted_path}'"]
+    if extension == '.exe':
+        switches = _silent_switches(installer_path)
+        if switches:
+            # /D="C:\Program Files\X" stays one argument
+            return [installer_path] + ARGUMENT_PATTERN.findall(switches)
+    return install_command(source, package_id)
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+# Bump when the profile layout changes
+PROFILE_VERSION = 1
+
+
+class Profile:
+    """
+    A shareable description of a machine: the programs to install, by
+    catalog id, and the tweaks to apply.
+
+    Stored as JSON:
+        {"version": 1, "name": "...", "programs": ["vlc", ...], "tweaks": ["dark_mode", ...]}
+
+    Program entries may also be display names or winget/choco ids; the plan
+    compiler resolves them against the catalog. Tweaks are ids or display
+    names from tweaks.json.
+    """
+
+    def __init__(self, programs: Optional[List[str]] = None, tweaks: Optional[List[str]] = None,
+                 name: str = ""):
+        self.name = name
+        self.programs = list(programs or [])
+        self.tweaks = list(tweaks or [])
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': PROFILE_VERSION,
+            'name': self.name,
+            'programs': self.programs,
+            'tweaks': self.tweaks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Profile':
+        if data.get('version', PROFILE_VERSION) > PROFILE_VERSION:
+            raise ValueError(f"Profile version {data['version']} is newer than this Replicator supports")
+        return cls(data.get('programs', []), data.get('tweaks', []), data.get('name', ""))
+
+    def hash(self) -> str:
+        """
+        sha256 of the profile's content; the name does not count.
+        """
+        canonical = json.dumps({'programs': self.programs, 'tweaks': self.tweaks},
+                               sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def load_profile(path: str) -> Profile:
+    """
+    Load a profile, or a bare JSON list of programs.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return Profile(data, name=os.path.splitext(os.path.basename(path))[0])
+    return Profile.from_dict(data)
+
+
+def save_profile(profile: Profile, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile.to_dict(), f, indent=2)
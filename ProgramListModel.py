@@ -0,0 +1,167 @@
+from typing import Dict, Iterable, List, Optional
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QSortFilterProxyModel
+from PyQt5.QtGui import QIcon
+from ProgramManager import ProgramManager
+from IconLoader import IconLoader
+
+ROW_HEIGHT = 40
+
+# Past this many separate runs of rows, a removal resets the model instead
+MAX_REMOVE_RUNS = 32
+
+
+class ProgramListModel(QAbstractListModel):
+    """
+    List model of program display names.
+
+    Text, icons and size hints are produced in data(), so the view only asks
+    for the rows it actually paints. Icons are requested from the IconLoader
+    on first paint; the row shows a placeholder until the icon arrives and
+    only that row is repainted.
+    """
+
+    def __init__(self, program_manager: ProgramManager, icon_loader: IconLoader,
+                 programs: Optional[List[str]] = None, parent=None):
+        super().__init__(parent)
+        self.program_manager = program_manager
+        self.icon_loader = icon_loader
+        self.icon_loader.icon_loaded.connect(self._on_icon_loaded)
+        self._programs: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Short status shown after a program's name, e.g. "already installed"
+        self._notes: Dict[str, str] = {}
+        self._set_programs(programs or [])
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._programs)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        program = self._programs[index.row()]
+        if role == Qt.DisplayRole:
+            note = self._notes.get(program)
+            return f"{program} ({note})" if note else program
+        if role == Qt.DecorationRole:
+            return self._icon(program)
+        if role == Qt.SizeHintRole:
+            return QSize(0, ROW_HEIGHT)
+        return None
+
+    def _icon(self, program: str) -> Optional[QIcon]:
+        if self.icon_loader.has_icon(program):
+            return self.icon_loader.get_icon(program)
+        icon_path = self.program_manager.get_logo_path(program)
+        if not icon_path:
+            return None
+        self.icon_loader.request(program, icon_path)
+        return self.icon_loader.placeholder
+
+    def _on_icon_loaded(self, program: str) -> None:
+        row = self._rows.get(program)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_note(self, program: str, note: str) -> None:
+        self._notes[program] = note
+        row = self._rows.get(program)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def _set_programs(self, programs: Iterable[str]) -> None:
+        self._programs = list(programs)
+        self._rows = {program: row for row, program in enumerate(self._programs)}
+
+    def programs(self) -> List[str]:
+        return list(self._programs)
+
+    def program_at(self, row: int) -> str:
+        return self._programs[row]
+
+    def set_programs(self, programs: Iterable[str]) -> None:
+        self.beginResetModel()
+        self._set_programs(programs)
+        self.endResetModel()
+
+    def add_programs(self, programs: List[str]) -> None:
+        """
+        Append programs to the end of the list as one insert.
+        """
+        if not programs:
+            return
+        first = len(self._programs)
+        self.beginInsertRows(QModelIndex(), first, first + len(programs) - 1)
+        self._programs.extend(programs)
+        for row, program in enumerate(programs, first):
+            self._rows[program] = row
+        self.endInsertRows()
+
+    def remove_rows(self, rows: Iterable[int]) -> None:
+        """
+        Remove the given rows, one removal per contiguous run of rows.
+        """
+        rows = sorted(set(rows))
+        runs: List[List[int]] = []
+        for row in rows:
+            if runs and row == runs[-1][1] + 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        if len(runs) > MAX_REMOVE_RUNS:
+            # Scattered rows (e.g. a whole category): one rebuild is cheaper
+            # than shifting the list and the view once per run
+            removed = set(rows)
+            self.set_programs(program for row, program in enumerate(self._programs) if row not in removed)
+            return
+        # Remove from the bottom up so earlier row numbers stay valid
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._programs[first:last + 1]
+            self.endRemoveRows()
+        if runs:
+            self._rows = {program: row for row, program in enumerate(self._programs)}
+
+    def remove_programs(self, programs: Iterable[str]) -> None:
+        self.remove_rows(self._rows[program] for program in programs if program in self._rows)
+
+    def clear(self) -> None:
+        self._notes = {}
+        self.set_programs([])
+
+
+class ProgramFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filters a ProgramListModel down to the results of a catalog search.
+
+    set_matches takes the ranked names returned by ProgramManager.search_programs;
+    matches are shown in rank order, and None shows every row in source order.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ranks: Optional[Dict[str, int]] = None
+
+    def set_matches(self, matches: Optional[List[str]]) -> None:
+        self._ranks = None if matches is None else {name: rank for rank, name in enumerate(matches)}
+        # Filter first: sorting the rows of the previous search would rank
+        # names the new one does not have. invalidate() also re-ranks when
+        # the sort column stays the same, which makes sort() a no-op.
+        self.invalidate()
+        # Column -1 restores the source order once the search is cleared
+        self.sort(-1 if self._ranks is None else 0)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._ranks is None:
+            return True
+        return self.sourceModel().program_at(source_row) in self._ranks
+
+    def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+        model = self.sourceModel()
+        # Unranked rows go last; an exception here would abort the app
+        unranked = len(self._ranks)
+        return (self._ranks.get(model.program_at(left.row()), unranked)
+                < self._ranks.get(model.program_at(right.row()), unranked))
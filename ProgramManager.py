@@ -1,111 +1,162 @@
-import json
-import subprocess
-from typing import List, Dict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from Catalog import Catalog, MISSING_ID
 
 
 class ProgramManager:
     """
     Manages the interaction with winget for program discovery and installation.
+
+    The catalog itself lives in a Catalog, which is read-only and may be
+    shared; a ProgramManager only adds the user's selection on top of it.
     """
 
-    def __init__(self):
-        self.available_programs: List[str] = []
-        self.selected_programs: List[str] = []
-        self.applications_data: Dict[str, Dict] = {}
-        self.load_applications_data()
-        self.fetch_available_programs()
+    def __init__(self, catalog_path: str = './applications.json', backend: Optional[str] = None,
+                 catalog: Optional[Catalog] = None):
+        self.catalog = catalog or Catalog(catalog_path, backend)
+        self.catalog_path = self.catalog.catalog_path
+        # Ordered set of selected catalog ids (dict keys keep insertion order)
+        self._selected: Dict[str, None] = {}
 
-    def load_applications_data(self) -> None:
-        try:
-            # Try UTF-8 encoding first
-            with open('./applications.json', 'r', encoding='utf-8') as f:
-                self.applications_data = json.load(f)
-        except UnicodeDecodeError:
-            # If UTF-8 fails, try with 'cp1252' encoding
-            try:
-                with open('./applications.json', 'r', encoding='cp1252') as f:
-                    self.applications_data = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON: {e}")
-                self.applications_data = {}
-        except FileNotFoundError:
-            print("applications.json not found. Please ensure the file exists.")
-            self.applications_data = {}
-
-    def fetch_available_programs(self) -> None:
-        """
-        Updated to use 'content' field from applications.json
-        """
-        self.available_programs = []
-        for program_id, program_data in self.applications_data.items():
-            if 'content' in program_data:
-                self.available_programs.append(program_data['content'])
+    @property
+    def applications_data(self) -> Mapping[str, Dict]:
+        return self.catalog.applications_data
+
+    def resolve_program_id(self, program: str) -> Optional[str]:
+        """
+        Resolve a display name, catalog key, winget id or choco id to a catalog key.
+        """
+        return self.catalog.resolve_program_id(program)
+
+    def get_program_data(self, program: str) -> Dict:
+        """
+        Get the catalog entry for a program, or an empty dict if it is unknown.
+        """
+        return self.catalog.get_program_data(program)
+
+    def search_programs(self, text: str) -> List[str]:
+        """
+        Search the catalog by name, description, category and package ids.
+
+        Returns:
+            list: Matching display names, best matches first
+        """
+        return self.catalog.search(text)
+
+    @property
+    def available_programs(self) -> List[str]:
+        """
+        Display names of the programs not selected, in catalog order.
+        """
+        return [
+            name for program_id, name in self.catalog.iter_programs()
+            if program_id not in self._selected
+        ]
+
+    @property
+    def selected_programs(self) -> List[str]:
+        """
+        Display names of the selected programs, in the order they were selected.
+        """
+        return [self.catalog.name_of(program_id) for program_id in self._selected]
+
+    @property
+    def selected_ids(self) -> List[str]:
+        return list(self._selected)
+
+    def categories(self) -> List[str]:
+        return self.catalog.category_names()
+
+    def is_selected(self, program: str) -> bool:
+        return self.resolve_program_id(program) in self._selected
+
+    def select(self, programs: Iterable[str]) -> List[str]:
+        """
+        Select programs given by display name or any id the catalog resolves.
+
+        Returns:
+            list: Display names of the programs that were not selected before
+        """
+        added = []
+        for program in programs:
+            program_id = self.resolve_program_id(program)
+            if program_id is not None and program_id not in self._selected:
+                self._selected[program_id] = None
+                added.append(self.catalog.name_of(program_id))
+        return added
+
+    def deselect(self, programs: Iterable[str]) -> List[str]:
+        """
+        Deselect programs given by display name or any id the catalog resolves.
+
+        Returns:
+            list: Display names of the programs that were selected
+        """
+        removed = []
+        for program in programs:
+            program_id = self.resolve_program_id(program)
+            if program_id in self._selected:
+                del self._selected[program_id]
+                removed.append(self.catalog.name_of(program_id))
+        return removed
+
+    def select_category(self, category: str) -> List[str]:
+        return self.select(self.catalog.category_ids(category))
+
+    def clear_selection(self) -> List[str]:
+        removed = self.selected_programs
+        self._selected.clear()
+        return removed
 
     def add_program(self, program: str) -> None:
         """
         Move a program from available to selected.
         """
-        if program in self.available_programs:
-            self.available_programs.remove(program)
-            self.selected_programs.append(program)
+        self.select([program])
 
     def remove_program(self, program: str) -> None:
         """
         Move a program from selected to available.
         """
-        if program in self.selected_programs:
-            self.selected_programs.remove(program)
-            self.available_programs.append(program)
+        self.deselect([program])
+
+    def get_package_source(self, program_name: str) -> Optional[Tuple[str, str]]:
+        """
+        Get the package manager and package id used to install a program.
+
+        Returns:
+            tuple: ("winget" or "choco", package id), or None if neither ships it
+        """
+        program_data = self.get_program_data(program_name)
+        if program_data.get('winget', MISSING_ID) != MISSING_ID:
+            return 'winget', program_data['winget']
+        elif program_data.get('choco', MISSING_ID) != MISSING_ID:
+            return 'choco', program_data['choco']
+        return None
 
     def get_install_command(self, program_name: str) -> str:
         """
         Get the installation command for a program using its display name.
         """
-        # Find the program ID by matching the content/name
-        for program_id, program_data in self.applications_data.items():
-            if program_data.get('content') == program_name:
-                if 'winget' in program_data:
-                    return f"winget install {program_data['winget']}"
-                elif 'choco' in program_data:
-                    return f"choco install {program_data['choco']}"
-        return ""
+        package = self.get_package_source(program_name)
+        if package is None:
+            return ""
+        return f"{package[0]} install {package[1]}"
 
-    def install_programs(self) -> List[str]:
+    def install_programs(self, batch: bool = True) -> List[str]:
         """Install selected programs and return results."""
         # Get the list of selected programs from the selected_programs list
         if not self.selected_programs:
             return ["No programs selected for installation"]
-            
-        results = []
-        for program in self.selected_programs:
-            command = self.get_install_command(program)
-            if command:
-                try:
-                    # Use subprocess.run instead of call for better error handling
-                    process = subprocess.run(
-                        command,
-                        shell=True,
-                        capture_output=True,
-                        text=True
-                    )
-                    if process.returncode == 0:
-                        results.append(f"Successfully installed {program}")
-                    else:
-                        results.append(f"Failed to install {program}: {process.stderr}")
-                except Exception as e:
-                    results.append(f"Error installing {program}: {str(e)}")
-            else:
-                results.append(f"No installation command found for {program}")
-        return results
+
+        # Imported here because InstallEngine itself depends on ProgramManager
+        from InstallEngine import InstallEngine
+        return InstallEngine(self, batch=batch).run(self.selected_programs)
     
     def get_logo_path(self, program_name: str) -> str:
         """
         Get the logo path for a program using its display name.
         """
-        for program_data in self.applications_data.values():
-            if program_data.get('content') == program_name:
-                return program_data.get('logo', "")
-        return ""
+        return self.get_program_data(program_name).get('logo', "")
     
     def install_single_program(self, program):
         """
@@ -0,0 +1,96 @@
+import threading
+from typing import Callable, Dict, Optional
+import Tracing
+
+DEFAULT_RATE_HZ = 30.0
+
+
+class ProgressSnapshot:
+    """
+    Progress of a whole run at one moment, as published to the GUI.
+    """
+    __slots__ = ('overall', 'status', 'packages', 'received', 'published')
+
+    def __init__(self, overall: float, status: str, packages: Dict[str, float], received: int, published: int):
+        # Percentages, 0-100
+        self.overall = overall
+        self.packages = packages
+        self.status = status
+        # Updates received so far and snapshots published so far (this one included)
+        self.received = received
+        self.published = published
+
+    @property
+    def merged(self) -> int:
+        return self.received - self.published
+
+
+class ProgressAggregator:
+    """
+    Merges progress updates from every running package and publishes at most
+    one snapshot per frame interval.
+
+    notify() is cheap and may be called from any thread, as often as output
+    arrives: it only records the latest status and marks the state dirty. A
+    ticker thread wakes rate_hz times a second and, if anything changed,
+    builds one snapshot from source() and hands it to publish().
+    """
+
+    def __init__(self, publish: Callable[[ProgressSnapshot], None],
+                 source: Callable[[], Dict[str, float]],
+                 rate_hz: float = DEFAULT_RATE_HZ):
+        self.publish = publish
+        self.source = source
+        self.interval = 1.0 / rate_hz
+        self.received = 0
+        self.published = 0
+        self._status = ""
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def merged(self) -> int:
+        """
+        Updates folded into a later snapshot instead of being published.
+        """
+        return self.received - self.published
+
+    def notify(self, status: str) -> None:
+        with self._lock:
+            self.received += 1
+            self._status = status
+            self._dirty = True
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._tick, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop ticking and publish whatever is still pending.
+        """
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            status = self._status
+            self.published += 1
+            received, published = self.received, self.published
+        packages = self.source()
+        overall = sum(packages.values()) / len(packages) if packages else 100.0
+        Tracing.counter("progress", overall=overall, updates=received)
+        self.publish(ProgressSnapshot(overall, status, packages, received, published))
+
+    def _tick(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.flush()
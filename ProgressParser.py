@@ -0,0 +1,107 @@
+"""
+Incremental parser for package-manager progress output.
+
+winget and choco redraw their progress bars in place with a bare carriage
+return, so a progress update is any text ending in "\r" or "\n", not a line.
+ProgressParser is fed raw chunks as they are read from the process and keeps
+the newest progress reading as a ProgressEvent.
+"""
+
+import codecs
+import re
+from typing import List, Optional
+
+UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+# "12.0 MB / 45.3 MB" (winget) and "Saving 600 KB of 58.39 MB" (choco)
+BYTES_PATTERN = re.compile(r'(\d[\d.]*)\s*([KMG]?B)\s+(?:/|of)\s+(\d[\d.]*)\s*([KMG]?B)')
+PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+SEPARATOR_PATTERN = re.compile(r'[\r\n]')
+
+
+class ProgressEvent:
+    """
+    One progress reading taken from a segment of output.
+    """
+    __slots__ = ('fraction', 'bytes_done', 'bytes_total', 'text')
+
+    def __init__(self, fraction: float, text: str, bytes_done: Optional[int] = None,
+                 bytes_total: Optional[int] = None):
+        self.fraction = fraction
+        self.text = text
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+
+
+def _to_bytes(value: str, unit: str) -> Optional[int]:
+    try:
+        return int(float(value) * UNITS[unit])
+    except ValueError:
+        return None
+
+
+def parse_segment(segment: str) -> Optional[ProgressEvent]:
+    """
+    Read the progress out of one segment, preferring byte counts over percentages.
+    """
+    match = BYTES_PATTERN.search(segment)
+    if match:
+        done = _to_bytes(match.group(1), match.group(2))
+        total = _to_bytes(match.group(3), match.group(4))
+        if done is not None and total:
+            return ProgressEvent(min(done / total, 1.0), segment, done, total)
+    match = PERCENT_PATTERN.search(segment)
+    if match:
+        return ProgressEvent(min(float(match.group(1)), 100.0) / 100, segment)
+    return None
+
+
+class ProgressParser:
+    """
+    Splits a byte stream on both "\r" and "\n" and parses the progress in it.
+
+    feed() returns the segments completed by the chunk. A chunk often holds
+    dozens of redraws of the same bar, so only the newest segment that carries
+    progress is parsed; take_event() hands it out once. Text after the last
+    separator is kept until the next chunk or finish().
+    """
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._pending = ''
+        self._event: Optional[ProgressEvent] = None
+        self.last_event: Optional[ProgressEvent] = None
+
+    def feed(self, chunk: bytes) -> List[str]:
+        text = self._pending + self._decoder.decode(chunk)
+        parts = SEPARATOR_PATTERN.split(text)
+        self._pending = parts.pop()
+        segments = [part.strip() for part in parts]
+        segments = [segment for segment in segments if segment]
+        self._parse_newest(segments)
+        return segments
+
+    def finish(self) -> List[str]:
+        """
+        Flush whatever is left after the stream has ended.
+        """
+        segment = (self._pending + self._decoder.decode(b'', final=True)).strip()
+        self._pending = ''
+        if not segment:
+            return []
+        self._parse_newest([segment])
+        return [segment]
+
+    def take_event(self) -> Optional[ProgressEvent]:
+        """
+        Get the newest progress reading not handed out yet, if any.
+        """
+        event, self._event = self._event, None
+        return event
+
+    def _parse_newest(self, segments: List[str]) -> None:
+        for segment in reversed(segments):
+            event = parse_segment(segment)
+            if event is not None:
+                self._event = self.last_event = event
+                return
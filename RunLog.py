@@ -0,0 +1,194 @@
+import json
+import os
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+# Error classes of a package result; exceptions are classed by their type name
+ERROR_EXIT_CODE = 'exit_code'
+ERROR_TIMEOUT = 'timeout'
+ERROR_RUN_TIMEOUT = 'run_timeout'
+ERROR_NOT_CACHED = 'not_cached'
+ERROR_CANCELLED = 'cancelled'
+ERROR_NO_PACKAGE = 'no_package'
+ERROR_UNKNOWN_PROGRAM = 'unknown_program'
+
+MEBIBYTE = 1024 ** 2
+
+
+def default_run_log_path() -> str:
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'Replicator', 'runs.jsonl')
+
+
+def result_status(result: str) -> str:
+    """
+    Classify one of InstallEngine's result messages.
+    """
+    if result.startswith('Successfully'):
+        return 'installed'
+    if result.startswith('Skipped'):
+        return 'skipped'
+    if result.startswith('Cancelled'):
+        return 'cancelled'
+    if result.startswith('No installation command'):
+        return 'unavailable'
+    return 'failed'
+
+
+class PackageResult:
+    """
+    What happened to one package in one run, and where its time went.
+
+    queue_seconds is time spent waiting for a turn (a download slot, then
+    the installer lock); download_seconds and install_seconds are the two
+    stages themselves. bytes_transferred counts downloaded bytes only, so a
+    cached installer transfers nothing.
+    """
+
+    FIELDS = ('run', 'time', 'program', 'program_id', 'source', 'package_id', 'status', 'exit_code',
+              'error_class', 'message', 'queue_seconds', 'download_seconds', 'install_seconds',
+              'bytes_transferred')
+
+    def __init__(self, program: str, message: str, program_id: str = "", source: str = "",
+                 package_id: str = "", exit_code: Optional[int] = None, error_class: Optional[str] = None,
+                 queue_seconds: float = 0.0, download_seconds: float = 0.0, install_seconds: float = 0.0,
+                 bytes_transferred: int = 0, run: str = "", time: float = 0.0, status: str = ""):
+        self.run = run
+        self.time = time
+        self.program = program
+        self.program_id = program_id
+        self.source = source
+        self.package_id = package_id
+        self.status = status or result_status(message)
+        self.exit_code = exit_code
+        self.error_class = error_class
+        self.message = message
+        self.queue_seconds = queue_seconds
+        self.download_seconds = download_seconds
+        self.install_seconds = install_seconds
+        self.bytes_transferred = bytes_transferred
+
+    @property
+    def total_seconds(self) -> float:
+        return self.queue_seconds + self.download_seconds + self.install_seconds
+
+    def to_dict(self) -> Dict:
+        record = {field: getattr(self, field) for field in self.FIELDS}
+        for field in ('queue_seconds', 'download_seconds', 'install_seconds'):
+            record[field] = round(record[field], 3)
+        return record
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PackageResult':
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+
+class RunLog:
+    """
+    Append-only JSON-lines file of PackageResults, one line per package per
+    run, kept across runs for reporting.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_run_log_path()
+
+    def append(self, results: List[PackageResult]) -> str:
+        """
+        Write one run's results, stamped with a new run id; returns the id.
+        """
+        run_id = uuid.uuid4().hex
+        now = round(time.time(), 3)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lines = []
+        for result in results:
+            result.run, result.time = run_id, now
+            lines.append(json.dumps(result.to_dict()) + '\n')
+        with open(self.path, 'ab') as f:
+            # Start on a fresh line after a line torn by a crash
+            if f.tell() and not self._ends_with_newline():
+                f.write(b'\n')
+            f.write(''.join(lines).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        return run_id
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def read(self, last_runs: Optional[int] = None) -> List[PackageResult]:
+        """
+        Every result in the log, or those of the last last_runs runs.
+        """
+        results: List[PackageResult] = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        results.append(PackageResult.from_dict(json.loads(line)))
+                    except (ValueError, TypeError, KeyError):
+                        # A line torn by a crash
+                        continue
+        except OSError:
+            return []
+        if last_runs:
+            runs = list(dict.fromkeys(result.run for result in results))[-last_runs:]
+            results = [result for result in results if result.run in set(runs)]
+        return results
+
+
+def summarize(results: Iterable[PackageResult]) -> List[Dict]:
+    """
+    One row per program across all runs: how often it was installed or
+    failed, its mean stage times (over the runs it actually ran in), bytes
+    downloaded and its last error. Slowest programs first.
+    """
+    rows: Dict[str, Dict] = {}
+    for result in results:
+        row = rows.setdefault(result.program, {
+            'program': result.program, 'runs': 0, 'installed': 0, 'failed': 0, 'skipped': 0,
+            'ran': 0, 'queue_seconds': 0.0, 'download_seconds': 0.0, 'install_seconds': 0.0,
+            'bytes_transferred': 0, 'last_error': "",
+        })
+        row['runs'] += 1
+        if result.status in ('installed', 'failed', 'skipped'):
+            row[result.status] += 1
+        if result.status in ('installed', 'failed'):
+            row['ran'] += 1
+            row['queue_seconds'] += result.queue_seconds
+            row['download_seconds'] += result.download_seconds
+            row['install_seconds'] += result.install_seconds
+        row['bytes_transferred'] += result.bytes_transferred or 0
+        if result.status == 'failed':
+            row['last_error'] = result.error_class or ""
+
+    for row in rows.values():
+        for field in ('queue_seconds', 'download_seconds', 'install_seconds'):
+            row[field] = row[field] / row['ran'] if row['ran'] else 0.0
+    return sorted(rows.values(), key=lambda row: -(row['download_seconds'] + row['install_seconds']))
+
+
+def format_report(results: List[PackageResult]) -> str:
+    """
+    The summary as a plain-text table, with totals per stage.
+    """
+    rows = summarize(results)
+    runs = len({result.run for result in results})
+    lines = [f"{len(results)} package results from {runs} runs", ""]
+    header = f"{'program':30} {'runs':>4} {'ok':>4} {'fail':>4} {'skip':>4} " \
+             f"{'queue s':>8} {'download s':>10} {'install s':>9} {'MB':>8}  last error"
+    lines.append(header)
+    lines.append('-' * len(header))
+    for row in rows:
+        lines.append(
+            f"{row['program'][:30]:30} {row['runs']:4} {row['installed']:4} {row['failed']:4} {row['skipped']:4} "
+            f"{row['queue_seconds']:8.1f} {row['download_seconds']:10.1f} {row['install_seconds']:9.1f} "
+            f"{row['bytes_transferred'] / MEBIBYTE:8.1f}  {row['last_error']}"
+        )
+    totals = {stage: sum(getattr(result, f'{stage}_seconds') for result in results)
+              for stage in ('queue', 'download', 'install')}
+    lines.append("")
+    lines.append("time spent: " + ", ".join(f"{stage} {seconds:.1f} s" for stage, seconds in totals.items()))
+    return '\n'.join(lines)
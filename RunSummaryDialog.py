@@ -0,0 +1,85 @@
+from typing import List
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon
+from RunLog import PackageResult, MEBIBYTE
+from Style import *
+
+COLUMNS = ("Program", "Source", "Status", "Queue s", "Download s", "Install s", "MB", "Error")
+
+
+class NumericItem(QTableWidgetItem):
+    """
+    Table cell that sorts by its number rather than its text.
+    """
+
+    def __init__(self, value: float, decimals: int = 1):
+        super().__init__(f"{value:.{decimals}f}")
+        self.value = value
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, other: QTableWidgetItem) -> bool:
+        if isinstance(other, NumericItem):
+            return self.value < other.value
+        return super().__lt__(other)
+
+
+class RunSummaryDialog(QDialog):
+    """
+    Per-package results of the installation that just finished: outcome,
+    where the time went and what was downloaded. Columns sort on click;
+    the full message is in each row's tooltip.
+    """
+
+    def __init__(self, records: List[PackageResult], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Replicator - Installation Summary")
+        self.setWindowIcon(QIcon("./Replicator Logo.png"))
+        self.resize(760, 400)
+        self.setStyleSheet("""
+QDialog {
+    background-color: #222831;
+}
+
+QLabel {
+    color: #CC784E;
+}
+
+QTableWidget {
+    background-color: #0b0907;
+    color: #ea560a;
+    border: 1px solid #ea560a;
+}
+        """)
+
+        layout = QVBoxLayout(self)
+        failed = sum(1 for record in records if record.status == 'failed')
+        seconds = sum(record.download_seconds + record.install_seconds for record in records)
+        layout.addWidget(QLabel(f"{len(records)} programs, {failed} failed, {seconds:.1f} s downloading and installing"))
+
+        table = QTableWidget(len(records), len(COLUMNS), self)
+        table.setHorizontalHeaderLabels(COLUMNS)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        for row, record in enumerate(records):
+            cells = (
+                QTableWidgetItem(record.program),
+                QTableWidgetItem(record.source),
+                QTableWidgetItem(record.status),
+                NumericItem(record.queue_seconds),
+                NumericItem(record.download_seconds),
+                NumericItem(record.install_seconds),
+                NumericItem(record.bytes_transferred / MEBIBYTE),
+                QTableWidgetItem(record.error_class or ""),
+            )
+            for column, cell in enumerate(cells):
+                cell.setToolTip(record.message)
+                table.setItem(row, column, cell)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.setSortingEnabled(True)
+        layout.addWidget(table)
+
+        close_button = QPushButton("Close", self)
+        close_button.setStyleSheet(butten_style())
+        close_button.clicked.connect(self.accept)
+        layout.addWidget(close_button, alignment=Qt.AlignRight)
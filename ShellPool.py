@@ -0,0 +1,354 @@
+"""
+Long-lived shell sessions that run commands sent over stdin, so a command
+does not pay for starting a shell (or PowerShell) of its own.
+
+Each command is followed by a line that prints a marker with a random token
+and the command's exit code; everything the session prints before the
+marker is the command's output, passed on in chunks as it arrives.
+Commands run with stdin closed and stderr redirected to a per-session file.
+
+A session that dies, or is killed because a command timed out or was
+cancelled, is replaced by a fresh one the next time the pool hands it out.
+"""
+
+import atexit
+import base64
+import os
+import queue
+import re
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+READ_SIZE = 64 * 1024
+
+MARKER = b'@@replicator-exit:'
+
+# Seconds a new session has to answer its first (empty) command
+STARTUP_TIMEOUT = 15
+
+
+class ShellSessionError(OSError):
+    """
+    The session died, or never answered, while running a command.
+    """
+
+
+class ShDialect:
+    """
+    POSIX sh.
+    """
+
+    name = 'sh'
+    argv = ['sh']
+    encoding = 'utf-8'
+
+    @staticmethod
+    def can_run(command: List[str]) -> bool:
+        return True
+
+    @staticmethod
+    def command_line(command: List[str]) -> str:
+        return ' '.join(shlex.quote(argument) for argument in command)
+
+    @staticmethod
+    def frame(command_line: str, marker: str, stderr_path: str) -> str:
+        run = f"{command_line} 2>{shlex.quote(stderr_path)} </dev/null; " if command_line else ""
+        return run + f"printf '%s %d\\n' {shlex.quote(marker)} \"$?\"\n"
+
+
+class CmdDialect:
+    """
+    cmd.exe with echo off, so it prints neither prompts nor the commands.
+    Native programs write straight to the pipe, which keeps in-place
+    progress bars intact.
+    """
+
+    name = 'cmd'
+    argv = ['cmd.exe', '/d', '/q']
+    encoding = 'oem'
+
+    @staticmethod
+    def can_run(command: List[str]) -> bool:
+        # Inside double quotes only % (expansion), " and line breaks are still special
+        return not any(character in argument for argument in command for character in '%"\r\n')
+
+    @staticmethod
+    def command_line(command: List[str]) -> str:
+        # Backslashes before the closing quote are doubled so they do not escape it
+        return ' '.join('"' + re.sub(r'(\\+)$', r'\1\1', argument) + '"' for argument in command)
+
+    @staticmethod
+    def frame(command_line: str, marker: str, stderr_path: str) -> str:
+        # %errorlevel% is expanded when a line is read, so the echo needs a line of its own
+        run = f'{command_line} 2>"{stderr_path}" <NUL\n' if command_line else ""
+        return run + f"echo {marker} %errorlevel%\n"
+
+
+class PowerShellDialect:
+    """
+    Windows PowerShell reading commands from stdin. Besides argument lists it
+    runs whole scripts, sent as one base64 line.
+    """
+
+    name = 'powershell'
+    argv = ['powershell', '-NoLogo', '-NoProfile', '-NonInteractive', '-ExecutionPolicy', 'Bypass',
+            '-Command', '-']
+    encoding = 'utf-8'
+
+    @staticmethod
+    def can_run(command: List[str]) -> bool:
+        return not any('\n' in argument or '\r' in argument for argument in command)
+
+    @staticmethod
+    def quote(text: str) -> str:
+        return "'" + text.replace("'", "''") + "'"
+
+    @classmethod
+    def command_line(cls, command: List[str]) -> str:
+        return '& ' + ' '.join(cls.quote(argument) for argument in command)
+
+    @classmethod
+    def script_line(cls, script: str) -> str:
+        encoded = base64.b64encode(script.encode('utf-8')).decode('ascii')
+        return f"Invoke-Expression ([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{encoded}')))"
+
+    @classmethod
+    def frame(cls, command_line: str, marker: str, stderr_path: str) -> str:
+        path = cls.quote(stderr_path)
+        return (
+            f"$global:LASTEXITCODE = 0; $code = 0; [IO.File]::WriteAllText({path}, ''); "
+            f"try {{ {command_line or '$null'} | Out-String -Stream | ForEach-Object {{ [Console]::Out.WriteLine($_) }}; "
+            f"$code = $global:LASTEXITCODE }} "
+            f"catch {{ [IO.File]::WriteAllText({path}, \"$_\"); $code = 1 }}; "
+            f"[Console]::Out.WriteLine({cls.quote(marker)} + ' ' + $code); [Console]::Out.Flush()\n"
+        )
+
+
+def default_dialect():
+    return CmdDialect if os.name == 'nt' else ShDialect
+
+
+class ShellSession:
+    """
+    One shell process running commands one after another.
+    """
+
+    def __init__(self, dialect=None):
+        self.dialect = dialect or default_dialect()
+        self.process: Optional[subprocess.Popen] = None
+        # Set by kill(): a killed shell counts as dead before it has been reaped
+        self._killed = False
+        self._chunks: queue.Queue = queue.Queue()
+        fd, self.stderr_path = tempfile.mkstemp(prefix=f'replicator-{self.dialect.name}-', suffix='.err')
+        os.close(fd)
+        # Unregistered by close(), so closed sessions are not kept until exit
+        atexit.register(self.close)
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and not self._killed and self.process.poll() is None
+
+    def start(self) -> None:
+        """
+        Start the shell and wait for it to answer an empty command.
+        """
+        # Its own process group on POSIX, so kill() takes the running command down too
+        self.process = subprocess.Popen(
+            self.dialect.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            start_new_session=os.name != 'nt'
+        )
+        self._killed = False
+        self._chunks = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process, self._chunks), daemon=True).start()
+        try:
+            self._run_line("", None, STARTUP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise ShellSessionError(f"{self.dialect.name} session did not answer within {STARTUP_TIMEOUT} s")
+
+    @staticmethod
+    def _read(process: subprocess.Popen, chunks: queue.Queue) -> None:
+        while True:
+            chunk = process.stdout.read1(READ_SIZE)
+            if not chunk:
+                chunks.put(None)
+                return
+            chunks.put(chunk)
+
+    def run(self, command: List[str], on_output: Optional[Callable[[bytes], None]] = None,
+            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run an argument list. Output chunks go to on_output as they arrive;
+        the returned stdout is everything (as bytes), stderr is text.
+        Raises subprocess.TimeoutExpired (after killing the session) on timeout.
+        """
+        return self._run_line(self.dialect.command_line(command), on_output, timeout, command)
+
+    def run_script(self, script: str, on_output: Optional[Callable[[bytes], None]] = None,
+                   timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run a whole PowerShell script in the session.
+        """
+        return self._run_line(self.dialect.script_line(script), on_output, timeout, script)
+
+    def _run_line(self, command_line: str, on_output: Optional[Callable[[bytes], None]],
+                  timeout: Optional[float], args=None) -> subprocess.CompletedProcess:
+        if not self.alive:
+            raise ShellSessionError(f"{self.dialect.name} session is not running")
+        # Anything printed after the last marker (e.g. by a straggling child) is not ours
+        while not self._chunks.empty():
+            if self._chunks.get_nowait() is None:
+                raise ShellSessionError(f"{self.dialect.name} session exited")
+        marker = MARKER + uuid.uuid4().hex.encode('ascii')
+        try:
+            self.process.stdin.write(self.dialect.frame(command_line, marker.decode('ascii'), self.stderr_path)
+                                     .encode(self.dialect.encoding))
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise ShellSessionError(f"{self.dialect.name} session is not accepting commands: {e}")
+
+        deadline = time.monotonic() + timeout if timeout else None
+        output: List[bytes] = []
+        pending = b''
+        while True:
+            remaining = deadline - time.monotonic() if deadline else None
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                chunk = self._chunks.get(timeout=remaining)
+            except queue.Empty:
+                self.kill()
+                raise subprocess.TimeoutExpired(args or command_line, timeout)
+            if chunk is None:
+                raise ShellSessionError(f"{self.dialect.name} session exited while running a command")
+            pending += chunk
+            index = pending.find(marker)
+            if index < 0:
+                # Hold back what could be the start of a marker split across chunks
+                keep = len(marker) - 1
+                ready, pending = pending[:-keep], pending[-keep:]
+                if ready:
+                    output.append(ready)
+                    if on_output:
+                        on_output(ready)
+                continue
+            end = pending.find(b'\n', index)
+            if end < 0:
+                continue
+            if pending[:index]:
+                output.append(pending[:index])
+                if on_output:
+                    on_output(pending[:index])
+            returncode = int(pending[index + len(marker):end].strip() or 0)
+            break
+
+        try:
+            with open(self.stderr_path, 'r', encoding='utf-8', errors='replace') as f:
+                stderr = f.read()
+        except OSError:
+            stderr = ""
+        return subprocess.CompletedProcess(args or command_line, returncode, b''.join(output), stderr)
+
+    def kill(self) -> None:
+        """
+        Kill the shell and whatever it is running; safe from any thread.
+        """
+        if not self.alive:
+            return
+        self._killed = True
+        try:
+            if os.name == 'nt':
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(self.process.pid)], capture_output=True)
+            else:
+                os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            self.process.kill()
+
+    def close(self) -> None:
+        if self.process is not None:
+            if self.alive:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=2)
+                except (OSError, subprocess.TimeoutExpired):
+                    self.kill()
+            self.process = None
+        if os.path.exists(self.stderr_path):
+            os.remove(self.stderr_path)
+        atexit.unregister(self.close)
+
+
+class ShellPool:
+    """
+    Up to size sessions shared by concurrent callers; acquire() blocks while
+    they are all busy. Sessions start on first use and are restarted when
+    they die. If a session cannot even be started, the pool stops offering
+    itself (supports() is False) and callers run commands directly.
+    """
+
+    def __init__(self, size: int, dialect=None):
+        self.size = max(1, size)
+        self.dialect = dialect or default_dialect()
+        self.broken = False
+        # Sessions started so far, including restarts
+        self.started = 0
+        self._idle: List[ShellSession] = []
+        self._slots = threading.Semaphore(self.size)
+        self._lock = threading.Lock()
+        self._sessions: List[ShellSession] = []
+
+    def supports(self, command: List[str]) -> bool:
+        return not self.broken and self.dialect.can_run(command)
+
+    def acquire(self) -> ShellSession:
+        self._slots.acquire()
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            if session is not None and not session.alive:
+                # Died while idle; a new one takes its place
+                self._sessions.remove(session)
+            elif session is not None:
+                return session
+        if session is not None:
+            session.close()
+        session = ShellSession(self.dialect)
+        try:
+            session.start()
+        except OSError:
+            session.close()
+            self.broken = True
+            self._slots.release()
+            raise
+        with self._lock:
+            self._sessions.append(session)
+            self.started += 1
+        return session
+
+    def release(self, session: ShellSession) -> None:
+        with self._lock:
+            if session.alive:
+                self._idle.append(session)
+            else:
+                if session in self._sessions:
+                    self._sessions.remove(session)
+                session.close()
+        self._slots.release()
+
+    def run(self, command: List[str], on_output: Optional[Callable[[bytes], None]] = None,
+            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        session = self.acquire()
+        try:
+            return session.run(command, on_output, timeout)
+        finally:
+            self.release(session)
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions, self._idle = self._sessions, [], []
+        for session in sessions:
+            session.close()
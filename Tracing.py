@@ -0,0 +1,211 @@
+"""
+Timeline tracing for whole provisioning runs, saved in the Chrome trace
+event format (open the file in https://ui.perfetto.dev or chrome://tracing).
+
+Tracing is off unless start_tracing() is called; until then span() hands
+back one shared do-nothing context manager, so instrumented code pays a
+global lookup and a call per span.
+
+    with Tracing.span("load catalog", "catalog"):
+        ...
+
+Spans are recorded per thread. Work that overlaps on one thread (asyncio
+tasks) names a track instead, and every track gets a row of its own in the
+timeline, e.g. one per package.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Events kept per run; anything after that is counted and dropped
+MAX_EVENTS = 1_000_000
+
+
+class _NoSpan:
+    """
+    What span() returns while tracing is off.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **args) -> None:
+        return None
+
+
+NO_SPAN = _NoSpan()
+
+
+class Span:
+    """
+    One timed interval; becomes a complete ("X") event when it ends.
+    Arguments added with set() while it runs are shown with it.
+    """
+
+    __slots__ = ('tracer', 'name', 'category', 'track', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, track: Optional[str], args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.track = track
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.complete(self.name, self.category, self.start, time.perf_counter_ns(), self.track, self.args)
+
+    def set(self, **args) -> None:
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Collects trace events in memory until save().
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self.events: List[Dict] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._tids: Dict[object, int] = {}
+        # Track rows are numbered apart from thread ids
+        self._track_ids = itertools.count(1_000_000)
+
+    def _tid(self, track: Optional[str]) -> int:
+        key = track if track is not None else threading.get_ident()
+        tid = self._tids.get(key)
+        if tid is None:
+            with self._lock:
+                tid = self._tids.get(key)
+                if tid is None:
+                    if track is not None:
+                        tid, name = next(self._track_ids), track
+                    else:
+                        tid, name = threading.get_native_id(), threading.current_thread().name
+                    self._tids[key] = tid
+                    self.events.append({'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid,
+                                        'args': {'name': name}})
+        return tid
+
+    def _add(self, event: Dict) -> None:
+        # list.append is atomic, so recording threads do not take the lock
+        if len(self.events) < MAX_EVENTS:
+            self.events.append(event)
+        else:
+            self.dropped += 1
+
+    def complete(self, name: str, category: str, start_ns: int, end_ns: int,
+                 track: Optional[str] = None, args: Optional[Dict] = None) -> None:
+        self._add({
+            'ph': 'X', 'name': name, 'cat': category, 'pid': self.pid, 'tid': self._tid(track),
+            'ts': (start_ns - self.origin) / 1000, 'dur': (end_ns - start_ns) / 1000,
+            'args': args or {},
+        })
+
+    def instant(self, name: str, category: str, track: Optional[str] = None, args: Optional[Dict] = None) -> None:
+        self._add({
+            'ph': 'i', 's': 't', 'name': name, 'cat': category, 'pid': self.pid, 'tid': self._tid(track),
+            'ts': (time.perf_counter_ns() - self.origin) / 1000, 'args': args or {},
+        })
+
+    def counter(self, name: str, values: Dict[str, float]) -> None:
+        self._add({
+            'ph': 'C', 'name': name, 'pid': self.pid, 'tid': 0,
+            'ts': (time.perf_counter_ns() - self.origin) / 1000, 'args': values,
+        })
+
+    def to_dict(self) -> Dict:
+        return {
+            'traceEvents': list(self.events),
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped_events': self.dropped},
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f)
+        except OSError as e:
+            print(f"Error writing trace {path}: {e}")
+
+
+_tracer: Optional[Tracer] = None
+
+
+def start_tracing(path: Optional[str] = None) -> Tracer:
+    """
+    Start recording. With a path, the trace is written there at exit (or
+    by stop_tracing()).
+    """
+    global _tracer
+    _tracer = Tracer(path)
+    if path:
+        atexit.register(stop_tracing)
+    return _tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """
+    Stop recording and save the trace, if it has a path.
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer:
+        tracer.save()
+    return tracer
+
+
+def tracing() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, category: str = "", track: Optional[str] = None, **args):
+    """
+    Context manager timing the code it wraps.
+    """
+    if _tracer is None:
+        return NO_SPAN
+    return Span(_tracer, name, category, track, args)
+
+
+def interval(name: str, category: str, start: float, end: float, track: Optional[str] = None, **args) -> None:
+    """
+    Record a span measured elsewhere, from time.perf_counter() readings.
+    """
+    if _tracer is not None:
+        _tracer.complete(name, category, int(start * 1e9), int(end * 1e9), track, args)
+
+
+def instant(name: str, category: str = "", track: Optional[str] = None, **args) -> None:
+    if _tracer is not None:
+        _tracer.instant(name, category, track, args)
+
+
+def counter(name: str, **values: float) -> None:
+    if _tracer is not None:
+        _tracer.counter(name, values)
@@ -0,0 +1,365 @@
+"""
+Applying tweaks: all checked tweaks are compiled into one PowerShell script
+and run in a single elevated session, instead of one process (and one UAC
+prompt) per tweak.
+
+Before that, the current state of every tweak is read with one probe script
+(no elevation needed), and only the tweaks that are not already in place are
+applied. On a machine that is already set up nothing is elevated at all.
+
+Backends:
+    PowerShellBackend     runs the compiled script; the real thing, Windows only
+    FakeRegistryBackend   an in-memory registry, for trying the engine on any OS
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from ShellPool import PowerShellDialect, ShellSession
+from Tweaks import Tweak, TweakAction, TweakCatalog, REGISTRY, COMMAND, REGISTRY_TYPES
+import Tracing
+
+POWERSHELL_EXE = 'powershell'
+
+HIVES = {
+    'HKCU': 'HKEY_CURRENT_USER',
+    'HKLM': 'HKEY_LOCAL_MACHINE',
+    'HKCR': 'HKEY_CLASSES_ROOT',
+    'HKU': 'HKEY_USERS',
+}
+
+
+def powershell_quote(text: str) -> str:
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def registry_path(key: str) -> str:
+    """
+    A registry key as a PowerShell provider path: HKCU\\Software -> Registry::HKEY_CURRENT_USER\\Software.
+    """
+    hive, _, rest = key.partition('\\')
+    return f"Registry::{HIVES.get(hive.upper(), hive)}\\{rest}"
+
+
+def powershell_value(action: TweakAction) -> str:
+    if action.value_type in ('DWORD', 'QWORD'):
+        return str(int(action.value))
+    if action.value_type == 'MultiString':
+        return '@(' + ', '.join(powershell_quote(item) for item in action.value) + ')'
+    return powershell_quote(action.value)
+
+
+def action_script(action: TweakAction) -> List[str]:
+    """
+    PowerShell lines performing one action; they throw on failure.
+    """
+    if action.kind == REGISTRY:
+        path = powershell_quote(registry_path(action.target))
+        lines = [f"if (-not (Test-Path {path})) {{ New-Item -Path {path} -Force | Out-Null }}"]
+        if action.name:
+            lines.append(f"New-ItemProperty -Path {path} -Name {powershell_quote(action.name)} "
+                         f"-PropertyType {REGISTRY_TYPES[action.value_type]} "
+                         f"-Value {powershell_value(action)} -Force | Out-Null")
+        else:
+            # The key's (Default) value
+            lines.append(f"Set-Item -Path {path} -Value {powershell_value(action)}")
+        return lines
+    if action.kind == COMMAND:
+        return [
+            "& " + ' '.join(powershell_quote(argument) for argument in action.target),
+            f"if ($LASTEXITCODE -ne 0) {{ throw ({powershell_quote(action.target[0] + ' exited with ')} + $LASTEXITCODE) }}",
+        ]
+    return [action.target]
+
+
+def compile_script(tweaks: List[Tweak], results_path: str) -> str:
+    """
+    One script applying every tweak in order. Each tweak is its own
+    try/catch, so one failure does not stop the rest; the outcome of each
+    is written to results_path as "id|" or "id|error message".
+    """
+    lines = [
+        "$ErrorActionPreference = 'Stop'",
+        "$results = New-Object System.Collections.Generic.List[string]",
+    ]
+    for tweak in tweaks:
+        lines.append(f"# {tweak.name}")
+        lines.append("try {")
+        for action in tweak.actions:
+            lines.extend("    " + line for line in action_script(action))
+        lines.append(f"    $results.Add({powershell_quote(tweak.id + '|')})")
+        lines.append("} catch {")
+        lines.append(f"    $results.Add({powershell_quote(tweak.id + '|')} + ($_.Exception.Message -replace '\\s+', ' '))")
+        lines.append("}")
+    lines.append(f"$results | Set-Content -Path {powershell_quote(results_path)} -Encoding UTF8")
+    return '\n'.join(lines) + '\n'
+
+
+def probe_expression(tweak: Tweak) -> str:
+    """
+    A PowerShell expression that is $true when every action of tweak is in place.
+    """
+    checks = [
+        f"(Test-RegistryValue {powershell_quote(registry_path(action.target))} "
+        f"{powershell_quote(action.name or '(default)')} {powershell_value(action)})"
+        for action in tweak.registry_actions
+    ]
+    if tweak.probe:
+        checks.append(f"[bool]({tweak.probe})")
+    return ' -and '.join(checks)
+
+
+def compile_probe_script(tweaks: List[Tweak]) -> str:
+    """
+    One script reading the state of every tweak; it prints a JSON object of
+    id -> true/false, or null where the probe itself failed.
+    """
+    lines = [
+        "$ErrorActionPreference = 'Stop'",
+        "function Test-RegistryValue($Path, $Name, $Expected) {",
+        "    try { $actual = Get-ItemPropertyValue -Path $Path -Name $Name } catch { return $false }",
+        "    return \"$actual\" -eq \"$Expected\"",
+        "}",
+        "$state = [ordered]@{}",
+    ]
+    for tweak in tweaks:
+        if tweak.probeable:
+            lines.append(f"try {{ $state[{powershell_quote(tweak.id)}] = {probe_expression(tweak)} }} "
+                         f"catch {{ $state[{powershell_quote(tweak.id)}] = $null }}")
+    lines.append("$state | ConvertTo-Json -Compress")
+    return '\n'.join(lines) + '\n'
+
+
+def is_elevated() -> bool:
+    try:
+        import ctypes
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    except (AttributeError, OSError):
+        return False
+
+
+class TweakBackend(ABC):
+    """
+    Where tweaks are applied. apply() gets every tweak of a run at once and
+    returns tweak id -> error message ("" when it was applied); probe()
+    likewise returns tweak id -> whether it is already in place, None when
+    that cannot be told.
+    """
+
+    @abstractmethod
+    def probe(self, tweaks: List[Tweak]) -> Dict[str, Optional[bool]]:
+        ...
+
+    @abstractmethod
+    def apply(self, tweaks: List[Tweak]) -> Dict[str, str]:
+        ...
+
+
+class PowerShellBackend(TweakBackend):
+    """
+    Runs the compiled script in one PowerShell process, elevated with a
+    single UAC prompt when Replicator itself is not running as admin.
+
+    Probes, which need no elevation, run in a PowerShell session that is
+    kept open, so probing again (and applying, when already elevated) does
+    not start PowerShell again.
+    """
+
+    def __init__(self, elevate: bool = True):
+        self.elevate = elevate
+        self._session: Optional[ShellSession] = None
+
+    def _run_in_session(self, script: str) -> subprocess.CompletedProcess:
+        if self._session is None or not self._session.alive:
+            self._session = ShellSession(PowerShellDialect)
+            self._session.start()
+        return self._session.run_script(script)
+
+    def probe(self, tweaks: List[Tweak]) -> Dict[str, Optional[bool]]:
+        state: Dict[str, Optional[bool]] = {tweak.id: None for tweak in tweaks}
+        try:
+            process = self._run_in_session(compile_probe_script(tweaks))
+            probed = json.loads(process.stdout.decode('utf-8', errors='replace') or '{}')
+        except (OSError, ValueError) as e:
+            print(f"Could not read the current tweak state: {e}")
+            return state
+        for tweak_id, applied in probed.items():
+            if tweak_id in state and applied is not None:
+                state[tweak_id] = bool(applied)
+        return state
+
+    def apply(self, tweaks: List[Tweak]) -> Dict[str, str]:
+        directory = tempfile.mkdtemp(prefix='replicator-tweaks-')
+        script_path = os.path.join(directory, 'tweaks.ps1')
+        results_path = os.path.join(directory, 'results.txt')
+        script = compile_script(tweaks, results_path)
+
+        try:
+            if self.elevate and not is_elevated():
+                # The BOM makes Windows PowerShell read the script as UTF-8
+                with open(script_path, 'w', encoding='utf-8-sig') as f:
+                    f.write(script)
+                # An elevated process cannot share our console, so results come back through the file
+                arguments = ['-NoProfile', '-ExecutionPolicy', 'Bypass', '-File', script_path]
+                subprocess.run(
+                    [POWERSHELL_EXE, '-NoProfile', '-Command',
+                     f"Start-Process {POWERSHELL_EXE} -Verb RunAs -Wait -WindowStyle Hidden "
+                     f"-ArgumentList {powershell_quote(subprocess.list2cmdline(arguments))}"],
+                    capture_output=True, text=True
+                )
+            else:
+                self._run_in_session(script)
+            with open(results_path, 'r', encoding='utf-8-sig') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            return {tweak.id: f"could not run PowerShell: {e}" for tweak in tweaks}
+        finally:
+            for path in (script_path, results_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            os.rmdir(directory)
+
+        results = {tweak.id: "the tweak script did not run (elevation declined?)" for tweak in tweaks}
+        for line in lines:
+            tweak_id, _, error = line.partition('|')
+            if tweak_id in results:
+                results[tweak_id] = error.strip()
+        return results
+
+
+class FakeRegistryBackend(TweakBackend):
+    """
+    An in-memory registry. Registry actions change values; commands and
+    PowerShell lines are only recorded, and a tweak's probe counts as $true
+    once the tweak has been applied. session_latency stands in for starting
+    a PowerShell, once per apply() or probe() call.
+    """
+
+    def __init__(self, values: Optional[Dict[Tuple[str, str], Tuple[str, object]]] = None,
+                 session_latency: float = 0.0, failing: Tuple[str, ...] = ()):
+        # (key, value name), both lowercased as the registry ignores case -> (type, value)
+        self.values: Dict[Tuple[str, str], Tuple[str, object]] = dict(values or {})
+        self.session_latency = session_latency
+        # Tweak ids whose actions fail, to exercise error reporting
+        self.failing = set(failing)
+        self.commands: List = []
+        # Tweaks whose probe now holds
+        self.probes_passing = set()
+        # Elevated apply() sessions and probe() queries so far
+        self.sessions = 0
+        self.queries = 0
+
+    @staticmethod
+    def key(path: str, name: str) -> Tuple[str, str]:
+        hive, _, rest = path.partition('\\')
+        return f"{HIVES.get(hive.upper(), hive.upper())}\\{rest}".lower(), name.lower()
+
+    def get(self, path: str, name: str):
+        entry = self.values.get(self.key(path, name))
+        return entry[1] if entry else None
+
+    def probe(self, tweaks: List[Tweak]) -> Dict[str, Optional[bool]]:
+        self.queries += 1
+        if self.session_latency:
+            time.sleep(self.session_latency)
+        state: Dict[str, Optional[bool]] = {}
+        for tweak in tweaks:
+            if not tweak.probeable:
+                state[tweak.id] = None
+                continue
+            state[tweak.id] = (
+                all(self.get(action.target, action.name) == action.value for action in tweak.registry_actions)
+                and (not tweak.probe or tweak.id in self.probes_passing)
+            )
+        return state
+
+    def apply(self, tweaks: List[Tweak]) -> Dict[str, str]:
+        self.sessions += 1
+        if self.session_latency:
+            time.sleep(self.session_latency)
+        results: Dict[str, str] = {}
+        for tweak in tweaks:
+            if tweak.id in self.failing:
+                results[tweak.id] = "Access is denied."
+                continue
+            for action in tweak.actions:
+                if action.kind == REGISTRY:
+                    self.values[self.key(action.target, action.name)] = (action.value_type, action.value)
+                else:
+                    self.commands.append(action.target)
+            if tweak.probe:
+                self.probes_passing.add(tweak.id)
+            results[tweak.id] = ""
+        return results
+
+
+def default_backend() -> TweakBackend:
+    """
+    PowerShell, unless REPLICATOR_TWEAK_BACKEND=fake asks for the in-memory registry.
+    """
+    if os.environ.get('REPLICATOR_TWEAK_BACKEND') == 'fake':
+        return FakeRegistryBackend()
+    return PowerShellBackend()
+
+
+class TweakEngine:
+    """
+    Applies a list of tweaks, by id or display name: one probe query for
+    all of them, then one backend session for those not already in place.
+    """
+
+    def __init__(self, catalog: Optional[TweakCatalog] = None, backend: Optional[TweakBackend] = None):
+        self.catalog = catalog or TweakCatalog()
+        self.backend = backend or default_backend()
+        # Tweaks the last apply() found already in place
+        self.unchanged = 0
+
+    def probe(self, tweaks: Optional[List[str]] = None) -> Dict[str, Optional[bool]]:
+        """
+        Current state of the given tweaks (all of them by default), by id.
+        """
+        resolved = [self.catalog.get(tweak) for tweak in tweaks] if tweaks is not None \
+            else list(self.catalog.tweaks.values())
+        batch = list({tweak.id: tweak for tweak in resolved if tweak is not None}.values())
+        if not batch:
+            return {}
+        with Tracing.span("probe tweaks", "tweaks", tweaks=len(batch)):
+            return self.backend.probe(batch)
+
+    def apply(self, tweaks: List[str], force: bool = False) -> List[str]:
+        """
+        Returns one message per requested tweak, in order. With force every
+        tweak is applied, whatever its current state.
+        """
+        resolved = {tweak: self.catalog.get(tweak) for tweak in tweaks}
+        wanted: Dict[str, Tweak] = {}
+        for tweak in resolved.values():
+            if tweak is not None:
+                wanted.setdefault(tweak.id, tweak)
+        state: Dict[str, Optional[bool]] = {}
+        if wanted and not force:
+            with Tracing.span("probe tweaks", "tweaks", tweaks=len(wanted)):
+                state = self.backend.probe(list(wanted.values()))
+        batch = [tweak for tweak in wanted.values() if state.get(tweak.id) is not True]
+        errors: Dict[str, str] = {}
+        if batch:
+            with Tracing.span("apply tweaks", "tweaks", tweaks=[tweak.id for tweak in batch]) as span:
+                errors = self.backend.apply(batch)
+                span.set(failed=sum(1 for error in errors.values() if error))
+        self.unchanged = len(wanted) - len(batch)
+
+        results = []
+        for requested, tweak in resolved.items():
+            if tweak is None:
+                results.append(f"Unknown tweak {requested}")
+            elif state.get(tweak.id) is True:
+                results.append(f"Already applied {tweak.name}")
+            elif errors.get(tweak.id):
+                results.append(f"Failed to apply {tweak.name}: {errors[tweak.id]}")
+            else:
+                results.append(f"Applied {tweak.name}")
+        return results
@@ -0,0 +1,25 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from TweakEngine import TweakEngine
+from typing import List, Optional
+
+class TweakThread(QThread):
+    """
+    Reads or applies tweaks off the GUI thread. Without a list of tweaks it
+    only probes the current state of every tweak; with one, the engine
+    applies those not already in place in one elevated session, so there is
+    at most a single UAC prompt however many are checked.
+    """
+
+    tweaks_probed = pyqtSignal(dict)
+    tweaks_applied = pyqtSignal(list)
+
+    def __init__(self, tweak_engine: TweakEngine, tweaks: Optional[List[str]] = None):
+        super().__init__()
+        self.tweak_engine = tweak_engine
+        self.tweaks = tweaks
+
+    def run(self):
+        if self.tweaks is None:
+            self.tweaks_probed.emit(self.tweak_engine.probe())
+        else:
+            self.tweaks_applied.emit(self.tweak_engine.apply(self.tweaks))
@@ -0,0 +1,129 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+# Action kinds, named by the key that carries their target in tweaks.json
+REGISTRY = 'registry'
+COMMAND = 'command'
+POWERSHELL = 'powershell'
+
+# Registry value types tweaks.json may use, with PowerShell's name for each
+REGISTRY_TYPES = {
+    'DWORD': 'DWord',
+    'QWORD': 'QWord',
+    'String': 'String',
+    'ExpandString': 'ExpandString',
+    'MultiString': 'MultiString',
+}
+
+
+class TweakAction:
+    """
+    One step of a tweak: set a registry value, run a command, or run a
+    line of PowerShell.
+
+    In tweaks.json:
+        {"registry": "HKCU\\...", "name": "HideFileExt", "type": "DWORD", "value": 0}
+        {"command": ["powercfg", "/hibernate", "off"]}
+        {"powershell": "Set-MpPreference -PUAProtection Enabled"}
+    """
+
+    def __init__(self, kind: str, target, name: str = "", value_type: str = "", value=None):
+        self.kind = kind
+        # Registry key path, command argument list or PowerShell text
+        self.target = target
+        self.name = name
+        self.value_type = value_type
+        self.value = value
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TweakAction':
+        if REGISTRY in data:
+            value_type = data.get('type', 'DWORD')
+            if value_type not in REGISTRY_TYPES:
+                raise ValueError(f"unknown registry value type {value_type!r}")
+            return cls(REGISTRY, data[REGISTRY], data.get('name', ""), value_type, data['value'])
+        if COMMAND in data:
+            return cls(COMMAND, list(data[COMMAND]))
+        if POWERSHELL in data:
+            return cls(POWERSHELL, data[POWERSHELL])
+        raise ValueError(f"action has none of {REGISTRY}, {COMMAND} or {POWERSHELL}")
+
+
+class Tweak:
+    """
+    A named system change, made of one or more actions.
+
+    Whether it is already in place is read back from its registry values;
+    tweaks with command or PowerShell actions also need a probe, a
+    PowerShell expression that is $true once those actions have taken effect.
+    """
+
+    def __init__(self, tweak_id: str, name: str, category: str, description: str,
+                 actions: List[TweakAction], probe: str = ""):
+        self.id = tweak_id
+        self.name = name
+        self.category = category
+        self.description = description
+        self.actions = actions
+        self.probe = probe
+
+    @property
+    def registry_actions(self) -> List[TweakAction]:
+        return [action for action in self.actions if action.kind == REGISTRY]
+
+    @property
+    def probeable(self) -> bool:
+        return bool(self.probe) or len(self.registry_actions) == len(self.actions)
+
+
+class TweakCatalog:
+    """
+    Every tweak Replicator knows, loaded from tweaks.json (same layout as
+    applications.json: id -> content, category, description, actions and
+    an optional probe).
+    """
+
+    def __init__(self, tweaks_path: str = './tweaks.json'):
+        self.tweaks_path = tweaks_path
+        self.tweaks: Dict[str, Tweak] = {}
+        for tweak_id, data in self._read().items():
+            try:
+                actions = [TweakAction.from_dict(action) for action in data['actions']]
+                tweak = Tweak(tweak_id, data['content'], data.get('category') or "Other",
+                              data.get('description', ""), actions, data.get('probe', ""))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping tweak {tweak_id}: {e}")
+                continue
+            if not tweak.probeable:
+                print(f"Tweak {tweak_id} has no probe; it will be applied every time")
+            self.tweaks[tweak_id] = tweak
+
+        self.ids_by_name: Dict[str, str] = {tweak.name: tweak_id for tweak_id, tweak in self.tweaks.items()}
+        categories: Dict[str, List[str]] = {}
+        for tweak_id, tweak in self.tweaks.items():
+            categories.setdefault(tweak.category, []).append(tweak_id)
+        self.categories: Dict[str, Tuple[str, ...]] = {
+            category: tuple(ids) for category, ids in categories.items()
+        }
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.tweaks_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"{self.tweaks_path} not found. No tweaks are available.")
+        except json.JSONDecodeError as e:
+            print(f"Error decoding {self.tweaks_path}: {e}")
+        return {}
+
+    def resolve_tweak_id(self, tweak: str) -> Optional[str]:
+        """
+        Resolve a tweak id or display name to its id.
+        """
+        if tweak in self.tweaks:
+            return tweak
+        return self.ids_by_name.get(tweak)
+
+    def get(self, tweak: str) -> Optional[Tweak]:
+        tweak_id = self.resolve_tweak_id(tweak)
+        return self.tweaks[tweak_id] if tweak_id else None
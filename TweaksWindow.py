@@ -1,7 +1,11 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QCheckBox, QPushButton, QScrollArea)
+                             QLabel, QCheckBox, QPushButton, QScrollArea, QListWidget)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
+from typing import Dict, List, Optional
+from Tweaks import TweakCatalog
+from TweakEngine import TweakEngine
+from TweakThread import TweakThread
 
 class TweaksWindow(QMainWindow):
     """
@@ -11,7 +15,7 @@ class TweaksWindow(QMainWindow):
     back_clicked = pyqtSignal()
     next_clicked = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, tweak_catalog: Optional[TweakCatalog] = None):
         super().__init__()
         self.setWindowTitle("Replicator - System Tweaks")
         self.setGeometry(560, 240, 800, 600)
@@ -54,7 +58,7 @@ QPushButton:hover {
         """)
         
         # Create and set central widget
-        self.central_widget = TweaksWindowContent()
+        self.central_widget = TweaksWindowContent(tweak_catalog)
         self.setCentralWidget(self.central_widget)
 
         # Connect navigation signals
@@ -64,15 +68,24 @@ QPushButton:hover {
 
 class TweaksWindowContent(QWidget):
     """
-    Content widget for system and application tweaks.
+    Content widget for system and application tweaks, generated from the
+    tweak catalog.
     """
     back_clicked = pyqtSignal()
     next_clicked = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, tweak_catalog: Optional[TweakCatalog] = None, tweak_engine: Optional[TweakEngine] = None):
         super().__init__()
+        self.tweak_catalog = tweak_catalog or TweakCatalog()
+        self.tweak_engine = tweak_engine or TweakEngine(self.tweak_catalog)
+        # Tweak id -> its checkbox
+        self.checkboxes: Dict[str, QCheckBox] = {}
+        self.tweak_thread: Optional[TweakThread] = None
+        # Tweak id -> whether it is already in place on this machine (None: unknown)
+        self.current_state: Dict[str, Optional[bool]] = {}
         self.layout = QVBoxLayout(self)
         self.setup_ui()
+        self._probe_tweaks()
 
     def setup_ui(self):
         # Header
@@ -93,6 +106,18 @@ class TweaksWindowContent(QWidget):
         # Tweak Categories
         self.create_tweak_categories(scroll_layout)
 
+        self.apply_button = QPushButton("Apply Selected Tweaks")
+        self.apply_button.clicked.connect(self._apply_tweaks)
+        self.layout.addWidget(self.apply_button)
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.status_label)
+        # Outcome of each tweak of the last apply
+        self.results_list = QListWidget()
+        self.results_list.setMaximumHeight(120)
+        self.results_list.setVisible(False)
+        self.layout.addWidget(self.results_list)
+
         # Navigation buttons
         nav_layout = QHBoxLayout()
         self.back_button = QPushButton("Back")
@@ -104,59 +129,85 @@ class TweaksWindowContent(QWidget):
         self.layout.addLayout(nav_layout)
 
     def create_tweak_categories(self, scroll_layout):
-        tweak_categories = [
-            "Performance Optimizations",
-            "Privacy Settings",
-            "Power Management",
-            "UI Customizations",
-            "Security Enhancements"
-        ]
-
-        for category in tweak_categories:
+        for category, tweak_ids in self.tweak_catalog.categories.items():
             category_label = QLabel(category)
             category_label.setStyleSheet("font-weight: bold; color: #CC784E; ")
             scroll_layout.addWidget(category_label)
-            
-            self.add_tweak_checkboxes(scroll_layout, category)
-
-    def add_tweak_checkboxes(self, scroll_layout, category):
-        if category == "Performance Optimizations":
-            tweaks = [
-                "Disable Startup Programs",
-                "Reduce Visual Effects",
-                "Optimize Memory Usage",
-                "Disable Background Apps"
-            ]
-        elif category == "Privacy Settings":
-            tweaks = [
-                "Disable Telemetry",
-                "Limit Data Collection",
-                "Disable Location Tracking",
-                "Enhance Privacy Settings"
-            ]
-        elif category == "Power Management":
-            tweaks = [
-                "Balanced Power Plan",
-                "High Performance Mode",
-                "Disable Unnecessary Services",
-                "Battery Saver Tweaks"
-            ]
-        elif category == "UI Customizations":
-            tweaks = [
-                "Dark Mode",
-                "Custom Accent Colors",
-                "Taskbar Modifications",
-                "Desktop Icon Settings"
-            ]
-        else:  # Security Enhancements
-            tweaks = [
-                "Windows Defender Optimization",
-                "Firewall Configuration",
-                "Update Settings",
-                "App Permissions"
-            ]
-
-        for tweak in tweaks:
-            checkbox = QCheckBox(tweak)
+
+            self.add_tweak_checkboxes(scroll_layout, tweak_ids)
+
+    def add_tweak_checkboxes(self, scroll_layout, tweak_ids):
+        for tweak_id in tweak_ids:
+            tweak = self.tweak_catalog.tweaks[tweak_id]
+            checkbox = QCheckBox(tweak.name)
+            checkbox.setToolTip(tweak.description)
             checkbox.setStyleSheet("color: #CC784E")
-            scroll_layout.addWidget(checkbox)
\ No newline at end of file
+            scroll_layout.addWidget(checkbox)
+            self.checkboxes[tweak_id] = checkbox
+
+    @property
+    def checked_tweaks(self) -> List[str]:
+        return [tweak_id for tweak_id, checkbox in self.checkboxes.items() if checkbox.isChecked()]
+
+    def set_checked_tweaks(self, tweaks: List[str]) -> None:
+        """
+        Check exactly the given tweaks (ids or names), e.g. from a loaded profile.
+        """
+        wanted = {self.tweak_catalog.resolve_tweak_id(tweak) for tweak in tweaks}
+        for tweak_id, checkbox in self.checkboxes.items():
+            checkbox.setChecked(tweak_id in wanted or self.current_state.get(tweak_id) is True)
+
+    def _probe_tweaks(self) -> None:
+        """
+        Read the state of every tweak in one query, in the background.
+        """
+        self.apply_button.setEnabled(False)
+        self.status_label.setText("Reading the current settings...")
+        thread = TweakThread(self.tweak_engine)
+        thread.tweaks_probed.connect(self._tweaks_probed)
+        self._start_tweak_thread(thread)
+
+    def _start_tweak_thread(self, thread: TweakThread) -> None:
+        # Keep the thread referenced until it has really stopped, not just
+        # until it has sent its result
+        self.tweak_thread = thread
+        thread.finished.connect(lambda: self._tweak_thread_finished(thread))
+        thread.start()
+
+    def _tweak_thread_finished(self, thread: TweakThread) -> None:
+        thread.deleteLater()
+        if self.tweak_thread is thread:
+            self.tweak_thread = None
+
+    def _tweaks_probed(self, state: Dict[str, Optional[bool]]) -> None:
+        self.current_state = state
+        for tweak_id, applied in state.items():
+            checkbox = self.checkboxes.get(tweak_id)
+            if checkbox and applied:
+                checkbox.setChecked(True)
+                checkbox.setToolTip("Already applied on this machine. "
+                                    + self.tweak_catalog.tweaks[tweak_id].description)
+        applied_count = sum(1 for applied in state.values() if applied)
+        self.status_label.setText(f"{applied_count} of {len(self.checkboxes)} tweaks are already applied.")
+        self.apply_button.setEnabled(True)
+
+    def _apply_tweaks(self) -> None:
+        tweaks = self.checked_tweaks
+        if not tweaks:
+            self.status_label.setText("No tweaks selected.")
+            return
+        self.apply_button.setEnabled(False)
+        self.status_label.setText(f"Applying {len(tweaks)} tweaks...")
+        thread = TweakThread(self.tweak_engine, tweaks)
+        thread.tweaks_applied.connect(self._tweaks_applied)
+        self._start_tweak_thread(thread)
+
+    def _tweaks_applied(self, results: List[str]) -> None:
+        self.results_list.clear()
+        self.results_list.addItems(results)
+        self.results_list.setVisible(bool(results))
+        applied = sum(1 for result in results if result.startswith('Applied'))
+        failed = len(results) - applied - self.tweak_engine.unchanged
+        self.status_label.setText(f"Applied {applied} tweaks, {self.tweak_engine.unchanged} were already "
+                                  f"in place, {failed} failed.")
+        self.apply_button.setEnabled(True)
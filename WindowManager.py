@@ -1,48 +1,78 @@
 # WindowManager.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
 from MainWindow import MainWindow
-from InstallWindow import InstallWindow
 from ProgramManager import ProgramManager
+from Catalog import shared_catalog
 from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox
 from WindowsSettings import WindowsSettings
-from typing import Optional
-from TweaksWindow import TweaksWindow
+import Tracing
+from typing import Dict, Optional
 
 class WindowManager:
-    def __init__(self):
+    def __init__(self, engine_options: Optional[Dict] = None):
         """Initialize the window manager with all required components."""
-        self.program_manager = ProgramManager()
+        # Keyword arguments for InstallEngine, taken from the command line
+        self.engine_options = engine_options or {}
         self.main_window: Optional[MainWindow] = None
-        self.install_window: Optional[InstallWindow] = None
-        self.tweaks_window: Optional[TweaksWindow] = None  # Add this line
+        # Created on first navigation, see _get_install_window / _get_tweaks_window
+        self.install_window = None
+        self.tweaks_window = None
+        # Seconds from construction to each window being built, for --timings
+        self.timings: Dict[str, float] = {}
+        self._created = time.perf_counter()
+        # Load the catalog while the welcome screen is showing
+        self._loader = ThreadPoolExecutor(max_workers=1)
+        self._catalog = self._loader.submit(shared_catalog)
+        self._loader.submit(import_module, 'InstallWindow')
+        # Once, on first start; the install window decodes PNGs until it exists
+        self._loader.submit(lambda: import_module('LogoAtlas').ensure_atlas())
         self._setup_windows()
 
     def _setup_windows(self) -> None:
-        """Create and configure all application windows."""
-        # Setup main welcome window
-        self.main_window = MainWindow()
+        """Create the welcome window; the others are built when first shown."""
+        with Tracing.span("build MainWindow", "windows"):
+            self.main_window = MainWindow()
         self.main_window.download_button.clicked.connect(self.show_install_window)
-        
-        # Setup install window
-        self.install_window = InstallWindow()
-        
-        # Connect navigation signals
-        self.install_window.back_clicked.connect(self.show_main_window)
-        self.install_window.next_clicked.connect(self.handle_next_page)
-        
-        self.tweaks_window = TweaksWindow()
-        self.tweaks_window.back_clicked.connect(self.show_install_window)
-        # Connect window-level signals
-        if hasattr(self.install_window, 'central_widget'):
+
+    def _get_install_window(self):
+        if self.install_window is None:
+            # Imported here so the welcome screen does not wait for it
+            from InstallWindow import InstallWindow
+            with Tracing.span("wait for catalog", "windows"):
+                program_manager = ProgramManager(catalog=self._catalog.result())
+            self._loader.shutdown(wait=False)
+            with Tracing.span("build InstallWindow", "windows"):
+                self.install_window = InstallWindow(program_manager, self.engine_options)
+
+            # Connect navigation signals
+            self.install_window.back_clicked.connect(self.show_main_window)
+            self.install_window.next_clicked.connect(self.handle_next_page)
             self.install_window.central_widget.installation_requested.connect(
                 self.show_install_confirmation
             )
+            self.timings['install_window'] = time.perf_counter() - self._created
+        return self.install_window
+
+    def _get_tweaks_window(self):
+        if self.tweaks_window is None:
+            from TweaksWindow import TweaksWindow
+            with Tracing.span("build TweaksWindow", "windows"):
+                self.tweaks_window = TweaksWindow()
+            self.tweaks_window.back_clicked.connect(self.show_install_window)
+            if self.install_window and self.install_window.central_widget.profile_tweaks:
+                # Start from the tweaks of the profile loaded on the install page
+                self.tweaks_window.central_widget.set_checked_tweaks(
+                    self.install_window.central_widget.profile_tweaks
+                )
+        return self.tweaks_window
 
     def handle_next_page(self) -> None:
         """Handle the next button click - implement your next page logic here."""
         if self.install_window and not self.install_window.isHidden():
             self.install_window.hide()
-            if self.tweaks_window:
-                self.tweaks_window.show()
+            self._get_tweaks_window().show()
 
     def show_main_window(self) -> None:
         """Display the main welcome window."""
@@ -57,16 +87,15 @@ class WindowManager:
             self.main_window.hide()
         if self.tweaks_window and not self.tweaks_window.isHidden():
             self.tweaks_window.hide()  
-        if self.install_window:
-            self.install_window.show()
+        self._get_install_window().show()
 
     def show_install_confirmation(self) -> None:
         """Show installation confirmation dialog."""
         if not self.install_window:
             return
 
-        # Get the count directly from the UI list widget instead of program manager
-        selected_count = self.install_window.central_widget.selected_list.count()
+        # Get the count directly from the UI list model instead of program manager
+        selected_count = self.install_window.central_widget.selected_count()
         if selected_count == 0:
             QMessageBox.warning(
                 self.install_window,
@@ -0,0 +1,54 @@
+"""
+Benchmark batched package-manager runs against one process per package,
+using the fake winget/choco in benchmarks/stubs with a simulated start-up
+cost (winget's source refresh takes several seconds on real machines).
+
+Usage:
+    python benchmarks/bench_batch_install.py [packages] [startup_s] [fail_rate]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from ProgramManager import ProgramManager
+from InstallEngine import InstallEngine
+from bench_install_pipeline import make_catalog, sequential
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    os.environ['FAKE_PM_STARTUP'] = sys.argv[2] if len(sys.argv) > 2 else '0.5'
+    os.environ['FAKE_PM_FAIL_RATE'] = sys.argv[3] if len(sys.argv) > 3 else '0'
+    os.environ['FAKE_PM_DOWNLOAD'] = '0.05'
+    os.environ['FAKE_PM_INSTALL'] = '0.02'
+    os.environ['PATH'] = STUBS + os.pathsep + os.environ['PATH']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        make_catalog(path, packages)
+        program_manager = ProgramManager(path)
+        programs = program_manager.available_programs
+        print(f"{packages} packages, start-up {os.environ['FAKE_PM_STARTUP']} s per invocation, "
+              f"fail rate {os.environ['FAKE_PM_FAIL_RATE']}")
+
+        start = time.perf_counter()
+        sequential(program_manager, programs)
+        print(f"  one process per package : {time.perf_counter() - start:6.2f} s")
+
+        for label, batch in (("pipelined engine", False), ("batched engine", True)):
+            engine = InstallEngine(program_manager, download_concurrency=4, batch=batch)
+            start = time.perf_counter()
+            results = engine.run(programs)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for result in results if not result.startswith('Successfully'))
+            print(f"  {label:24}: {elapsed:6.2f} s ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
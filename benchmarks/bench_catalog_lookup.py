@@ -0,0 +1,102 @@
+"""
+Benchmark catalog lookups: the old linear scans against the ProgramManager indexes.
+
+Fills the available list the way InstallWindowContent does (one logo lookup per
+row) and resolves an install command for every program, first on the bundled
+applications.json and then on a synthetic 50k-entry catalog.
+
+Usage:
+    python benchmarks/bench_catalog_lookup.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ProgramManager import ProgramManager
+
+
+def linear_install_command(applications_data, program_name):
+    for program_data in applications_data.values():
+        if isinstance(program_data, dict) and program_data.get('content') == program_name:
+            if 'winget' in program_data:
+                return f"winget install {program_data['winget']}"
+            elif 'choco' in program_data:
+                return f"choco install {program_data['choco']}"
+    return ""
+
+
+def linear_logo_path(applications_data, program_name):
+    for program_data in applications_data.values():
+        if isinstance(program_data, dict) and program_data.get('content') == program_name:
+            return program_data.get('logo', "")
+    return ""
+
+
+def make_synthetic_catalog(path, size):
+    catalog = {}
+    for i in range(size):
+        catalog[f"program{i}"] = {
+            "category": "Utilities",
+            "choco": f"program-{i}",
+            "content": f"Program {i}",
+            "description": f"Synthetic program number {i}.",
+            "link": "https://example.com/",
+            "winget": f"Example.Program{i}",
+            "logo": f"./logs/Program {i}.png"
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(label, catalog_path, sample=None):
+    manager = ProgramManager(catalog_path)
+    programs = manager.available_programs
+    if sample:
+        # The linear path is quadratic; time a slice and extrapolate
+        step = max(1, len(programs) // sample)
+        programs = programs[::step][:sample]
+    data = manager.applications_data
+
+    def linear():
+        for program in programs:
+            linear_logo_path(data, program)
+            linear_install_command(data, program)
+
+    def indexed():
+        for program in programs:
+            manager.get_logo_path(program)
+            manager.get_install_command(program)
+
+    scale = len(manager.available_programs) / len(programs)
+    linear_time = timed(linear) * scale
+    indexed_time = timed(indexed) * scale
+    print(f"{label}: {len(manager.available_programs)} programs")
+    print(f"  linear scan : {linear_time * 1000:10.2f} ms"
+          + (" (extrapolated)" if sample else ""))
+    print(f"  indexed     : {indexed_time * 1000:10.2f} ms"
+          + (" (extrapolated)" if sample else ""))
+    print(f"  speedup     : {linear_time / indexed_time:10.1f}x")
+
+
+def main():
+    run("bundled applications.json", os.path.join(ROOT, 'applications.json'))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        make_synthetic_catalog(path, 50_000)
+        run("synthetic catalog", path, sample=500)
+
+
+if __name__ == "__main__":
+    main()
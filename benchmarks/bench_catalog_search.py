@@ -0,0 +1,57 @@
+"""
+Benchmark catalog memory and search: the in-memory JSON backend against the
+SQLite/FTS5 backend, on the bundled catalog and on growing synthetic ones.
+
+Usage:
+    python benchmarks/bench_catalog_search.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ProgramManager import ProgramManager
+from bench_catalog_lookup import make_synthetic_catalog
+
+QUERIES = ['fire', 'zip', 'password manager', 'program 42', 'utilities']
+
+
+def measure(catalog_path, backend):
+    tracemalloc.start()
+    manager = ProgramManager(catalog_path, backend=backend)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for query in QUERIES:
+        manager.search_programs(query)
+    search_time = (time.perf_counter() - start) / len(QUERIES)
+    return current, search_time
+
+
+def report(label, catalog_path):
+    print(f"{label}")
+    for backend in ('json', 'sqlite'):
+        # Load once so snapshot/database build time is not measured
+        ProgramManager(catalog_path, backend=backend)
+        memory, search_time = measure(catalog_path, backend)
+        print(f"  {backend:6}: {memory / 1024:10.1f} KiB resident catalog, "
+              f"{search_time * 1000:8.2f} ms per search")
+
+
+def main():
+    report("bundled applications.json", os.path.join(ROOT, 'applications.json'))
+    for size in (10_000, 50_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'applications.json')
+            make_synthetic_catalog(path, size)
+            report(f"synthetic {size} programs", path)
+
+
+if __name__ == "__main__":
+    main()
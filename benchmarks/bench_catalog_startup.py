@@ -0,0 +1,65 @@
+"""
+Benchmark catalog start-up: parsing applications.json (cold) against loading
+the compiled snapshot (warm).
+
+Each measurement runs in a fresh interpreter so import and file-cache effects
+match a real launch.
+
+Usage:
+    python benchmarks/bench_catalog_startup.py [runs]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from CatalogSnapshot import snapshot_path
+
+CATALOG = os.path.join(ROOT, 'applications.json')
+
+PROBE = """
+import time
+from ProgramManager import ProgramManager
+start = time.perf_counter()
+ProgramManager({catalog!r})
+print(time.perf_counter() - start)
+"""
+
+
+def load_once():
+    output = subprocess.check_output(
+        [sys.executable, '-c', PROBE.format(catalog=CATALOG)],
+        cwd=ROOT, text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def remove_snapshot():
+    try:
+        os.remove(snapshot_path(CATALOG))
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    cold = []
+    for _ in range(runs):
+        remove_snapshot()
+        cold.append(load_once())
+    warm = [load_once() for _ in range(runs)]
+
+    cold_ms = sorted(cold)[len(cold) // 2] * 1000
+    warm_ms = sorted(warm)[len(warm) // 2] * 1000
+    print(f"catalog: {CATALOG}")
+    print(f"  cold start (parse JSON + build snapshot): {cold_ms:8.2f} ms (median of {runs})")
+    print(f"  warm start (load snapshot)              : {warm_ms:8.2f} ms (median of {runs})")
+    print(f"  speedup                                 : {cold_ms / warm_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measure cold start of the headless command line: wall-clock time of
+`python -m replicator --dry-run` against a bare interpreter, and check that
+nothing in its import graph loads PyQt5.
+
+Usage:
+    python benchmarks/bench_cli_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wall_time(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    qt_modules = subprocess.run(
+        [sys.executable, '-c',
+         "import replicator, sys; print(sum(1 for m in sys.modules if m.startswith('PyQt5')))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    print(f"PyQt5 modules imported by replicator: {qt_modules}")
+
+    bare = wall_time([sys.executable, '-c', 'pass'], runs)
+    cli = wall_time([sys.executable, '-m', 'replicator', '--dry-run', 'vlc', 'firefox', 'git'], runs)
+    print(f"median of {runs} runs")
+    print(f"  python -c pass            : {bare * 1000:7.1f} ms")
+    print(f"  replicator --dry-run      : {cli * 1000:7.1f} ms ({(cli - bare) * 1000:.1f} ms over bare)")
+    try:
+        qt = wall_time([sys.executable, '-c',
+                        "from PyQt5.QtWidgets import QApplication; QApplication([])"], runs)
+        print(f"  Qt import + QApplication  : {qt * 1000:7.1f} ms")
+    except subprocess.CalledProcessError:
+        print("  Qt import + QApplication  : PyQt5 not available")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Install-engine benchmark suite, driven by the fake winget/choco in
+benchmarks/stubs, so it runs on Linux without a package manager.
+
+Every scenario installs the same generated catalog through
+InstallEngine.run_plan (the path InstallationThread takes, minus the Qt
+signals) and measures:
+    wall_s           end-to-end time of the run (median over repeats)
+    packages_per_s   throughput
+    overhead_ms      per-package time the engine spent beyond what the stubs
+                     were told to take, from the run's PackageResults
+    updates_per_s    progress updates the engine produced (parsed readings
+                     and status changes), and snapshots_per_s, those that
+                     reached the (30 Hz) aggregator's output
+
+Results are appended to benchmarks/results/install_engine.jsonl with the
+commit they were measured at, and each scenario is compared with the last
+stored run of the same scenario; --check exits with 1 on a regression.
+
+Usage:
+    python benchmarks/bench_install_engine.py [--packages N] [--repeat N]
+        [--scenario NAME ...] [--threshold PERCENT] [--check] [--no-save] [--list]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+RESULTS_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'install_engine.jsonl')
+sys.path.insert(0, ROOT)
+
+from Catalog import Catalog
+from InstallEngine import InstallEngine
+from InstallPlan import compile_plan
+from Profile import Profile
+from ShellPool import ShellPool
+
+# Stub settings every scenario starts from
+BASE_ENV = {
+    'FAKE_PM_STARTUP': '0.05',
+    'FAKE_PM_DOWNLOAD': '0.2',
+    'FAKE_PM_INSTALL': '0.05',
+    'FAKE_PM_FAIL_RATE': '0',
+    'FAKE_PM_SEED': '1',
+    'FAKE_PM_OUTPUT': 'percent',
+    'FAKE_PM_STEPS': '10',
+    'FAKE_PM_SIZE_MB': '50',
+}
+
+# name -> (description, stub settings, engine options)
+SCENARIOS = {
+    # One download at a time, so processes do not compete for the CPU
+    'overhead': ("zero-latency stubs: pure per-package cost",
+                 {'FAKE_PM_STARTUP': '0', 'FAKE_PM_DOWNLOAD': '0', 'FAKE_PM_INSTALL': '0'},
+                 {'download_concurrency': 1}),
+    'shell-pool': ("zero-latency stubs run in long-lived shells",
+                   {'FAKE_PM_STARTUP': '0', 'FAKE_PM_DOWNLOAD': '0', 'FAKE_PM_INSTALL': '0'},
+                   {'download_concurrency': 1, 'shell_pool': 2}),
+    'percent': ("progress as a line per percentage", {'FAKE_PM_OUTPUT': 'percent'}, {}),
+    'bar': ("progress as a \\r-redrawn bar with a percentage", {'FAKE_PM_OUTPUT': 'bar'}, {}),
+    'mb': ("progress as a \\r-redrawn bar with MB fractions", {'FAKE_PM_OUTPUT': 'mb'}, {}),
+    'chatty': ("500 progress readings per download", {'FAKE_PM_OUTPUT': 'mb', 'FAKE_PM_STEPS': '500'}, {}),
+    'batch': ("one winget import for all packages, 0.5 s start-up",
+              {'FAKE_PM_STARTUP': '0.5'}, {'batch': True}),
+    'failures': ("25% of commands fail; retried online and with choco",
+                 {'FAKE_PM_FAIL_RATE': '0.25'}, {}),
+}
+
+# Metrics where a higher value is a regression, with the least absolute
+# growth that counts (small values swing by large percentages)
+LOWER_IS_BETTER = {'wall_s': 0.05, 'overhead_ms': 5.0}
+
+
+def make_catalog(path, size):
+    # Every program is on winget with a choco fallback
+    catalog = {
+        f"program{i}": {"content": f"Program {i}", "winget": f"Example.Program{i}", "choco": f"program-{i}"}
+        for i in range(size)
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+
+
+def expected_seconds(env, batch):
+    """
+    Time the stubs are told to spend on one package; a batch pays its
+    start-up once, not per package.
+    """
+    seconds = float(env['FAKE_PM_DOWNLOAD']) + float(env['FAKE_PM_INSTALL'])
+    return seconds if batch else seconds + float(env['FAKE_PM_STARTUP'])
+
+
+def run_once(plan, env, options):
+    os.environ.update(env)
+    options = dict(options)
+    if options.get('shell_pool'):
+        options['shell_pool'] = ShellPool(options['shell_pool'])
+    engine = InstallEngine(on_snapshot=lambda snapshot: None, installed_state=None, **options)
+    start = time.perf_counter()
+    engine.run_plan(plan)
+    wall = time.perf_counter() - start
+    if options.get('shell_pool'):
+        options['shell_pool'].close()
+
+    ran = [record for record in engine.records if record.status in ('installed', 'failed')]
+    stage = statistics.mean(record.download_seconds + record.install_seconds for record in ran) if ran else 0.0
+    return {
+        'wall_s': wall,
+        'packages_per_s': len(plan.steps) / wall,
+        'overhead_ms': (stage - expected_seconds(env, options.get('batch', False))) * 1000,
+        'updates_per_s': engine.aggregator.received / wall,
+        'snapshots_per_s': engine.aggregator.published / wall,
+        'failed': sum(1 for record in engine.records if record.status == 'failed'),
+    }
+
+
+def run_scenario(name, plan, repeat):
+    _, overrides, options = SCENARIOS[name]
+    env = dict(BASE_ENV, **overrides)
+    runs = [run_once(plan, env, options) for _ in range(repeat)]
+    # The median run by wall time, so the metrics come from one consistent run
+    runs.sort(key=lambda run: run['wall_s'])
+    return runs[len(runs) // 2]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def load_results(path):
+    results = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return results
+
+
+def previous_result(results, scenario, packages):
+    for result in reversed(results):
+        if result['scenario'] == scenario and result['packages'] == packages:
+            return result
+    return None
+
+
+def compare(metrics, previous, threshold):
+    """
+    Changes against the previous run as text, and whether any is a
+    regression beyond threshold percent.
+    """
+    changes = []
+    regressed = False
+    for metric in ('wall_s', 'overhead_ms', 'updates_per_s'):
+        old, new = previous['metrics'].get(metric), metrics[metric]
+        if not old:
+            continue
+        change = (new - old) / abs(old) * 100
+        worse = metric in LOWER_IS_BETTER and change > threshold and new - old > LOWER_IS_BETTER[metric]
+        regressed = regressed or worse
+        changes.append(f"{metric} {change:+.0f}%{' REGRESSION' if worse else ''}")
+    return f"vs {previous['commit'] or 'previous'}: " + ", ".join(changes), regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InstallEngine against the fake package managers")
+    parser.add_argument('--packages', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument('--results', default=RESULTS_PATH, help="JSON-lines file results are stored in")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="percent a time may grow before it counts as a regression")
+    parser.add_argument('--check', action='store_true', help="exit with 1 if a scenario regressed")
+    parser.add_argument('--no-save', action='store_true', help="do not store this run's results")
+    parser.add_argument('--list', action='store_true', help="describe the scenarios, then exit")
+    args = parser.parse_args()
+    if args.list:
+        for name, (description, _, _) in SCENARIOS.items():
+            print(f"{name:11} {description}")
+        return
+
+    os.environ['PATH'] = STUBS + os.pathsep + os.environ['PATH']
+    previous = load_results(args.results)
+    stored = []
+    regressed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, 'applications.json')
+        make_catalog(catalog_path, args.packages)
+        catalog = Catalog(catalog_path)
+        plan = compile_plan(Profile(list(catalog.ids)), catalog)
+        os.environ['FAKE_PM_STATE'] = os.path.join(tmp, 'state.json')
+
+        print(f"{args.packages} packages, median of {args.repeat} runs")
+        for name in args.scenario or SCENARIOS:
+            metrics = run_scenario(name, plan, args.repeat)
+            print(f"  {name:11} {metrics['wall_s']:6.2f} s  {metrics['packages_per_s']:5.1f} pkg/s  "
+                  f"overhead {metrics['overhead_ms']:6.1f} ms/pkg  "
+                  f"{metrics['updates_per_s']:6.0f} updates/s  {metrics['snapshots_per_s']:4.0f} snapshots/s  "
+                  f"{metrics['failed']} failed")
+            last = previous_result(previous, name, args.packages)
+            if last:
+                text, worse = compare(metrics, last, args.threshold)
+                regressed = regressed or worse
+                print(f"              {text}")
+            stored.append({
+                'time': round(time.time(), 3), 'commit': git_commit(), 'python': platform.python_version(),
+                'platform': platform.platform(), 'scenario': name, 'packages': args.packages,
+                'repeat': args.repeat, 'metrics': {key: round(value, 4) for key, value in metrics.items()},
+            })
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, 'a', encoding='utf-8') as f:
+            for result in stored:
+                f.write(json.dumps(result) + '\n')
+        print(f"results appended to {args.results}")
+    if args.check and regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
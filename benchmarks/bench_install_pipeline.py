@@ -0,0 +1,72 @@
+"""
+Benchmark the pipelined InstallEngine against the old one-package-at-a-time
+loop, using the fake winget/choco in benchmarks/stubs.
+
+Usage:
+    python benchmarks/bench_install_pipeline.py [packages] [download_s] [install_s]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from ProgramManager import ProgramManager
+from InstallEngine import InstallEngine
+
+
+def make_catalog(path, size):
+    catalog = {}
+    for i in range(size):
+        source = 'winget' if i % 4 else 'choco'
+        catalog[f"program{i}"] = {
+            "content": f"Program {i}",
+            source: f"Example.Program{i}" if source == 'winget' else f"program-{i}",
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+
+
+def sequential(program_manager, programs):
+    # The install loop InstallationThread used before the engine
+    for program in programs:
+        subprocess.run(program_manager.get_install_command(program), shell=True, capture_output=True)
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    os.environ['FAKE_PM_DOWNLOAD'] = sys.argv[2] if len(sys.argv) > 2 else '0.2'
+    os.environ['FAKE_PM_INSTALL'] = sys.argv[3] if len(sys.argv) > 3 else '0.02'
+    os.environ['PATH'] = STUBS + os.pathsep + os.environ['PATH']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        make_catalog(path, packages)
+        program_manager = ProgramManager(path)
+        programs = program_manager.available_programs
+
+        start = time.perf_counter()
+        sequential(program_manager, programs)
+        baseline = time.perf_counter() - start
+        print(f"{packages} packages, download {os.environ['FAKE_PM_DOWNLOAD']} s, "
+              f"install {os.environ['FAKE_PM_INSTALL']} s")
+        print(f"  sequential loop        : {baseline:6.2f} s")
+
+        for concurrency in (1, 4, 8):
+            engine = InstallEngine(program_manager, download_concurrency=concurrency)
+            start = time.perf_counter()
+            results = engine.run(programs)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for result in results if not result.startswith('Successfully'))
+            print(f"  engine, {concurrency} downloads  : {elapsed:6.2f} s "
+                  f"({baseline / elapsed:4.1f}x, {failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark install-plan preparation in a fresh interpreter, the way a
+provisioning run starts: loading the catalog and compiling the profile,
+against loading the cached plan for the same profile and catalog.
+
+Usage:
+    python benchmarks/bench_install_plan.py [catalog_size] [profile_size] [runs]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_catalog_lookup import make_synthetic_catalog
+from Profile import Profile, save_profile
+
+PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from Catalog import shared_catalog
+from InstallPlan import PlanCache, compile_plan
+from Profile import load_profile
+profile = load_profile({profile!r})
+if {cached}:
+    plan = PlanCache({cache!r}).compile(profile, {catalog!r}, lambda: shared_catalog({catalog!r}))
+else:
+    plan = compile_plan(profile, shared_catalog({catalog!r}))
+print(len(plan.steps), time.perf_counter() - start)
+"""
+
+
+def prepare_once(cached, **paths):
+    output = subprocess.check_output([sys.executable, '-c', PROBE.format(cached=cached, root=ROOT, **paths)],
+                                     text=True)
+    steps, seconds = output.split()
+    return int(steps), float(seconds)
+
+
+def main():
+    catalog_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    profile_size = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            'catalog': os.path.join(tmp, 'applications.json'),
+            'profile': os.path.join(tmp, 'profile.json'),
+            'cache': os.path.join(tmp, 'plans'),
+        }
+        make_synthetic_catalog(paths['catalog'], catalog_size)
+        save_profile(Profile([f"program{i}" for i in range(0, catalog_size, catalog_size // profile_size)]),
+                     paths['profile'])
+        # Build the catalog snapshot and the cached plan first
+        prepare_once(True, **paths)
+
+        compiled = sorted(prepare_once(False, **paths)[1] for _ in range(runs))[runs // 2]
+        cached = sorted(prepare_once(True, **paths)[1] for _ in range(runs))[runs // 2]
+        print(f"{catalog_size} catalog entries, {profile_size}-program profile (median of {runs})")
+        print(f"  load catalog + compile : {compiled * 1000:8.1f} ms")
+        print(f"  cached plan            : {cached * 1000:8.1f} ms ({compiled / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
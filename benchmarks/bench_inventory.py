@@ -0,0 +1,76 @@
+"""
+Benchmark capturing a machine's inventory with the fake winget/choco in
+benchmarks/stubs: the whole capture, and matching the installed packages
+through the catalog's indexes against scanning the catalog for each one.
+
+Usage:
+    python benchmarks/bench_inventory.py [catalog_size] [installed] [backend]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from bench_catalog_lookup import make_synthetic_catalog
+from Catalog import Catalog
+from Inventory import capture_inventory
+
+
+def scan_match(catalog, source, package_id):
+    package_id = package_id.lower()
+    for program_id, program_data in catalog.applications_data.items():
+        if program_data.get(source, '').lower() == package_id:
+            return program_id
+    return None
+
+
+def main():
+    catalog_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    installed = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    backend = sys.argv[3] if len(sys.argv) > 3 else 'json'
+    os.environ['PATH'] = STUBS + os.pathsep + os.environ['PATH']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, 'applications.json')
+        make_synthetic_catalog(catalog_path, catalog_size)
+        step = max(1, catalog_size // installed)
+        # Every tenth package is something the catalog has never heard of
+        state = {
+            'winget': [f"Example.Program{i}" if n % 10 else f"Unknown.Package{i}"
+                       for n, i in enumerate(range(0, catalog_size, step))],
+            'choco': [f"program-{i}" for i in range(step // 2, catalog_size, step * 2)],
+        }
+        os.environ['FAKE_PM_STATE'] = os.path.join(tmp, 'state.json')
+        with open(os.environ['FAKE_PM_STATE'], 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+        catalog = Catalog(catalog_path, backend)
+        start = time.perf_counter()
+        inventory = capture_inventory(catalog)
+        capture = time.perf_counter() - start
+        unmatched = sum(len(ids) for ids in inventory.unmatched.values())
+        print(f"{backend} catalog of {catalog_size}: captured {len(inventory.programs)} programs "
+              f"({unmatched} unmatched) in {capture * 1000:.0f} ms")
+
+        packages = [(source, package_id) for source, ids in state.items() for package_id in ids]
+        start = time.perf_counter()
+        indexed = [catalog.find_package(source, package_id) for source, package_id in packages]
+        index_time = time.perf_counter() - start
+        print(f"  index match: {index_time * 1000:8.2f} ms for {len(packages)} packages")
+
+        if catalog.store is None:
+            start = time.perf_counter()
+            scanned = [scan_match(catalog, source, package_id) for source, package_id in packages]
+            scan_time = time.perf_counter() - start
+            assert scanned == indexed
+            print(f"  linear scan: {scan_time * 1000:8.2f} ms ({scan_time / index_time:.0f}x slower)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark logo loading: decoding every full-size PNG in ./logs against reading
+pre-scaled thumbnails from the memory-mapped logos.atlas.
+
+Each variant runs in a fresh interpreter and reports icon-load time and the
+process's resident memory afterwards. Needs PyQt5; Linux only for RSS.
+
+Usage:
+    python benchmarks/bench_logo_atlas.py
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import os, sys, time
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QIcon, QPixmap
+from ProgramManager import ProgramManager
+from LogoAtlas import LogoAtlas
+
+def rss_kib():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+app = QApplication([])
+manager = ProgramManager()
+paths = [manager.get_logo_path(p) for p in manager.available_programs]
+paths = [p for p in paths if p and os.path.exists(p)]
+before = rss_kib()
+start = time.perf_counter()
+if {use_atlas}:
+    atlas = LogoAtlas()
+    icons = [QIcon(QPixmap.fromImage(atlas.image(p))) for p in paths]
+else:
+    icons = [QIcon(p) for p in paths]
+# QIcon decodes lazily; ask for the painted size to force it
+pixmaps = [icon.pixmap(32, 32) for icon in icons]
+elapsed = time.perf_counter() - start
+print(len(paths), elapsed, rss_kib() - before, rss_kib())
+"""
+
+
+def run(use_atlas):
+    output = subprocess.check_output(
+        [sys.executable, '-c', PROBE.format(use_atlas=use_atlas)], cwd=ROOT, text=True
+    )
+    count, elapsed, grown, rss = output.split()
+    return int(count), float(elapsed), int(grown), int(rss)
+
+
+def main():
+    subprocess.check_call([sys.executable, 'LogoAtlas.py'], cwd=ROOT)
+    for label, use_atlas in (('PNG decode', False), ('logo atlas', True)):
+        count, elapsed, grown, rss = run(use_atlas)
+        print(f"{label:10}: {count} icons in {elapsed * 1000:8.1f} ms, "
+              f"RSS +{grown / 1024:6.1f} MiB (total {rss / 1024:6.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
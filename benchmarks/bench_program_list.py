@@ -0,0 +1,62 @@
+"""
+Benchmark the install window's program lists: time to first paint and
+per-keystroke filter latency for catalogs from 300 to 100k programs.
+
+Needs PyQt5; runs headless through the offscreen platform plugin.
+
+Usage:
+    python benchmarks/bench_program_list.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt5.QtWidgets import QApplication
+from ProgramManager import ProgramManager
+from InstallWindow import InstallWindowContent
+from bench_catalog_lookup import make_synthetic_catalog
+
+KEYSTROKES = ['p', 'pr', 'pro', 'prog', 'program 4', 'program 42', '']
+
+
+def run(app, size):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        make_synthetic_catalog(path, size)
+        program_manager = ProgramManager(path)
+
+        start = time.perf_counter()
+        content = InstallWindowContent(program_manager)
+        content.resize(800, 600)
+        content.show()
+        app.processEvents()
+        first_paint = time.perf_counter() - start
+
+        latencies = []
+        for text in KEYSTROKES:
+            start = time.perf_counter()
+            content.available_search.setText(text)
+            app.processEvents()
+            latencies.append(time.perf_counter() - start)
+        content.close()
+
+    print(f"{size:>7} programs: first paint {first_paint * 1000:8.1f} ms, "
+          f"keystroke median {sorted(latencies)[len(latencies) // 2] * 1000:8.1f} ms, "
+          f"max {max(latencies) * 1000:8.1f} ms")
+
+
+def main():
+    app = QApplication([])
+    for size in (300, 10_000, 100_000):
+        run(app, size)
+
+
+if __name__ == "__main__":
+    main()
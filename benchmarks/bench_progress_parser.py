@@ -0,0 +1,75 @@
+"""
+Benchmark ProgressParser throughput on the winget/choco transcripts in
+benchmarks/transcripts, and compare how many progress readings it delivers
+(at most one per 4 KiB chunk, as the engine reads them) with the old
+newline-only, per-line regex approach.
+
+Usage:
+    python benchmarks/bench_progress_parser.py [repeat]
+"""
+
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPTS = os.path.join(ROOT, 'benchmarks', 'transcripts')
+sys.path.insert(0, ROOT)
+
+from ProgressParser import ProgressParser
+
+CHUNK_SIZE = 4096
+
+LEGACY_PATTERNS = [
+    r'(\d+(?:\.\d+)?)%',
+    r'Downloaded\s*(\d+(?:\.\d+)?)',
+    r'(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?) (MB|GB)',
+    r'Progress:\s*(\d+(?:\.\d+)?)'
+]
+
+
+def legacy(data):
+    events = 0
+    for line in data.decode('utf-8', errors='replace').split('\n'):
+        for pattern in LEGACY_PATTERNS:
+            if re.search(pattern, line.strip(), re.IGNORECASE):
+                events += 1
+                break
+    return events
+
+
+def streaming(data):
+    parser = ProgressParser()
+    events = 0
+    for offset in range(0, len(data), CHUNK_SIZE):
+        parser.feed(data[offset:offset + CHUNK_SIZE])
+        events += parser.take_event() is not None
+    parser.finish()
+    events += parser.take_event() is not None
+    return events, parser.last_event
+
+
+def throughput(func, data, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(data)
+    elapsed = time.perf_counter() - start
+    return len(data) * repeat / elapsed / 1024 ** 2
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name in sorted(os.listdir(TRANSCRIPTS)):
+        with open(os.path.join(TRANSCRIPTS, name), 'rb') as f:
+            data = f.read()
+        events, last = streaming(data)
+        total = f"{last.bytes_total / 1024 ** 2:.1f} MB" if last and last.bytes_total else "-"
+        print(f"{name} ({len(data) / 1024:.0f} KiB)")
+        print(f"  streaming: {events:5} events, {throughput(streaming, data, repeat):7.1f} MiB/s, "
+              f"download size {total}")
+        print(f"  legacy   : {legacy(data):5} events, {throughput(legacy, data, repeat):7.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
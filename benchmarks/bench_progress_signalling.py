@@ -0,0 +1,59 @@
+"""
+Benchmark ProgressAggregator under a flood of progress updates: several
+worker threads report as fast as they can, the way chatty winget/choco
+output reaches the engine, and we count how many snapshots would actually
+reach the GUI thread.
+
+Usage:
+    python benchmarks/bench_progress_signalling.py [threads] [seconds] [rate_hz]
+"""
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ProgressAggregator import ProgressAggregator, DEFAULT_RATE_HZ
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    rate_hz = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_RATE_HZ
+
+    progress = {f"program{i}": 0.0 for i in range(threads)}
+    snapshots = []
+    aggregator = ProgressAggregator(snapshots.append, lambda: dict(progress), rate_hz)
+    stop = threading.Event()
+
+    def worker(program):
+        done = 0
+        while not stop.is_set():
+            done += 1
+            progress[program] = done % 100
+            aggregator.notify(f"Downloading {program}: {done}")
+
+    aggregator.start()
+    workers = [threading.Thread(target=worker, args=(program,)) for program in progress]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    aggregator.stop()
+    elapsed = time.perf_counter() - start
+
+    print(f"{threads} threads for {elapsed:.2f} s, limit {rate_hz:g} Hz")
+    print(f"  updates received : {aggregator.received:10d} ({aggregator.received / elapsed:10.0f}/s)")
+    print(f"  snapshots sent   : {aggregator.published:10d} ({aggregator.published / elapsed:10.1f}/s)")
+    print(f"  merged           : {aggregator.merged:10d}")
+    print(f"  notify() cost    : {elapsed * threads / aggregator.received * 1e6:10.2f} us/update (wall, per thread)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark selection changes: the old list-based add_program loop against
+ProgramManager's ordered-set selection and bulk operations, on a synthetic
+catalog where one category holds a large share of the programs.
+
+Usage:
+    python benchmarks/bench_selection.py [programs] [category_size]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ProgramManager import ProgramManager
+
+
+def make_catalog(path, size, category_size):
+    catalog = {}
+    # Spread the big category across the catalog, as real categories are
+    step = size // category_size
+    for i in range(size):
+        catalog[f"program{i}"] = {
+            "category": "Big" if i % step == 0 and i // step < category_size else f"Small {i % 50}",
+            "content": f"Program {i}",
+            "winget": f"Example.Program{i}",
+        }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def legacy_select(available, programs):
+    # ProgramManager.add_program before the ordered set
+    selected = []
+    for program in programs:
+        if program in available:
+            available.remove(program)
+            selected.append(program)
+    return selected
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    category_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        make_catalog(path, size, category_size)
+        manager = ProgramManager(path)
+        big = [manager.catalog.names_by_id[program_id] for program_id in manager.catalog.categories['Big']]
+
+        print(f"{size} programs, selecting a {len(big)}-program category")
+        # The old loop is quadratic; time a slice and scale it
+        sample = big[:1000]
+        legacy_time, _ = timed(lambda: legacy_select(list(manager.catalog.names), sample))
+        print(f"  list add_program loop : {legacy_time * len(big) / len(sample) * 1000:9.1f} ms (extrapolated)")
+
+        select_time, added = timed(lambda: manager.select_category('Big'))
+        print(f"  select_category       : {select_time * 1000:9.1f} ms ({len(added)} selected)")
+        available_time, available = timed(lambda: manager.available_programs)
+        print(f"  available_programs    : {available_time * 1000:9.1f} ms ({len(available)} left)")
+        clear_time, _ = timed(manager.clear_selection)
+        print(f"  clear_selection       : {clear_time * 1000:9.1f} ms")
+        ids_time, _ = timed(lambda: manager.select(manager.catalog.categories['Big']))
+        print(f"  select(list of ids)   : {ids_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
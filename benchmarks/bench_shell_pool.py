@@ -0,0 +1,59 @@
+"""
+Benchmark the per-command overhead of running package-manager commands in
+a long-lived shell session against starting a process for each command,
+directly and through a fresh shell (subprocess.run(..., shell=True), as the
+installer used to).
+
+Commands: an external no-op (/bin/true, so the shell has to spawn it too)
+and the fake winget in benchmarks/stubs, whose own start-up is paid either way.
+
+Usage:
+    python benchmarks/bench_shell_pool.py [commands]
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from ShellPool import ShellPool
+
+
+def per_command(run, command, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        run(command)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    os.environ['PATH'] = STUBS + os.pathsep + os.environ['PATH']
+    pool = ShellPool(1)
+    # Start the session outside the measurement, as a long-lived pool would have
+    pool.run(['true'])
+
+    for label, command in (("/bin/true", ['/bin/true']), ("fake winget", ['winget'])):
+        runs = {
+            'process per command': lambda c: subprocess.run(c, capture_output=True),
+            'shell per command': lambda c: subprocess.run(' '.join(shlex.quote(a) for a in c),
+                                                          shell=True, capture_output=True),
+            'shell session': lambda c: pool.run(c),
+        }
+        times = {name: per_command(run, command, count) for name, run in runs.items()}
+        print(f"{label}, {count} commands:")
+        for name, seconds in times.items():
+            print(f"  {name:20} {seconds * 1000:7.3f} ms/command")
+        saved = times['shell per command'] - times['shell session']
+        print(f"  session saves {saved * 1000:.3f} ms/command over a shell per command")
+    pool.close()
+    print(f"sessions started: {pool.started}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark what tracing costs: a span with tracing off and on, against the
+work the most frequent span wraps, the progress parser fed one chunk of the
+transcripts (as _run_process does).
+
+Usage:
+    python benchmarks/bench_tracing.py [spans]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPTS = os.path.join(ROOT, 'benchmarks', 'transcripts')
+sys.path.insert(0, ROOT)
+
+import Tracing
+from ProgressParser import ProgressParser
+
+CHUNK_SIZE = 4096
+
+
+def empty_loop(count):
+    start = time.perf_counter()
+    for _ in range(count):
+        pass
+    return (time.perf_counter() - start) / count
+
+
+def per_span(count):
+    start = time.perf_counter()
+    for _ in range(count):
+        with Tracing.span("parse output", "progress", "package", bytes=CHUNK_SIZE):
+            pass
+    return (time.perf_counter() - start) / count
+
+
+def parse(chunks):
+    parser = ProgressParser()
+    start = time.perf_counter()
+    for chunk in chunks:
+        parser.feed(chunk)
+        parser.take_event()
+    parser.finish()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    loop = min(empty_loop(count) for _ in range(5))
+    off = min(per_span(count) for _ in range(5)) - loop
+    Tracing.start_tracing()
+    on = min(per_span(count) for _ in range(5)) - loop
+    Tracing.stop_tracing()
+    print(f"span, tracing off: {off * 1e9:7.0f} ns")
+    print(f"span, tracing on:  {on * 1e9:7.0f} ns")
+
+    chunks = []
+    for name in sorted(os.listdir(TRANSCRIPTS)):
+        with open(os.path.join(TRANSCRIPTS, name), 'rb') as f:
+            data = f.read()
+        chunks.extend(data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+    chunks *= 50
+    per_chunk = min(parse(chunks) for _ in range(9)) / len(chunks)
+    # Timed separately: a traced and an untraced parsing loop differ by less
+    # than the run-to-run noise
+    print(f"parsing one {CHUNK_SIZE} byte chunk: {per_chunk * 1e6:.1f} us; a span around it adds "
+          f"{off / per_chunk * 100:.2f}% with tracing off, {on / per_chunk * 100:.2f}% with it on")
+
+if __name__ == '__main__':
+    main()
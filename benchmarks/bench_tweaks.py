@@ -0,0 +1,69 @@
+"""
+Benchmark applying tweaks on the in-memory registry: every tweak in one
+backend session against one session per tweak, as a process per tweak
+would, and re-running the same tweaks once they are in place (one probe
+query, no elevated session). session_ms stands in for starting a
+PowerShell (several hundred ms on a real machine, plus a UAC prompt each
+time it is elevated).
+
+Usage:
+    python benchmarks/bench_tweaks.py [session_ms] [copies]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Tweaks import Tweak, TweakCatalog
+from TweakEngine import FakeRegistryBackend, TweakEngine, compile_script
+
+
+def main():
+    session_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    catalog = TweakCatalog(os.path.join(ROOT, 'tweaks.json'))
+    # Larger synthetic sets: the same tweaks again under new ids
+    originals = list(catalog.tweaks.values())
+    for copy in range(1, copies):
+        for tweak in originals:
+            tweak_id = f"{tweak.id}_{copy}"
+            catalog.tweaks[tweak_id] = Tweak(tweak_id, f"{tweak.name} {copy}", tweak.category,
+                                             tweak.description, tweak.actions, tweak.probe)
+    tweaks = list(catalog.tweaks)
+
+    start = time.perf_counter()
+    script = compile_script(list(catalog.tweaks.values()), 'results.txt')
+    compiled = time.perf_counter() - start
+    print(f"{len(tweaks)} tweaks: script of {len(script.splitlines())} lines compiled in {compiled * 1000:.2f} ms")
+
+    backend = FakeRegistryBackend(session_latency=session_ms / 1000)
+    engine = TweakEngine(catalog, backend)
+    start = time.perf_counter()
+    results = engine.apply(tweaks, force=True)
+    batched = time.perf_counter() - start
+    assert all(result.startswith('Applied') for result in results)
+    print(f"  batched:     {batched * 1000:8.1f} ms, {backend.sessions} session")
+
+    # Running the same profile again on the now tuned machine: one probe, nothing applied
+    start = time.perf_counter()
+    results = engine.apply(tweaks)
+    rerun = time.perf_counter() - start
+    assert engine.unchanged == len(tweaks)
+    print(f"  re-run:      {rerun * 1000:8.1f} ms, {backend.queries} probe query, "
+          f"{engine.unchanged} no-ops, {backend.sessions - 1} more sessions")
+
+    backend = FakeRegistryBackend(session_latency=session_ms / 1000)
+    engine = TweakEngine(catalog, backend)
+    start = time.perf_counter()
+    for tweak in tweaks:
+        engine.apply([tweak], force=True)
+    separate = time.perf_counter() - start
+    print(f"  per tweak:   {separate * 1000:8.1f} ms, {backend.sessions} sessions "
+          f"({separate / batched:.0f}x slower)")
+
+if __name__ == '__main__':
+    main()
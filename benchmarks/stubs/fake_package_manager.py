@@ -0,0 +1,285 @@
+"""
+Stand-in for winget and choco so the install engine can be exercised and
+benchmarked on any OS.
+
+The behaviour is tuned through environment variables (seconds are floats):
+    FAKE_PM_STARTUP    start-up cost paid by every invocation
+    FAKE_PM_DOWNLOAD   time to "download" one package
+    FAKE_PM_INSTALL    time to "install" one package
+    FAKE_PM_FAIL_RATE  probability (0-1) that a package fails
+    FAKE_PM_SEED       makes failures repeatable: whether a package fails
+                       depends only on the seed, the command and the package
+    FAKE_PM_OUTPUT     progress style: "percent" (a line per reading,
+                       the default), "bar" (a \r-redrawn bar with a
+                       percentage, like winget installs) or "mb" (a
+                       \r-redrawn bar with "12.0 MB / 50.0 MB", like winget
+                       downloads)
+    FAKE_PM_STEPS      progress readings per download (default 10)
+    FAKE_PM_SIZE_MB    package size shown by the "mb" style (default 50)
+    FAKE_PM_VERSION    version every package is at (default 1.0.0), as
+                       downloaded and as reported by `winget show` and
+                       `choco search`
+    FAKE_PM_STATE      JSON file recording what is "installed"; read by
+                       `winget export` and `choco list`, updated by installs
+
+download writes a runnable fake installer and a winget-style manifest into
+the output directory, so local installs can be tested as well.
+"""
+
+import hashlib
+import json
+import os
+import random
+import stat
+import sys
+import time
+
+INSTALLER_TEMPLATE = """#!{python}
+import os, sys, time
+time.sleep(float(os.environ.get('FAKE_PM_INSTALL', '0')))
+print('Successfully installed {package_id}')
+"""
+
+
+def _float(name):
+    return float(os.environ.get(name, '0'))
+
+
+def _option(args, *names):
+    for name in names:
+        if name in args:
+            index = args.index(name)
+            if index + 1 < len(args):
+                return args[index + 1]
+    return None
+
+
+# Options that take a value, so the value is not mistaken for a package id
+VALUE_OPTIONS = {'--id', '--source', '-s', '--output-directory', '-o',
+                 '--download-directory', '-d', '--import-file', '-i'}
+
+
+def _package_ids(args):
+    package_id = _option(args, '--id')
+    if package_id:
+        return [package_id]
+    # choco style: every positional argument after the verb
+    package_ids = []
+    skip = False
+    for arg in args[1:]:
+        if skip:
+            skip = False
+        elif arg in VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith('-'):
+            package_ids.append(arg)
+    return package_ids
+
+
+def _package_id(args):
+    package_ids = _package_ids(args)
+    return package_ids[0] if package_ids else None
+
+
+BAR_WIDTH = 30
+
+
+def _bar(fraction):
+    filled = int(fraction * BAR_WIDTH)
+    return '\u2588' * filled + '\u2592' * (BAR_WIDTH - filled)
+
+
+def _progress(label, duration, steps=None):
+    steps = steps or int(os.environ.get('FAKE_PM_STEPS') or 10)
+    style = os.environ.get('FAKE_PM_OUTPUT', 'percent')
+    size = float(os.environ.get('FAKE_PM_SIZE_MB') or 50)
+    for step in range(1, steps + 1):
+        time.sleep(duration / steps)
+        fraction = step / steps
+        if style == 'bar':
+            sys.stdout.write(f"\r{label} {_bar(fraction)}  {fraction * 100:.0f}%")
+        elif style == 'mb':
+            sys.stdout.write(f"\r{label} {_bar(fraction)}  {fraction * size:.1f} MB / {size:.1f} MB")
+        else:
+            sys.stdout.write(f"{label} {step * 100 // steps}%\n")
+        sys.stdout.flush()
+    if style in ('bar', 'mb'):
+        print(flush=True)
+
+
+def _should_fail(*key):
+    rate = _float('FAKE_PM_FAIL_RATE')
+    seed = os.environ.get('FAKE_PM_SEED')
+    if seed is None:
+        return random.random() < rate
+    digest = hashlib.sha256(repr((seed, sys.argv[1:2]) + key).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64 < rate
+
+
+def _version():
+    return os.environ.get('FAKE_PM_VERSION') or '1.0.0'
+
+
+def _load_state():
+    path = os.environ.get('FAKE_PM_STATE')
+    if not path or not os.path.exists(path):
+        return {'winget': [], 'choco': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _mark_installed(tool, package_id):
+    path = os.environ.get('FAKE_PM_STATE')
+    if not path:
+        return
+    state = _load_state()
+    if package_id not in state[tool]:
+        state[tool].append(package_id)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+
+def export(args):
+    manifest = {"Sources": [{"Packages": [
+        {"PackageIdentifier": package_id} for package_id in _load_state()['winget']
+    ]}]}
+    with open(_option(args, '--output', '-o'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return 0
+
+
+def show(args):
+    package_id = _package_id(args)
+    print(f"Found {package_id} [{package_id}]\nVersion: {_version()}\nPublisher: Example")
+    return 0
+
+
+def choco_search(args):
+    print(f"{_package_id(args)}|{_version()}")
+    return 0
+
+
+def choco_list(args):
+    for package_id in _load_state()['choco']:
+        print(f"{package_id}|1.0.0")
+    return 0
+
+
+def _write_installer(directory, package_id):
+    os.makedirs(directory, exist_ok=True)
+    installer = os.path.join(directory, f"{package_id}.exe")
+    with open(installer, 'w') as f:
+        f.write(INSTALLER_TEMPLATE.format(python=sys.executable, package_id=package_id))
+    os.chmod(installer, os.stat(installer).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    with open(os.path.join(directory, f"{package_id}.yaml"), 'w') as f:
+        f.write(f"PackageIdentifier: {package_id}\nPackageVersion: {_version()}\n"
+                f"InstallerSwitches:\n  Silent: --silent\n")
+
+
+def download(tool, args):
+    package_id = _package_id(args)
+    directory = _option(args, '--download-directory', '--output-directory', '-o')
+    _progress(f"Downloading {package_id}", _float('FAKE_PM_DOWNLOAD'))
+    if _should_fail(tool, package_id):
+        print(f"Failed to download {package_id}", file=sys.stderr)
+        return 1
+    if tool == 'choco':
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f"{package_id}.{_version()}.nupkg"), 'wb').close()
+    else:
+        _write_installer(directory, package_id)
+    print(f"Installer downloaded: {directory}")
+    return 0
+
+
+def install(tool, args):
+    if tool == 'choco':
+        return choco_install(args)
+    package_id = _package_id(args)
+    _progress(f"Downloading {package_id}", _float('FAKE_PM_DOWNLOAD'))
+    time.sleep(_float('FAKE_PM_INSTALL'))
+    if _should_fail(tool, package_id):
+        print(f"Installer failed for {package_id}", file=sys.stderr)
+        return 1
+    _mark_installed(tool, package_id)
+    print("Successfully installed")
+    return 0
+
+
+def choco_install(args):
+    package_ids = _package_ids(args)
+    print("Installing the following packages:")
+    print(';'.join(package_ids))
+    failures = []
+    for package_id in package_ids:
+        if not _option(args, '--source'):
+            _progress(f"Progress: Downloading {package_id} 1.0.0...", _float('FAKE_PM_DOWNLOAD'))
+        print(f"\n{package_id} v1.0.0 [Approved]")
+        time.sleep(_float('FAKE_PM_INSTALL'))
+        if _should_fail('choco', package_id):
+            print(f"ERROR: Running installer for {package_id} failed (exit code 1603).")
+            failures.append(package_id)
+        else:
+            _mark_installed('choco', package_id)
+            print(f" The install of {package_id} was successful.")
+    installed = len(package_ids) - len(failures)
+    summary = f"\nChocolatey installed {installed}/{len(package_ids)} packages."
+    if failures:
+        summary += f" {len(failures)} packages failed."
+    print(summary)
+    if failures:
+        print("\nFailures")
+        for package_id in failures:
+            print(f" - {package_id} (exited 1603) - Error while running installer")
+        return 1
+    return 0
+
+
+def winget_import(args):
+    with open(_option(args, '--import-file', '-i'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    failed = False
+    for source in manifest['Sources']:
+        for package in source['Packages']:
+            package_id = package['PackageIdentifier']
+            print(f"Found {package_id} [{package_id}] Version 1.0.0")
+            _progress("  ", _float('FAKE_PM_DOWNLOAD'))
+            print("Starting package install...")
+            time.sleep(_float('FAKE_PM_INSTALL'))
+            if _should_fail('winget', package_id):
+                print("Installer failed with exit code: 1603")
+                failed = True
+            else:
+                _mark_installed('winget', package_id)
+                print("Successfully installed")
+    if failed:
+        print("One or more imported packages failed to install.")
+        return 1
+    return 0
+
+
+def main(tool):
+    args = sys.argv[1:]
+    # The bar styles draw with block characters, whatever the console's code page
+    sys.stdout.reconfigure(encoding='utf-8')
+    time.sleep(_float('FAKE_PM_STARTUP'))
+    if not args:
+        print(f"fake {tool}")
+        return 0
+    verb = args[0]
+    if verb == 'download':
+        return download(tool, args)
+    if verb == 'install':
+        return install(tool, args)
+    if verb == 'import' and tool == 'winget':
+        return winget_import(args)
+    if verb == 'export' and tool == 'winget':
+        return export(args)
+    if verb == 'show' and tool == 'winget':
+        return show(args)
+    if verb == 'list' and tool == 'choco':
+        return choco_list(args)
+    if verb == 'search' and tool == 'choco':
+        return choco_search(args)
+    print(f"fake {tool}: unsupported command {verb}", file=sys.stderr)
+    return 1
@@ -14,13 +14,44 @@ Usage:
 """
 
 
+import time
+START_TIME = time.perf_counter()
+
+import argparse
+import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from WindowManager import WindowManager
+from EngineOptions import add_engine_arguments, build_engine_options
+import Tracing
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Replicator program installer")
+    add_engine_arguments(parser)
+    parser.add_argument('--timings', action='store_true',
+                        help="print time to the welcome screen and to each window")
+    # Leave anything we do not know (e.g. Qt's own options) to QApplication
+    return parser.parse_known_args(argv)
 
 def main():
-    app = QApplication([])
-    window_manager = WindowManager()
-    window_manager.show_main_window()
+    args, qt_args = parse_args(sys.argv[1:])
+    if args.trace:
+        Tracing.start_tracing(args.trace)
+        Tracing.interval("imports", "startup", START_TIME, time.perf_counter())
+    engine_options = build_engine_options(args)
+    with Tracing.span("start GUI", "windows"):
+        app = QApplication(sys.argv[:1] + qt_args)
+        window_manager = WindowManager(engine_options)
+        window_manager.show_main_window()
+    if args.timings:
+        # Runs once the event loop has shown the welcome screen
+        QTimer.singleShot(0, lambda: print(
+            f"Welcome screen after {(time.perf_counter() - START_TIME) * 1000:.0f} ms"
+        ))
+        app.aboutToQuit.connect(lambda: print(
+            ", ".join(f"{name} built after {seconds * 1000:.0f} ms"
+                      for name, seconds in window_manager.timings.items())
+        ))
     return app.exec_()
 
 if __name__ == "__main__":
@@ -0,0 +1,278 @@
+"""
+Replicator command line: install programs from the catalog without the GUI.
+
+Nothing imported here touches PyQt5, so provisioning scripts do not pay for
+Qt start-up.
+
+Usage:
+    python -m replicator [options] PROGRAM [PROGRAM ...]
+    python -m replicator --file programs.txt --progress jsonl
+    python -m replicator --profile workstation.json
+    python -m replicator --save-profile workstation.json vlc firefox git
+    python -m replicator --resume
+    python -m replicator --inventory this-machine.json
+    python -m replicator --report --report-runs 10
+    python -m replicator --profile workstation.json --trace run.trace.json
+
+Programs may be given by display name, catalog key, winget id or choco id.
+
+Exit codes:
+    0   every program installed (or was already installed)
+    1   at least one program failed or has no package
+    2   bad arguments or unknown programs
+    130 cancelled with Ctrl+C
+"""
+
+import time
+START_TIME = time.perf_counter()
+
+import argparse
+import json
+import signal
+import sys
+from typing import Dict, List, Optional, TextIO
+from Catalog import shared_catalog
+from EngineOptions import add_engine_arguments, build_engine_options
+from InstallEngine import InstallEngine
+from InstallJournal import InstallJournal
+from ProgressAggregator import ProgressSnapshot
+from InstallPlan import InstallPlan, PlanCache, compile_plan
+from Inventory import capture_inventory
+from TweakEngine import TweakEngine
+from RunLog import PackageResult, RunLog, format_report
+import Tracing
+from Profile import Profile, load_profile, save_profile
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+# Progress lines per second in a terminal or log
+CLI_PROGRESS_HZ = 2.0
+
+
+def read_program_file(path: str) -> List[str]:
+    """
+    Programs from a JSON list, a JSON object with a "programs" list, or a
+    text file with one program per line (# starts a comment).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith(('[', '{')):
+        data = json.loads(text)
+        return list(data['programs'] if isinstance(data, dict) else data)
+    lines = (line.split('#', 1)[0].strip() for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+class ProgressPrinter:
+    """
+    Writes engine progress as plain text or as JSON lines.
+    """
+
+    def __init__(self, mode: str, stream: TextIO = sys.stdout):
+        self.mode = mode
+        self.stream = stream
+        self._last_status = ""
+
+    def _emit(self, record: Dict) -> None:
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def snapshot(self, snapshot: ProgressSnapshot) -> None:
+        if self.mode == 'jsonl':
+            self._emit({'event': 'progress', 'overall': round(snapshot.overall, 1),
+                        'status': snapshot.status,
+                        'packages': {name: round(value, 1) for name, value in snapshot.packages.items()}})
+        elif self.mode == 'text' and snapshot.status != self._last_status:
+            self._last_status = snapshot.status
+            print(f"[{snapshot.overall:3.0f}%] {snapshot.status}", file=self.stream, flush=True)
+
+    def tweak_results(self, results: List[str]) -> int:
+        """
+        Print the tweak messages and a summary; returns how many did not apply.
+        """
+        counts: Dict[str, int] = {}
+        for result in results:
+            if result.startswith('Applied'):
+                status = 'applied'
+            elif result.startswith('Already applied'):
+                status = 'unchanged'
+            else:
+                status = 'failed'
+            counts[status] = counts.get(status, 0) + 1
+            if self.mode == 'jsonl':
+                self._emit({'event': 'tweak', 'status': status, 'message': result})
+            else:
+                print(result, file=self.stream)
+        if self.mode == 'jsonl':
+            self._emit({'event': 'tweak_summary', **counts})
+        else:
+            print(f"tweaks: {counts.get('applied', 0)} applied, {counts.get('unchanged', 0)} already in place, "
+                  f"{counts.get('failed', 0)} failed", file=self.stream)
+        self.stream.flush()
+        return counts.get('failed', 0)
+
+    def results(self, records: List[PackageResult], seconds: float) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for record in records:
+            counts[record.status] = counts.get(record.status, 0) + 1
+            if self.mode == 'jsonl':
+                fields = record.to_dict()
+                del fields['run'], fields['time']
+                self._emit({'event': 'result', **fields})
+            else:
+                print(record.message, file=self.stream)
+        if self.mode == 'jsonl':
+            self._emit({'event': 'summary', 'seconds': round(seconds, 3), **counts})
+        else:
+            summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+            print(f"{summary} in {seconds:.1f} s", file=self.stream)
+        self.stream.flush()
+        return counts
+
+
+def print_plan(plan: InstallPlan, stream: TextIO = sys.stdout) -> None:
+    for step in plan.steps:
+        print(f"{step.program}: {' '.join(step.command)}", file=stream)
+        if step.fallback_command:
+            print(f"    fallback: {' '.join(step.fallback_command)}", file=stream)
+    for program in plan.unavailable:
+        print(f"{program}: no package", file=stream)
+    if plan.tweaks:
+        print(f"tweaks: {', '.join(plan.tweaks)}", file=stream)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='replicator', description="Install programs from the Replicator catalog")
+    parser.add_argument('programs', nargs='*', help="programs to install")
+    parser.add_argument('--file', help="file listing programs to install")
+    parser.add_argument('--profile', help="profile whose programs to install")
+    parser.add_argument('--save-profile', metavar='PATH',
+                        help="write the given programs as a profile, then exit")
+    parser.add_argument('--inventory', metavar='PATH',
+                        help="write the catalog programs installed on this machine as a profile, then exit")
+    parser.add_argument('--catalog', default='./applications.json', help="catalog file")
+    parser.add_argument('--no-plan-cache', action='store_true',
+                        help="resolve the programs again instead of using a cached plan")
+    parser.add_argument('--progress', choices=('text', 'jsonl', 'none'), default='text',
+                        help="progress output format")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="show the install plan, then exit")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the last unfinished installation")
+    parser.add_argument('--reapply-tweaks', action='store_true',
+                        help="apply the profile's tweaks even where they are already in place")
+    parser.add_argument('--report', action='store_true',
+                        help="summarize the per-package results of past runs, then exit")
+    parser.add_argument('--report-runs', type=int, metavar='N',
+                        help="summarize only the last N runs")
+    parser.add_argument('--timings', action='store_true', help="print start-up timings to stderr")
+    add_engine_arguments(parser)
+    parser.set_defaults(progress_hz=CLI_PROGRESS_HZ)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    imported = time.perf_counter()
+    if args.trace:
+        Tracing.start_tracing(args.trace)
+        Tracing.interval("imports", "startup", START_TIME, imported)
+
+    if args.inventory:
+        inventory = capture_inventory(shared_catalog(args.catalog))
+        save_profile(inventory.to_profile(), args.inventory)
+        unmatched = ', '.join(f"{len(ids)} {source}" for source, ids in inventory.unmatched.items())
+        print(f"Captured {len(inventory.programs)} programs to {args.inventory} "
+              f"(installed but not in the catalog: {unmatched})", file=sys.stderr)
+        return EXIT_OK
+
+    if args.report:
+        records = RunLog(args.run_log).read(args.report_runs)
+        if not records:
+            print("No runs recorded yet.", file=sys.stderr)
+            return EXIT_OK
+        print(format_report(records))
+        return EXIT_OK
+
+    requested = list(args.programs)
+    tweaks: List[str] = []
+    if args.profile:
+        profile = load_profile(args.profile)
+        requested.extend(profile.programs)
+        tweaks = profile.tweaks
+    if args.file:
+        requested.extend(read_program_file(args.file))
+
+    engine_options = build_engine_options(args)
+    journal: Optional[InstallJournal] = engine_options['journal']
+    if args.resume:
+        run = journal.unfinished() if journal else None
+        if not run:
+            print("No unfinished installation to resume.", file=sys.stderr)
+            return EXIT_USAGE
+        journal.resume(run)
+        requested = requested or run.remaining
+
+    if not requested:
+        print("No programs given.", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.save_profile:
+        catalog = shared_catalog(args.catalog)
+        program_ids = [catalog.resolve_program_id(program) or program for program in requested]
+        save_profile(Profile(program_ids, tweaks), args.save_profile)
+        return EXIT_OK
+
+    # Identical profiles on identical catalogs reuse the compiled plan and
+    # never load the catalog
+    profile = Profile(requested, tweaks)
+    with Tracing.span("compile plan", "startup", cached=not args.no_plan_cache):
+        if args.no_plan_cache:
+            plan = compile_plan(profile, shared_catalog(args.catalog))
+        else:
+            plan = PlanCache().compile(profile, args.catalog, lambda: shared_catalog(args.catalog))
+    planned = time.perf_counter()
+    if args.timings:
+        print(f"imports {imported - START_TIME:.3f} s, plan {planned - imported:.3f} s",
+              file=sys.stderr)
+
+    if plan.unresolved:
+        print(f"Unknown programs: {', '.join(plan.unresolved)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.dry_run:
+        print_plan(plan)
+        return EXIT_OK
+
+    printer = ProgressPrinter(args.progress)
+    engine = InstallEngine(on_snapshot=printer.snapshot, **engine_options)
+
+    # First Ctrl+C cancels cleanly; a second one interrupts
+    def on_interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        engine.cancel()
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    start = time.perf_counter()
+    try:
+        engine.run_plan(plan)
+    except KeyboardInterrupt:
+        return EXIT_CANCELLED
+    counts = printer.results(engine.records, time.perf_counter() - start)
+
+    if engine.cancelled:
+        return EXIT_CANCELLED
+    # Tweaks not yet in place, all in one elevated session, after the programs
+    failed_tweaks = 0
+    if plan.tweaks:
+        failed_tweaks = printer.tweak_results(TweakEngine().apply(plan.tweaks, args.reapply_tweaks))
+    if counts.get('failed') or counts.get('unavailable') or failed_tweaks:
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
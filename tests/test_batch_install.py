@@ -0,0 +1,100 @@
+"""
+Batched choco/winget output parsers, fed the output of the fake package
+managers in benchmarks/stubs.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from BatchInstall import ChocoBatchParser, WingetImportParser, write_winget_import_manifest
+
+STUB_ENV = {'FAKE_PM_STARTUP': '0', 'FAKE_PM_DOWNLOAD': '0', 'FAKE_PM_INSTALL': '0', 'FAKE_PM_SEED': '1'}
+
+
+def run_stub(tool, args, fail_rate='0'):
+    env = dict(os.environ, FAKE_PM_FAIL_RATE=fail_rate, **STUB_ENV)
+    process = subprocess.run([sys.executable, os.path.join(STUBS, tool)] + args,
+                             capture_output=True, text=True, encoding='utf-8', env=env)
+    return process.stdout.splitlines(), process.returncode
+
+
+def parse(parser, lines, returncode):
+    for line in lines:
+        parser.feed(line)
+    return parser.finish(returncode)
+
+
+class ChocoBatchParserTest(unittest.TestCase):
+
+    def test_all_installed(self):
+        lines, returncode = run_stub('choco', ['install', 'git', 'nodejs', '-y'])
+        results = parse(ChocoBatchParser(['git', 'nodejs']), lines, returncode)
+        self.assertEqual(results, {'git': (True, "installed"), 'nodejs': (True, "installed")})
+
+    def test_all_failed(self):
+        lines, returncode = run_stub('choco', ['install', 'git', 'nodejs', '-y'], fail_rate='1')
+        self.assertEqual(returncode, 1)
+        results = parse(ChocoBatchParser(['git', 'nodejs']), lines, returncode)
+        self.assertEqual(results, {'git': (False, "Error while running installer"),
+                                   'nodejs': (False, "Error while running installer")})
+
+    def test_ids_are_reported_as_requested(self):
+        parser = ChocoBatchParser(['Git'])
+        parser.feed("git v2.43.0 [Approved]")
+        self.assertEqual(parser.current, 'Git')
+        parser.feed(" The install of git was successful.")
+        self.assertEqual(parser.finish(0), {'Git': (True, "installed")})
+
+    def test_already_installed_warning_is_not_a_failure(self):
+        parser = ChocoBatchParser(['git'])
+        parser.feed("git v2.43.0 already installed.")
+        parser.feed(" - git - git v2.43.0 already installed. Use --force to reinstall.")
+        self.assertEqual(parser.finish(0), {'git': (True, "already installed")})
+
+    def test_unreported_packages_fail(self):
+        results = ChocoBatchParser(['git']).finish(-1)
+        self.assertEqual(results, {'git': (False, "no result in batch output (exit code -1)")})
+
+
+class WingetImportParserTest(unittest.TestCase):
+
+    def run_import(self, package_ids, fail_rate='0'):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = os.path.join(tmp, 'import.json')
+            write_winget_import_manifest(package_ids, manifest)
+            with open(manifest, 'r', encoding='utf-8') as f:
+                self.assertEqual([package['PackageIdentifier'] for package in json.load(f)['Sources'][0]['Packages']],
+                                 package_ids)
+            lines, returncode = run_stub('winget', ['import', '--import-file', manifest], fail_rate)
+        return parse(WingetImportParser(package_ids), lines, returncode)
+
+    def test_all_installed(self):
+        results = self.run_import(['Git.Git', '7zip.7zip'])
+        self.assertEqual(results, {'Git.Git': (True, "installed"), '7zip.7zip': (True, "installed")})
+
+    def test_all_failed(self):
+        results = self.run_import(['Git.Git', '7zip.7zip'], fail_rate='1')
+        self.assertEqual(results, {'Git.Git': (False, "Installer failed with exit code: 1603"),
+                                   '7zip.7zip': (False, "Installer failed with exit code: 1603")})
+
+    def test_already_installed(self):
+        parser = WingetImportParser(['Git.Git'])
+        parser.feed("Package is already installed: Git.Git")
+        self.assertEqual(parser.finish(0), {'Git.Git': (True, "already installed")})
+
+    def test_output_before_a_package_is_ignored(self):
+        parser = WingetImportParser(['Git.Git'])
+        parser.feed("Successfully installed")
+        self.assertEqual(parser.finish(1), {'Git.Git': (False, "no result in batch output (exit code 1)")})
+
+
+if __name__ == '__main__':
+    unittest.main()
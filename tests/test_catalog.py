@@ -0,0 +1,152 @@
+"""
+Catalog lookups and search, on both the JSON and the SQLite backend.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Catalog import Catalog
+from CatalogStore import UNCATEGORIZED
+
+CATALOG = {
+    'python': {'content': "Python 3", 'description': "programming language", 'category': "Development",
+               'winget': "Python.Python.3.12", 'choco': "python"},
+    # Its display name is another program's catalog key
+    'python2': {'content': "python", 'description': "legacy interpreter", 'category': "Development",
+                'winget': "na", 'choco': "python2"},
+    'notepadpp': {'content': "Notepad++", 'description': "text editor", 'category': "Development",
+                  'winget': "Notepad++.Notepad++", 'choco': "notepadplusplus"},
+    # Its winget id is another program's display name
+    'npp_portable': {'content': "Notepad++ Portable", 'description': "portable text editor",
+                     'category': "Development", 'winget': "Notepad++", 'choco': "na"},
+    'vlc': {'content': "VLC", 'description': "media player for video and music", 'category': "Multimedia",
+            'winget': "VideoLAN.VLC", 'choco': "vlc"},
+    'firefox': {'content': "Firefox", 'description': "web browser", 'category': "Browsers",
+                'winget': "Mozilla.Firefox", 'choco': "firefox"},
+    'shotcut': {'content': "Video Editor", 'description': "edits clips", 'category': "Multimedia",
+                'winget': "Meltytech.Shotcut", 'choco': "shotcut"},
+    'orphan': {'content': "Orphan Tool", 'description': "no category", 'winget': "Example.Orphan", 'choco': "na"},
+    # Not a program; the catalog carries a few entries like this
+    'Transform': "not a program",
+}
+
+
+class CatalogTests:
+    """
+    Checks every backend must pass; subclasses pick the backend.
+    """
+
+    BACKEND = ''
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        catalog_path = os.path.join(self._tmp.name, 'applications.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(CATALOG, f)
+        self.catalog = Catalog(catalog_path, self.BACKEND)
+
+    def tearDown(self):
+        if self.catalog.store:
+            self.catalog.store.close()
+        self._tmp.cleanup()
+
+    def test_backend(self):
+        self.assertEqual(self.catalog.store is not None, self.BACKEND == 'sqlite')
+
+    def test_catalog_order(self):
+        self.assertEqual([program_id for program_id, _ in self.catalog.iter_programs()],
+                         ['python', 'python2', 'notepadpp', 'npp_portable', 'vlc', 'firefox', 'shotcut', 'orphan'])
+        self.assertEqual(self.catalog.names[0], "Python 3")
+
+    def test_name_of(self):
+        self.assertEqual(self.catalog.name_of('vlc'), "VLC")
+        self.assertIsNone(self.catalog.name_of('missing'))
+
+    def test_resolve_by_every_kind_of_id(self):
+        self.assertEqual(self.catalog.resolve_program_id('vlc'), 'vlc')
+        self.assertEqual(self.catalog.resolve_program_id("VLC"), 'vlc')
+        self.assertEqual(self.catalog.resolve_program_id("videolan.vlc"), 'vlc')
+        self.assertEqual(self.catalog.resolve_program_id("NotepadPlusPlus"), 'notepadpp')
+        self.assertIsNone(self.catalog.resolve_program_id("Missing Program"))
+
+    def test_key_wins_over_display_name(self):
+        self.assertEqual(self.catalog.resolve_program_id("python"), 'python')
+
+    def test_display_name_wins_over_package_id(self):
+        self.assertEqual(self.catalog.resolve_program_id("Notepad++"), 'notepadpp')
+
+    def test_find_package(self):
+        self.assertEqual(self.catalog.find_package('winget', "mozilla.firefox"), 'firefox')
+        self.assertEqual(self.catalog.find_package('choco', "python2"), 'python2')
+        self.assertIsNone(self.catalog.find_package('choco', "Mozilla.Firefox"))
+        self.assertIsNone(self.catalog.find_package('scoop', "firefox"))
+
+    def test_program_data(self):
+        self.assertEqual(self.catalog.get_program_data("VLC")['winget'], "VideoLAN.VLC")
+        self.assertEqual(self.catalog.get_program_data("Missing"), {})
+
+    def test_categories(self):
+        self.assertEqual(self.catalog.category_names(),
+                         ["Browsers", "Development", "Multimedia", UNCATEGORIZED])
+        self.assertEqual(self.catalog.category_ids("Development"),
+                         ('python', 'python2', 'notepadpp', 'npp_portable'))
+        self.assertEqual(self.catalog.category_ids(UNCATEGORIZED), ('orphan',))
+        self.assertEqual(self.catalog.category_ids("Games"), ())
+
+    def test_search_every_field(self):
+        self.assertEqual(self.catalog.search("firefox"), ["Firefox"])
+        # Description, category and package ids
+        self.assertEqual(self.catalog.search("browser"), ["Firefox"])
+        self.assertEqual(set(self.catalog.search("multimedia")), {"VLC", "Video Editor"})
+        self.assertEqual(self.catalog.search("videolan"), ["VLC"])
+        self.assertEqual(self.catalog.search("notepadplusplus"), ["Notepad++"])
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.catalog.search("fire"), ["Firefox"])
+        self.assertEqual(self.catalog.search("ref"), [])
+        # Every word must match
+        self.assertEqual(self.catalog.search("media vid"), ["VLC"])
+        self.assertEqual(self.catalog.search("media browser"), [])
+
+    def test_search_ranks_names_first(self):
+        # VLC comes first in the catalog but has "video" only in its description
+        self.assertEqual(self.catalog.search("video"), ["Video Editor", "VLC"])
+        self.assertEqual(set(self.catalog.search("python")), {"Python 3", "python"})
+
+    def test_empty_search_lists_everything(self):
+        self.assertEqual(self.catalog.search(""), list(self.catalog.names))
+        self.assertEqual(self.catalog.search("  -- "), list(self.catalog.names))
+
+
+class JsonCatalogTest(CatalogTests, unittest.TestCase):
+    BACKEND = 'json'
+
+    def test_snapshot_gives_the_same_catalog(self):
+        reloaded = Catalog(self.catalog.catalog_path, 'json')
+        self.assertEqual(dict(reloaded.applications_data), dict(self.catalog.applications_data))
+        self.assertEqual(reloaded.ids, self.catalog.ids)
+
+
+class SqliteCatalogTest(CatalogTests, unittest.TestCase):
+    BACKEND = 'sqlite'
+
+    def test_reimported_when_the_json_changes(self):
+        with open(self.catalog.catalog_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['gimp'] = {'content': "GIMP", 'description': "image editor", 'winget': "GIMP.GIMP", 'choco': "gimp"}
+        with open(self.catalog.catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        self.catalog.store.close()
+        self.catalog = Catalog(self.catalog.catalog_path, 'sqlite')
+        self.assertEqual(self.catalog.search("gimp"), ["GIMP"])
+        self.assertEqual(self.catalog.resolve_program_id("gimp.gimp"), 'gimp')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+IconLoader: logos decoded and scaled on its own thread pool, with a
+placeholder until they arrive.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtCore import Qt, QEventLoop, QThreadPool, QTimer
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    QApplication = None
+
+# Long enough for a slow machine, short enough that a hang fails the test
+LOAD_TIMEOUT_MS = 20000
+
+
+@unittest.skipIf(QApplication is None, "PyQt5 is not installed")
+class IconLoaderTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        from IconLoader import IconLoader
+        self._tmp = tempfile.TemporaryDirectory()
+        self.loader = IconLoader(size=32)
+
+    def tearDown(self):
+        self.loader.pool.waitForDone()
+        self._tmp.cleanup()
+
+    def logo(self, name, size):
+        image = QImage(size, size, QImage.Format_ARGB32)
+        image.fill(Qt.red)
+        path = os.path.join(self._tmp.name, f"{name}.png")
+        image.save(path)
+        return path
+
+    def wait_for_icons(self):
+        loop = QEventLoop()
+        self.loader.icon_loaded.connect(lambda key: self.loader.pending_count() or loop.quit())
+        QTimer.singleShot(LOAD_TIMEOUT_MS, loop.quit)
+        if self.loader.pending_count():
+            loop.exec_()
+        self.assertEqual(self.loader.pending_count(), 0, "icons still loading")
+
+    def test_uses_its_own_pool(self):
+        # Smooth scaling waits on the global pool, so icon tasks must not fill it
+        self.assertIsNot(self.loader.pool, QThreadPool.globalInstance())
+        self.assertLessEqual(self.loader.pool.maxThreadCount(), 4)
+
+    def test_large_logos_are_scaled(self):
+        # More large logos than there are threads, requested at once like a first start without an atlas
+        count = QThreadPool.globalInstance().maxThreadCount() * 2 + 2
+        for i in range(count):
+            self.loader.request(f"program{i}", self.logo(f"logo{i}", 1024))
+        self.wait_for_icons()
+        for i in range(count):
+            icon = self.loader.get_icon(f"program{i}")
+            self.assertIsNotNone(icon)
+            self.assertEqual(icon.availableSizes()[0].width(), 32)
+
+    def test_unreadable_logo(self):
+        self.loader.request("missing", os.path.join(self._tmp.name, "missing.png"))
+        self.wait_for_icons()
+        self.assertTrue(self.loader.has_icon("missing"))
+        self.assertIsNone(self.loader.get_icon("missing"))
+
+    def test_placeholder_keeps_the_icon_size(self):
+        self.assertEqual(self.loader.placeholder.availableSizes()[0].width(), 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+InstallEngine end to end against the fake winget/choco in benchmarks/stubs.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from InstallEngine import InstallEngine
+from InstallJournal import InstallJournal, DONE, FAILED
+from InstalledState import InstalledState
+from InstallerCache import InstallerCache
+from ProgramManager import ProgramManager
+from RunLog import RunLog, ERROR_EXIT_CODE, ERROR_NOT_CACHED
+
+CATALOG = {
+    'git': {'content': "Git", 'winget': "Git.Git", 'choco': "git"},
+    'vlc': {'content': "VLC", 'winget': "VideoLAN.VLC", 'choco': "vlc"},
+    'nodejs': {'content': "Node.js", 'winget': "na", 'choco': "nodejs"},
+    'nothing': {'content': "Nothing", 'winget': "na", 'choco': "na"},
+}
+PROGRAMS = ["Git", "VLC", "Node.js"]
+
+
+@unittest.skipIf(sys.platform == 'win32', "the stubs are run through their #! line")
+class InstallEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.state_path = os.path.join(self.tmp, 'state.json')
+        environment = mock.patch.dict(os.environ, {
+            'PATH': STUBS + os.pathsep + os.environ['PATH'],
+            'FAKE_PM_STARTUP': '0', 'FAKE_PM_DOWNLOAD': '0', 'FAKE_PM_INSTALL': '0',
+            'FAKE_PM_FAIL_RATE': '0', 'FAKE_PM_SEED': '1', 'FAKE_PM_STEPS': '4',
+            'FAKE_PM_OUTPUT': 'mb', 'FAKE_PM_VERSION': '1.0.0', 'FAKE_PM_STATE': self.state_path,
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+        catalog_path = os.path.join(self.tmp, 'applications.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(CATALOG, f)
+        self.program_manager = ProgramManager(catalog_path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def engine(self, **options):
+        return InstallEngine(self.program_manager, **options)
+
+    def installed(self):
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def set_installed(self, winget=(), choco=()):
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({'winget': list(winget), 'choco': list(choco)}, f)
+
+    def test_install(self):
+        progress = []
+        engine = self.engine(on_progress=lambda percent, status: progress.append(percent))
+        results = engine.run(PROGRAMS + ["Nothing"])
+        self.assertEqual(results, ["Successfully installed Git", "Successfully installed VLC",
+                                   "Successfully installed Node.js", "No installation command found for Nothing"])
+        # winget packages install from the downloaded installer, choco ones online
+        self.assertEqual(self.installed(), {'winget': [], 'choco': ['nodejs']})
+        self.assertEqual(progress[-1], 100)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual([record.status for record in engine.records],
+                         ['installed', 'installed', 'installed', 'unavailable'])
+
+    def test_failures(self):
+        os.environ['FAKE_PM_FAIL_RATE'] = '1'
+        journal = InstallJournal(os.path.join(self.tmp, 'journal.jsonl'))
+        run_log = RunLog(os.path.join(self.tmp, 'runs.jsonl'))
+        engine = self.engine(journal=journal, run_log=run_log)
+        results = engine.run(PROGRAMS)
+        for result in results:
+            self.assertTrue(result.startswith("Failed to install"), result)
+        # Every package was tried on its fallback too, which failed with an exit code
+        self.assertEqual({record.error_class for record in engine.records}, {ERROR_EXIT_CODE})
+        self.assertEqual({record.source for record in engine.records}, {'choco'})
+        self.assertEqual([record.status for record in run_log.read()], ['failed'] * 3)
+        # Failed is an outcome: the run finished and left nothing to resume
+        self.assertIsNone(journal.unfinished())
+
+    def test_cancel_before_the_run(self):
+        journal = InstallJournal(os.path.join(self.tmp, 'journal.jsonl'))
+        engine = self.engine(journal=journal)
+        engine.cancel()
+        self.assertEqual(engine.run(PROGRAMS), ["Cancelled Git", "Cancelled VLC", "Cancelled Node.js"])
+        self.assertEqual(journal.unfinished().remaining, PROGRAMS)
+
+    def test_resume_skips_completed_programs(self):
+        journal = InstallJournal(os.path.join(self.tmp, 'journal.jsonl'))
+        journal.begin(PROGRAMS)
+        journal.record("Git", DONE)
+        journal.record("VLC", FAILED)
+        journal.close(finished=False)
+        journal.resume(journal.unfinished())
+        results = self.engine(journal=journal).run(PROGRAMS)
+        self.assertEqual(results, ["Successfully installed Git (before resuming)", "Successfully installed VLC",
+                                   "Successfully installed Node.js"])
+        self.assertIsNone(journal.unfinished())
+
+    def test_skips_programs_installed_through_either_source(self):
+        self.set_installed(winget=["Git.Git"], choco=["vlc"])
+        skipped = []
+        engine = self.engine(installed_state=InstalledState(), on_skipped=skipped.extend)
+        results = engine.run(PROGRAMS)
+        self.assertEqual(results, ["Skipped Git: already installed", "Skipped VLC: already installed",
+                                   "Successfully installed Node.js"])
+        self.assertEqual(skipped, ["Git", "VLC"])
+
+    def test_installer_cache(self):
+        cache_directory = os.path.join(self.tmp, 'cache')
+        engine = self.engine(installer_cache=InstallerCache(cache_directory))
+        engine.run(["Git"])
+        self.assertGreater(engine.records[0].bytes_transferred, 0)
+
+        # Same version: installed from the cache without downloading
+        engine = self.engine(installer_cache=InstallerCache(cache_directory))
+        self.assertEqual(engine.run(["Git"]), ["Successfully installed Git"])
+        self.assertEqual(engine.records[0].bytes_transferred, 0)
+
+        # A new version upstream: downloaded again, replacing the old one
+        os.environ['FAKE_PM_VERSION'] = '2.0.0'
+        cache = InstallerCache(cache_directory)
+        engine = self.engine(installer_cache=cache)
+        self.assertEqual(engine.run(["Git"]), ["Successfully installed Git"])
+        self.assertGreater(engine.records[0].bytes_transferred, 0)
+        self.assertIsNone(cache.lookup('winget', 'Git.Git', '1.0.0'))
+        self.assertIsNotNone(cache.lookup('winget', 'Git.Git', '2.0.0'))
+
+    def test_cache_only(self):
+        cache_directory = os.path.join(self.tmp, 'cache')
+        self.engine(installer_cache=InstallerCache(cache_directory)).run(["Git"])
+        # Offline, whatever version is cached is used
+        os.environ['FAKE_PM_VERSION'] = '2.0.0'
+        engine = self.engine(installer_cache=InstallerCache(cache_directory, cache_only=True))
+        results = engine.run(["Git", "VLC"])
+        self.assertEqual(results[0], "Successfully installed Git")
+        self.assertTrue(results[1].startswith("Failed to install VLC"), results[1])
+        self.assertEqual(engine.records[1].error_class, ERROR_NOT_CACHED)
+
+    def test_batch(self):
+        results = self.engine(batch=True).run(PROGRAMS)
+        self.assertEqual(results, ["Successfully installed Git", "Successfully installed VLC",
+                                   "Successfully installed Node.js"])
+        self.assertEqual(self.installed(), {'winget': ['Git.Git', 'VideoLAN.VLC'], 'choco': ['nodejs']})
+
+    def test_batch_failures(self):
+        os.environ['FAKE_PM_FAIL_RATE'] = '1'
+        for result in self.engine(batch=True).run(PROGRAMS):
+            self.assertFalse(result.startswith("Successfully"), result)
+
+
+if __name__ == '__main__':
+    unittest.main()
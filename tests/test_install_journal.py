@@ -0,0 +1,84 @@
+"""
+InstallJournal: reading back an interrupted run and resuming it.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from InstallJournal import InstallJournal, DOWNLOADING, INSTALLING, DONE, FAILED, QUEUED
+
+
+class InstallJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'journal', 'install.jsonl')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def interrupted_run(self):
+        journal = InstallJournal(self.path)
+        journal.begin(['Git', 'VLC', '7-Zip'])
+        journal.record('Git', DOWNLOADING)
+        journal.record('Git', DONE, "Successfully installed Git")
+        journal.record('VLC', INSTALLING)
+        journal.close(finished=False)
+        return journal
+
+    def test_no_journal(self):
+        self.assertIsNone(InstallJournal(self.path).unfinished())
+
+    def test_unfinished_run(self):
+        journal = self.interrupted_run()
+        run = InstallJournal(self.path).unfinished()
+        self.assertEqual(run.run_id, journal.run_id)
+        self.assertEqual(run.states, {'Git': DONE, 'VLC': INSTALLING, '7-Zip': QUEUED})
+        self.assertEqual(run.completed, ['Git'])
+        self.assertEqual(run.remaining, ['VLC', '7-Zip'])
+
+    def test_finished_run_empties_the_journal(self):
+        journal = InstallJournal(self.path)
+        journal.begin(['Git'])
+        journal.record('Git', DONE)
+        journal.close(finished=True)
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertIsNone(journal.unfinished())
+
+    def test_resume_keeps_the_run_id(self):
+        run_id = self.interrupted_run().run_id
+        journal = InstallJournal(self.path)
+        journal.resume(journal.unfinished())
+        self.assertEqual(journal.completed, {'Git'})
+        journal.begin(['VLC', '7-Zip'])
+        self.assertEqual(journal.run_id, run_id)
+        journal.record('VLC', FAILED, "Failed to install VLC")
+        journal.close(finished=False)
+
+        run = InstallJournal(self.path).unfinished()
+        self.assertEqual(run.run_id, run_id)
+        self.assertEqual(run.states, {'Git': DONE, 'VLC': FAILED, '7-Zip': QUEUED})
+        self.assertEqual(journal.completed, set())
+
+    def test_torn_line_is_skipped(self):
+        self.interrupted_run()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "state", "run": ')
+        self.assertEqual(InstallJournal(self.path).unfinished().completed, ['Git'])
+
+    def test_discard(self):
+        self.interrupted_run()
+        journal = InstallJournal(self.path)
+        journal.resume(journal.unfinished())
+        journal.discard()
+        self.assertEqual(journal.completed, set())
+        self.assertIsNone(journal.unfinished())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Compiling profiles into install plans, and the on-disk PlanCache.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Catalog import Catalog
+from InstallPlan import InstallPlan, PlanCache, compile_plan
+from Profile import Profile
+
+CATALOG = {
+    'git': {'content': "Git", 'winget': "Git.Git", 'choco': "git"},
+    'nodejs': {'content': "Node.js", 'winget': "na", 'choco': "nodejs"},
+    'vlc': {'content': "VLC", 'winget': "VideoLAN.VLC", 'choco': "na"},
+    'paint': {'content': "Paint", 'winget': "na", 'choco': "na"},
+}
+
+
+class InstallPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.catalog_path = os.path.join(self._tmp.name, 'applications.json')
+        self.write_catalog(CATALOG)
+        self.cache = PlanCache(os.path.join(self._tmp.name, 'plans'))
+        self.loads = 0
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_catalog(self, data):
+        with open(self.catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def load_catalog(self):
+        self.loads += 1
+        return Catalog(self.catalog_path, 'json')
+
+    def test_compile(self):
+        profile = Profile(['git', "VLC", "nodejs", "Git.Git", "Paint", "Unknown"], tweaks=['dark_mode'])
+        plan = compile_plan(profile, self.load_catalog())
+        self.assertEqual([(step.program, step.source, step.package_id) for step in plan.steps],
+                         [("Git", 'winget', "Git.Git"), ("VLC", 'winget', "VideoLAN.VLC"),
+                          ("Node.js", 'choco', "nodejs")])
+        # winget first, choco as the fallback
+        self.assertEqual((plan.steps[0].fallback_source, plan.steps[0].fallback_id), ('choco', "git"))
+        self.assertIsNone(plan.steps[1].fallback_source)
+        self.assertEqual(plan.unavailable, ["Paint"])
+        self.assertEqual(plan.unresolved, ["Unknown"])
+        self.assertEqual(plan.display_names["Git.Git"], "Git")
+        self.assertEqual(plan.tweaks, ['dark_mode'])
+
+    def test_round_trip(self):
+        plan = compile_plan(Profile(['git', 'nodejs', 'paint']), self.load_catalog())
+        self.assertEqual(InstallPlan.from_dict(json.loads(json.dumps(plan.to_dict()))).to_dict(), plan.to_dict())
+
+    def test_cache_hit_skips_the_catalog(self):
+        profile = Profile(['git', 'vlc'])
+        first = self.cache.compile(profile, self.catalog_path, self.load_catalog)
+        second = self.cache.compile(Profile(['git', 'vlc'], name="other name"), self.catalog_path, self.load_catalog)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(second.to_dict(), first.to_dict())
+
+    def test_changed_profile_or_catalog_misses(self):
+        self.cache.compile(Profile(['git']), self.catalog_path, self.load_catalog)
+        self.cache.compile(Profile(['git', 'vlc']), self.catalog_path, self.load_catalog)
+        self.assertEqual(self.loads, 2)
+
+        catalog = dict(CATALOG, git={'content': "Git", 'winget': "na", 'choco': "git"})
+        # Also a different size, so the key changes even within one mtime tick
+        self.write_catalog(catalog)
+        plan = self.cache.compile(Profile(['git']), self.catalog_path, self.load_catalog)
+        self.assertEqual(self.loads, 3)
+        self.assertEqual(plan.steps[0].source, 'choco')
+
+    def test_unreadable_cache_entry_is_recompiled(self):
+        profile = Profile(['git'])
+        self.cache.compile(profile, self.catalog_path, self.load_catalog)
+        with open(self.cache._path(PlanCache.key(profile, self.catalog_path)), 'w') as f:
+            f.write('{"version": 1, "steps": [')
+        self.assertEqual(len(self.cache.compile(profile, self.catalog_path, self.load_catalog).steps), 1)
+        self.assertEqual(self.loads, 2)
+
+    def test_missing_catalog_file(self):
+        with self.assertRaises(OSError):
+            PlanCache.key(Profile(['git']), os.path.join(self._tmp.name, 'missing.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Smoke test of the GUI's first start: no logo atlas yet, so it is built in
+the background while the install window decodes logos itself.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    QApplication = None
+
+# A hang (see IconLoader) fails the test instead of blocking the suite
+STARTUP_TIMEOUT = 60
+
+
+@unittest.skipIf(QApplication is None, "PyQt5 is not installed")
+class FirstStartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = self._tmp.name
+        # The catalog and its logos are found relative to the working directory
+        shutil.copy(os.path.join(ROOT, 'applications.json'), tmp)
+        try:
+            os.symlink(os.path.join(ROOT, 'logs'), os.path.join(tmp, 'logs'))
+        except OSError:
+            shutil.copytree(os.path.join(ROOT, 'logs'), os.path.join(tmp, 'logs'))
+        self._cwd = os.getcwd()
+        os.chdir(tmp)
+        environment = mock.patch.dict(os.environ, {'LOCALAPPDATA': tmp})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def process_events_until(self, condition):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        return condition()
+
+    def test_install_window_without_atlas(self):
+        from WindowManager import WindowManager
+        self.assertFalse(os.path.exists('logos.atlas'))
+        window_manager = WindowManager()
+        window_manager.show_main_window()
+        window_manager.show_install_window()
+        content = window_manager.install_window.central_widget
+        self.assertGreater(content.available_proxy.rowCount(), 0)
+
+        self.assertTrue(self.process_events_until(
+            lambda: os.path.exists('logos.atlas') and content.icon_loader.pending_count() == 0
+        ), "logo atlas or icons never finished loading")
+
+        # Both search boxes, one search after another
+        for text in ("zip", "chrome", ""):
+            content.available_search.setText(text)
+            self.app.processEvents()
+        content._move_to_selected(content.program_manager.select(["7-Zip", "Git"]))
+        for text in ("zip", "git", ""):
+            content.selected_search.setText(text)
+            self.app.processEvents()
+        self.assertEqual(content.selected_proxy.rowCount(), 2)
+
+        content.icon_loader.pool.waitForDone()
+        window_manager.install_window.close()
+        window_manager.main_window.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+InstallerCache: version keys, LRU eviction and when the index is written.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from InstallerCache import InstallerCache, detect_version
+
+
+def write_download(directory, package_id, version, size=1024):
+    """
+    An installer and manifest laid out the way winget download leaves them.
+    """
+    os.makedirs(directory, exist_ok=True)
+    installer = os.path.join(directory, f"{package_id}.exe")
+    with open(installer, 'wb') as f:
+        f.write(version.encode('utf-8') * (size // len(version)))
+    with open(os.path.join(directory, f"{package_id}.yaml"), 'w') as f:
+        f.write(f"PackageIdentifier: {package_id}\nPackageVersion: {version}\n")
+    return installer
+
+
+class InstallerCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.cache_directory = os.path.join(self.tmp, 'cache')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def download(self, package_id, version, size=1024):
+        return write_download(os.path.join(self.tmp, 'downloads', package_id, version), package_id, version, size)
+
+    def test_detect_version(self):
+        self.assertEqual(detect_version(self.download('Git.Git', '2.43.0')), '2.43.0')
+
+    def test_lookup_by_version(self):
+        cache = InstallerCache(self.cache_directory)
+        path = cache.store('winget', 'Git.Git', self.download('Git.Git', '2.43.0'))
+        self.assertTrue(os.path.isfile(path))
+        self.assertTrue(cache.has('winget', 'git.git'))
+        self.assertEqual(cache.lookup('winget', 'Git.Git', '2.43.0'), path)
+        self.assertEqual(cache.lookup('winget', 'Git.Git'), path)
+        self.assertIsNone(cache.lookup('winget', 'Git.Git', '2.44.0'))
+        self.assertIsNone(cache.lookup('choco', 'Git.Git'))
+
+    def test_new_version_replaces_the_old_one(self):
+        cache = InstallerCache(self.cache_directory)
+        old_path = cache.store('winget', 'Git.Git', self.download('Git.Git', '2.43.0'))
+        new_path = cache.store('winget', 'Git.Git', self.download('Git.Git', '2.44.0'))
+        self.assertFalse(os.path.exists(old_path))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_directory, 'winget', 'git.git', '2.43.0')))
+        self.assertIsNone(cache.lookup('winget', 'Git.Git', '2.43.0'))
+        self.assertEqual(cache.lookup('winget', 'Git.Git', '2.44.0'), new_path)
+
+    def test_deleted_installer_is_a_miss(self):
+        cache = InstallerCache(self.cache_directory)
+        os.remove(cache.store('winget', 'Git.Git', self.download('Git.Git', '2.43.0')))
+        self.assertIsNone(cache.lookup('winget', 'Git.Git', '2.43.0'))
+        self.assertFalse(cache.has('winget', 'Git.Git'))
+
+    def test_evicts_least_recently_used(self):
+        cache = InstallerCache(self.cache_directory)
+        for package_id in ('A.A', 'B.B', 'C.C'):
+            cache.store('winget', package_id, self.download(package_id, '1.0.0', size=4096))
+            time.sleep(0.01)
+        # A is used last, so B and C are the oldest
+        cache.lookup('winget', 'A.A')
+        entry_size = cache.total_size() // 3
+        cache.max_bytes = entry_size + entry_size // 2
+        self.assertEqual(cache.evict(), 2)
+        self.assertTrue(cache.has('winget', 'A.A'))
+        self.assertFalse(cache.has('winget', 'B.B'))
+        self.assertFalse(cache.has('winget', 'C.C'))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_directory, 'winget', 'b.b')))
+        self.assertEqual(InstallerCache(self.cache_directory).total_size(), cache.total_size())
+
+    def test_nothing_evicted_under_the_limit(self):
+        cache = InstallerCache(self.cache_directory)
+        cache.store('winget', 'A.A', self.download('A.A', '1.0.0'))
+        self.assertEqual(cache.evict(), 0)
+
+    def test_lookups_are_saved_once(self):
+        cache = InstallerCache(self.cache_directory)
+        cache.store('winget', 'Git.Git', self.download('Git.Git', '2.43.0'))
+        stored_time = os.stat(cache.index_path).st_mtime_ns
+        time.sleep(0.01)
+        cache.lookup('winget', 'Git.Git', '2.43.0')
+        self.assertEqual(os.stat(cache.index_path).st_mtime_ns, stored_time)
+        cache.save()
+        with open(cache.index_path, 'r', encoding='utf-8') as f:
+            saved_last_used = json.load(f)['winget/git.git/2.43.0']['last_used']
+        self.assertEqual(saved_last_used, cache._entries['winget/git.git/2.43.0']['last_used'])
+        saved_time = os.stat(cache.index_path).st_mtime_ns
+        time.sleep(0.01)
+        cache.save()
+        self.assertEqual(os.stat(cache.index_path).st_mtime_ns, saved_time)
+
+    def test_index_survives_reopening(self):
+        cache = InstallerCache(self.cache_directory)
+        path = cache.store('winget', 'Git.Git', self.download('Git.Git', '2.43.0'))
+        self.assertEqual(InstallerCache(self.cache_directory).lookup('winget', 'Git.Git', '2.43.0'), path)
+
+    def test_corrupt_index_starts_empty(self):
+        os.makedirs(self.cache_directory)
+        with open(os.path.join(self.cache_directory, 'index.json'), 'w') as f:
+            f.write('{"torn')
+        self.assertEqual(InstallerCache(self.cache_directory).total_size(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Inventory: matching what the fake winget and choco report as installed
+against the catalog.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, 'benchmarks', 'stubs')
+sys.path.insert(0, ROOT)
+
+from Catalog import Catalog
+from Inventory import capture_inventory
+
+CATALOG = {
+    'git': {'content': "Git", 'winget': "Git.Git", 'choco': "git"},
+    'vlc': {'content': "VLC", 'winget': "VideoLAN.VLC", 'choco': "vlc"},
+    'nodejs': {'content': "Node.js", 'winget': "na", 'choco': "nodejs"},
+    'firefox': {'content': "Firefox", 'winget': "Mozilla.Firefox", 'choco': "firefox"},
+}
+
+
+@unittest.skipIf(sys.platform == 'win32', "the stubs are run through their #! line")
+class InventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        state_path = os.path.join(self._tmp.name, 'state.json')
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump({'winget': ["git.git", "VideoLAN.VLC", "Microsoft.Edge"],
+                       'choco': ["vlc", "nodejs", "chocolatey"]}, f)
+        environment = mock.patch.dict(os.environ, {
+            'PATH': STUBS + os.pathsep + os.environ['PATH'], 'FAKE_PM_STARTUP': '0', 'FAKE_PM_STATE': state_path,
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+        catalog_path = os.path.join(self._tmp.name, 'applications.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(CATALOG, f)
+        self.catalog = Catalog(catalog_path, 'json')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_capture(self):
+        inventory = capture_inventory(self.catalog)
+        # Found by either source, matched ignoring case; winget wins when both have it
+        self.assertEqual(inventory.programs, {
+            'git': ('winget', "git.git"),
+            'vlc': ('winget', "VideoLAN.VLC"),
+            'nodejs': ('choco', "nodejs"),
+        })
+        self.assertEqual(inventory.unmatched, {'winget': ["Microsoft.Edge"], 'choco': ["chocolatey"]})
+
+    def test_one_source(self):
+        inventory = capture_inventory(self.catalog, sources=('choco',))
+        self.assertEqual(inventory.programs, {'vlc': ('choco', "vlc"), 'nodejs': ('choco', "nodejs")})
+
+    def test_profile(self):
+        profile = capture_inventory(self.catalog).to_profile("old-pc")
+        self.assertEqual(profile.name, "old-pc")
+        self.assertEqual(profile.programs, ['git', 'nodejs', 'vlc'])
+
+    def test_without_package_managers(self):
+        with mock.patch.dict(os.environ, {'PATH': self._tmp.name}):
+            inventory = capture_inventory(self.catalog)
+        self.assertEqual(inventory.programs, {})
+        self.assertEqual(inventory.unmatched, {'winget': [], 'choco': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Package-manager command lines: versions, silent switches from manifests
+and local installer commands.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import PackageCommands
+from PackageCommands import (WINGET, CHOCO, ARGUMENT_PATTERN, find_installer, local_install_command,
+                             manifest_silent_switches, parse_version)
+
+MULTI_INSTALLER_MANIFEST = """\
+PackageIdentifier: Example.App
+PackageVersion: 1.2.3
+InstallerType: inno
+InstallerSwitches:
+  Silent: /VERYSILENT
+Installers:
+- Architecture: x64
+  Scope: user
+  InstallerUrl: https://example.com/app-x64-user.exe
+- Architecture: x64
+  Scope: machine
+  InstallerUrl: https://example.com/app-x64.exe
+  InstallerSwitches:
+    Silent: '/VERYSILENT /ALLUSERS /DIR="C:\\Program Files\\App"'
+- Architecture: arm64
+  Scope: machine
+  InstallerType: nullsoft
+  InstallerSwitches:
+    Silent: /S
+- Architecture: x64
+  InstallerType: msi
+  InstallerSwitches:
+    Silent: /quiet
+"""
+
+
+class VersionTest(unittest.TestCase):
+
+    def test_winget(self):
+        output = "Found Git [Git.Git]\nVersion: 2.43.0\nPublisher: The Git Development Community\n"
+        self.assertEqual(parse_version(WINGET, 'Git.Git', output), '2.43.0')
+        self.assertIsNone(parse_version(WINGET, 'Git.Git', "No package found"))
+
+    def test_choco(self):
+        output = "git.install|2.43.0\ngit|2.43.0.1\n"
+        self.assertEqual(parse_version(CHOCO, 'Git', output), '2.43.0.1')
+        self.assertIsNone(parse_version(CHOCO, 'vlc', output))
+
+
+class SilentSwitchesTest(unittest.TestCase):
+
+    def switches(self, installer_name, machine='AMD64'):
+        with mock.patch.object(PackageCommands.platform, 'machine', return_value=machine):
+            return manifest_silent_switches(MULTI_INSTALLER_MANIFEST, installer_name)
+
+    def test_root_switches_without_installers(self):
+        manifest = "PackageIdentifier: A\nInstallerSwitches:\n  Silent: \"/S\"\n"
+        self.assertEqual(manifest_silent_switches(manifest, 'A.exe'), '/S')
+
+    def test_picked_by_file_name(self):
+        self.assertEqual(self.switches('Example.App_1.2.3_x64_machine_inno.exe'),
+                         '/VERYSILENT /ALLUSERS /DIR="C:\\Program Files\\App"')
+        self.assertEqual(self.switches('Example.App_1.2.3_x64_user_inno.exe'), '/VERYSILENT')
+        self.assertEqual(self.switches('Example.App_1.2.3_arm64_machine.exe'), '/S')
+
+    def test_picked_by_machine_architecture(self):
+        self.assertEqual(self.switches('Example.App_1.2.3_machine.exe', machine='aarch64'), '/S')
+
+    def test_ambiguous(self):
+        self.assertIsNone(self.switches('Example.App_1.2.3.exe'))
+
+    def test_arguments_keep_quoted_paths(self):
+        self.assertEqual(ARGUMENT_PATTERN.findall('/VERYSILENT /DIR="C:\\Program Files\\App" /LOG'),
+                         ['/VERYSILENT', '/DIR="C:\\Program Files\\App"', '/LOG'])
+
+
+class LocalInstallCommandTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def touch(self, name, content=""):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_find_installer(self):
+        self.assertIsNone(find_installer(self.tmp))
+        self.touch('App.yaml')
+        installer = self.touch('App.msi')
+        self.assertEqual(find_installer(self.tmp), installer)
+        self.assertIsNone(find_installer(os.path.join(self.tmp, 'missing')))
+
+    def test_nupkg(self):
+        installer = self.touch('git.2.43.0.nupkg')
+        self.assertEqual(local_install_command(CHOCO, 'git', installer),
+                         [CHOCO, 'install', 'git', '-y', '--source', self.tmp])
+
+    def test_msi(self):
+        installer = self.touch('App.msi')
+        self.assertEqual(local_install_command(WINGET, 'Example.App', installer),
+                         ['msiexec', '/i', installer, '/qn', '/norestart'])
+
+    def test_appx_path_is_quoted(self):
+        installer = self.touch("Bob's App.msix")
+        command = local_install_command(WINGET, 'Example.App', installer)
+        self.assertEqual(command[-1], "Add-AppxPackage -Path '{}'".format(installer.replace("'", "''")))
+
+    def test_exe_with_manifest_switches(self):
+        self.touch('Example.App.yaml', "PackageIdentifier: Example.App\nInstallerSwitches:\n  Silent: /S /D=\"C:\\A B\"\n")
+        installer = self.touch('Example.App.exe')
+        self.assertEqual(local_install_command(WINGET, 'Example.App', installer),
+                         [installer, '/S', '/D="C:\\A B"'])
+
+    def test_exe_without_switches_installs_online(self):
+        installer = self.touch('Example.App.exe')
+        self.assertEqual(local_install_command(WINGET, 'Example.App', installer),
+                         PackageCommands.install_command(WINGET, 'Example.App'))
+
+
+if __name__ == '__main__':
+    unittest.main()
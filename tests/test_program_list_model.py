@@ -0,0 +1,99 @@
+"""
+ProgramListModel and the search proxy in front of it, on an offscreen
+QApplication.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    QApplication = None
+
+CATALOG = {
+    'git': {'content': "Git", 'description': "version control", 'winget': "Git.Git", 'choco': "git"},
+    'vlc': {'content': "VLC", 'description': "media player", 'winget': "VideoLAN.VLC", 'choco': "vlc"},
+    'gimp': {'content': "GIMP", 'description': "image editor", 'winget': "GIMP.GIMP", 'choco': "gimp"},
+    '7zip': {'content': "7-Zip", 'description': "file archiver", 'winget': "7zip.7zip", 'choco': "7zip"},
+}
+
+
+@unittest.skipIf(QApplication is None, "PyQt5 is not installed")
+class ProgramListModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from IconLoader import IconLoader
+        from ProgramManager import ProgramManager
+        cls.app = QApplication.instance() or QApplication([])
+        cls._tmp = tempfile.TemporaryDirectory()
+        catalog_path = os.path.join(cls._tmp.name, 'applications.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(CATALOG, f)
+        cls.program_manager = ProgramManager(catalog_path)
+        cls.icon_loader = IconLoader()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        from ProgramListModel import ProgramListModel, ProgramFilterProxyModel
+        self.model = ProgramListModel(self.program_manager, self.icon_loader,
+                                      self.program_manager.available_programs)
+        self.proxy = ProgramFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+
+    def shown(self):
+        return [self.proxy.index(row, 0).data() for row in range(self.proxy.rowCount())]
+
+    def test_model_rows(self):
+        self.assertEqual(self.model.programs(), ["Git", "VLC", "GIMP", "7-Zip"])
+        self.model.set_note("VLC", "already installed")
+        self.assertEqual(self.model.index(1).data(Qt.DisplayRole), "VLC (already installed)")
+
+    def test_remove_and_add(self):
+        self.model.remove_programs(["VLC", "7-Zip", "Unknown"])
+        self.assertEqual(self.model.programs(), ["Git", "GIMP"])
+        self.model.add_programs(["VLC"])
+        self.assertEqual(self.model.programs(), ["Git", "GIMP", "VLC"])
+        self.model.remove_rows([0, 2])
+        self.assertEqual(self.model.programs(), ["GIMP"])
+
+    def test_matches_in_rank_order(self):
+        self.proxy.set_matches(["GIMP", "Git"])
+        self.assertEqual(self.shown(), ["GIMP", "Git"])
+        self.proxy.set_matches(None)
+        self.assertEqual(self.shown(), ["Git", "VLC", "GIMP", "7-Zip"])
+
+    def test_searches_that_do_not_overlap(self):
+        # Each search ranks only its own names; sorting the previous
+        # search's rows against them used to abort the application
+        for matches in (["VLC", "Git"], ["7-Zip", "GIMP"], None, ["GIMP"], ["Git", "VLC", "7-Zip"]):
+            self.proxy.set_matches(matches)
+            self.assertEqual(self.shown(), matches or ["Git", "VLC", "GIMP", "7-Zip"])
+
+    def test_search_results_from_the_catalog(self):
+        self.proxy.set_matches(self.program_manager.search_programs("git"))
+        self.assertEqual(self.shown()[0], "Git")
+        self.proxy.set_matches(self.program_manager.search_programs("no such program"))
+        self.assertEqual(self.shown(), [])
+
+    def test_rows_added_while_filtered(self):
+        self.model.remove_programs(["GIMP"])
+        self.proxy.set_matches(["GIMP", "Git"])
+        self.model.add_programs(["GIMP"])
+        self.assertEqual(self.shown(), ["GIMP", "Git"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+ProgressParser against the recorded winget/choco transcripts and hand-made output.
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPTS = os.path.join(ROOT, 'benchmarks', 'transcripts')
+sys.path.insert(0, ROOT)
+
+from ProgressParser import ProgressParser, parse_segment
+
+
+def read_transcript(name):
+    with open(os.path.join(TRANSCRIPTS, name), 'rb') as f:
+        return f.read()
+
+
+class ParseSegmentTest(unittest.TestCase):
+
+    def test_percentage(self):
+        event = parse_segment("Progress: Downloading git.install 2.43.0... 40%")
+        self.assertAlmostEqual(event.fraction, 0.4)
+        self.assertIsNone(event.bytes_total)
+
+    def test_byte_counts_win_over_percentages(self):
+        event = parse_segment("12.0 MB / 48.0 MB  99%")
+        self.assertAlmostEqual(event.fraction, 0.25)
+        self.assertEqual(event.bytes_done, 12 * 1024 ** 2)
+        self.assertEqual(event.bytes_total, 48 * 1024 ** 2)
+
+    def test_choco_saving_line(self):
+        event = parse_segment("Saving 600 KB of 58.39 MB")
+        self.assertEqual(event.bytes_done, 600 * 1024)
+
+    def test_fraction_is_capped(self):
+        self.assertEqual(parse_segment("150%").fraction, 1.0)
+
+    def test_no_progress(self):
+        self.assertIsNone(parse_segment("Successfully installed"))
+
+
+class ProgressParserTest(unittest.TestCase):
+
+    def test_carriage_returns_split_segments(self):
+        parser = ProgressParser()
+        segments = parser.feed(b"Downloading 10%\rDownloading 20%\rDownloading 30%\r")
+        self.assertEqual(segments, ["Downloading 10%", "Downloading 20%", "Downloading 30%"])
+        # Only the newest reading of a chunk is handed out, and only once
+        self.assertAlmostEqual(parser.take_event().fraction, 0.3)
+        self.assertIsNone(parser.take_event())
+
+    def test_segment_split_across_chunks(self):
+        parser = ProgressParser()
+        self.assertEqual(parser.feed(b"  12.0 MB / 4"), [])
+        self.assertIsNone(parser.take_event())
+        self.assertEqual(parser.feed(b"8.0 MB\r"), ["12.0 MB / 48.0 MB"])
+        self.assertAlmostEqual(parser.take_event().fraction, 0.25)
+
+    def test_multibyte_character_split_across_chunks(self):
+        parser = ProgressParser()
+        bar = "\u2588\u2592 50%\n".encode('utf-8')
+        parser.feed(bar[:2])
+        self.assertEqual(parser.feed(bar[2:]), ["\u2588\u2592 50%"])
+
+    def test_finish_flushes_the_last_segment(self):
+        parser = ProgressParser()
+        parser.feed(b"Successfully installed")
+        self.assertEqual(parser.finish(), ["Successfully installed"])
+        self.assertEqual(parser.finish(), [])
+
+    def test_transcripts_end_complete(self):
+        for name in sorted(os.listdir(TRANSCRIPTS)):
+            with self.subTest(transcript=name):
+                data = read_transcript(name)
+                parser = ProgressParser()
+                fractions = []
+                for start in range(0, len(data), 4096):
+                    parser.feed(data[start:start + 4096])
+                    event = parser.take_event()
+                    if event:
+                        fractions.append(event.fraction)
+                parser.finish()
+                self.assertTrue(fractions)
+                self.assertAlmostEqual(parser.last_event.fraction, 1.0, places=2)
+
+    def test_chunking_does_not_change_the_segments(self):
+        data = read_transcript('winget_install_git.txt')
+        whole = ProgressParser()
+        expected = whole.feed(data) + whole.finish()
+        for size in (1, 7, 4096):
+            with self.subTest(chunk_size=size):
+                parser = ProgressParser()
+                segments = []
+                for start in range(0, len(data), size):
+                    segments += parser.feed(data[start:start + size])
+                self.assertEqual(segments + parser.finish(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
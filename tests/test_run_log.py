@@ -0,0 +1,91 @@
+"""
+RunLog and its report: round trips, torn lines and per-program summaries.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from RunLog import RunLog, PackageResult, format_report, result_status, summarize, ERROR_EXIT_CODE
+
+
+class ResultStatusTest(unittest.TestCase):
+
+    def test_statuses(self):
+        self.assertEqual(result_status("Successfully installed Git"), 'installed')
+        self.assertEqual(result_status("Skipped Git: already installed"), 'skipped')
+        self.assertEqual(result_status("Cancelled Git"), 'cancelled')
+        self.assertEqual(result_status("No installation command found for Git"), 'unavailable')
+        self.assertEqual(result_status("Failed to install Git: exit code 1"), 'failed')
+
+
+class RunLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log = RunLog(os.path.join(self._tmp.name, 'logs', 'runs.jsonl'))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_empty_log(self):
+        self.assertEqual(self.log.read(), [])
+
+    def test_round_trip(self):
+        result = PackageResult("Git", "Failed to install Git", 'git', 'winget', 'Git.Git', exit_code=1603,
+                               error_class=ERROR_EXIT_CODE, queue_seconds=0.5, download_seconds=2.0,
+                               install_seconds=3.25, bytes_transferred=1000)
+        run_id = self.log.append([result])
+        read, = self.log.read()
+        self.assertEqual(read.run, run_id)
+        self.assertEqual(read.to_dict(), result.to_dict())
+        self.assertEqual(read.status, 'failed')
+        self.assertEqual(read.total_seconds, 5.75)
+
+    def test_last_runs(self):
+        first = self.log.append([PackageResult("Git", "Successfully installed Git")])
+        second = self.log.append([PackageResult("VLC", "Successfully installed VLC"),
+                                  PackageResult("Git", "Skipped Git: already installed")])
+        self.assertEqual(len(self.log.read()), 3)
+        self.assertEqual({result.run for result in self.log.read(last_runs=1)}, {second})
+        self.assertEqual({result.run for result in self.log.read(last_runs=5)}, {first, second})
+
+    def test_torn_line(self):
+        self.log.append([PackageResult("Git", "Successfully installed Git")])
+        with open(self.log.path, 'a', encoding='utf-8') as f:
+            f.write('{"program": "VL')
+        self.log.append([PackageResult("VLC", "Successfully installed VLC")])
+        self.assertEqual([result.program for result in self.log.read()], ["Git", "VLC"])
+
+
+class SummarizeTest(unittest.TestCase):
+
+    def test_summary(self):
+        results = [
+            PackageResult("Git", "Successfully installed Git", download_seconds=2.0, install_seconds=1.0,
+                          bytes_transferred=100),
+            PackageResult("Git", "Failed to install Git", error_class=ERROR_EXIT_CODE, download_seconds=4.0,
+                          install_seconds=1.0),
+            # Skipped runs do not pull the mean stage times down
+            PackageResult("Git", "Skipped Git: already installed"),
+            PackageResult("VLC", "Successfully installed VLC", download_seconds=10.0),
+        ]
+        vlc, git = summarize(results)
+        self.assertEqual(vlc['program'], "VLC")
+        self.assertEqual((git['runs'], git['installed'], git['failed'], git['skipped']), (3, 1, 1, 1))
+        self.assertEqual(git['download_seconds'], 3.0)
+        self.assertEqual(git['install_seconds'], 1.0)
+        self.assertEqual(git['bytes_transferred'], 100)
+        self.assertEqual(git['last_error'], ERROR_EXIT_CODE)
+
+        report = format_report(results)
+        self.assertIn("4 package results from 1 runs", report)
+        self.assertIn("download 16.0 s", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+ShellPool: marker framing of command output, timeouts and restarting
+sessions, on POSIX sh.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ShellPool import MARKER, READ_SIZE, ShDialect, ShellPool, ShellSession, ShellSessionError
+
+
+def python_command(code):
+    return [sys.executable, '-c', code]
+
+
+@unittest.skipIf(os.name == 'nt', "runs commands in sh")
+class ShellSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = ShellSession(ShDialect)
+        self.session.start()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_output_and_exit_code(self):
+        result = self.session.run(python_command("import sys; print('hello world'); sys.exit(3)"))
+        self.assertEqual(result.stdout, b"hello world\n")
+        self.assertEqual(result.returncode, 3)
+
+    def test_arguments_are_quoted(self):
+        result = self.session.run(['printf', '%s|', "it's", "a b", "$HOME", ";", "*"])
+        self.assertEqual(result.stdout, b"it's|a b|$HOME|;|*|")
+
+    def test_commands_in_a_row(self):
+        for i in range(5):
+            self.assertEqual(self.session.run(['echo', str(i)]).stdout, f"{i}\n".encode())
+
+    def test_stderr(self):
+        result = self.session.run(python_command("import sys; sys.stderr.write('oops')"))
+        self.assertEqual(result.stdout, b"")
+        self.assertEqual(result.stderr, "oops")
+
+    def test_output_without_newline_and_marker_lookalikes(self):
+        # Output ending mid-line, and a marker with the wrong token, are the command's own
+        code = f"import sys; sys.stdout.write({(MARKER + b'not-ours 0').decode()!r} + chr(10) + 'tail')"
+        result = self.session.run(python_command(code))
+        self.assertEqual(result.stdout, MARKER + b"not-ours 0\ntail")
+        self.assertEqual(result.returncode, 0)
+
+    def test_large_output_in_chunks(self):
+        chunks = []
+        size = READ_SIZE * 3 + 17
+        result = self.session.run(python_command(f"import sys; sys.stdout.write('x' * {size})"), chunks.append)
+        self.assertEqual(len(result.stdout), size)
+        self.assertEqual(b''.join(chunks), result.stdout)
+        self.assertNotIn(MARKER, result.stdout)
+
+    def test_timeout_kills_the_session(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.session.run(python_command("import time; time.sleep(30)"), timeout=0.5)
+        self.assertFalse(self.session.alive)
+        with self.assertRaises(ShellSessionError):
+            self.session.run(['echo', 'hi'])
+
+    def test_close_removes_the_stderr_file(self):
+        stderr_path = self.session.stderr_path
+        self.session.close()
+        self.assertFalse(os.path.exists(stderr_path))
+        self.assertFalse(self.session.alive)
+
+
+@unittest.skipIf(os.name == 'nt', "runs commands in sh")
+class ShellPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ShellPool(2, ShDialect)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_sessions_are_reused(self):
+        for _ in range(4):
+            self.assertEqual(self.pool.run(['echo', 'hi']).stdout, b"hi\n")
+        self.assertEqual(self.pool.started, 1)
+
+    def test_concurrent_callers(self):
+        results = []
+        barrier = threading.Barrier(4)
+
+        def run(i):
+            barrier.wait()
+            results.append(self.pool.run(python_command(f"import time; time.sleep(0.2); print({i})")).stdout)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), [b"0\n", b"1\n", b"2\n", b"3\n"])
+        self.assertLessEqual(self.pool.started, 2)
+
+    def test_timed_out_session_is_replaced(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.pool.run(python_command("import time; time.sleep(30)"), timeout=0.5)
+        self.assertEqual(self.pool.run(['echo', 'again']).stdout, b"again\n")
+        self.assertEqual(self.pool.started, 2)
+        self.assertEqual(len(self.pool._sessions), 1)
+
+    def test_session_that_died_while_idle_is_replaced(self):
+        session = self.pool.acquire()
+        self.pool.release(session)
+        session.kill()
+        session.process.wait()
+        self.assertEqual(self.pool.run(['echo', 'hi']).stdout, b"hi\n")
+        self.assertNotIn(session, self.pool._sessions)
+
+    def test_unstartable_shell_breaks_the_pool(self):
+        class MissingShell(ShDialect):
+            argv = ['/nonexistent/shell']
+
+        pool = ShellPool(1, MissingShell)
+        self.assertTrue(pool.supports(['echo']))
+        with self.assertRaises(OSError):
+            pool.run(['echo', 'hi'])
+        self.assertFalse(pool.supports(['echo']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+TweakEngine on the in-memory registry, and the PowerShell it compiles.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from TweakEngine import (TweakEngine, FakeRegistryBackend, compile_probe_script, compile_script,
+                         powershell_quote, registry_path)
+from Tweaks import TweakCatalog
+
+TWEAKS = {
+    'show_extensions': {
+        'content': "Show File Extensions", 'category': "Explorer", 'description': "",
+        'actions': [{'registry': "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\Advanced",
+                     'name': "HideFileExt", 'type': "DWORD", 'value': 0}],
+    },
+    'dark_mode': {
+        'content': "Dark Mode", 'category': "Appearance", 'description': "",
+        'actions': [
+            {'registry': "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize",
+             'name': "AppsUseLightTheme", 'type': "DWORD", 'value': 0},
+            {'registry': "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize",
+             'name': "SystemUsesLightTheme", 'type': "DWORD", 'value': 0},
+        ],
+    },
+    'disable_hibernation': {
+        'content': "Disable Hibernation", 'category': "Power", 'description': "",
+        'actions': [{'command': ["powercfg", "/hibernate", "off"]}],
+        'probe': "-not (Test-Path C:\\hiberfil.sys)",
+    },
+    'flush_dns': {
+        'content': "Flush DNS", 'category': "Network", 'description': "",
+        'actions': [{'command': ["ipconfig", "/flushdns"]}],
+    },
+    'broken': {
+        'content': "Broken", 'actions': [{'registry': "HKCU\\Software\\X", 'name': "Y", 'type': "Binary", 'value': 1}],
+    },
+}
+
+
+class TweakEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tweaks_path = os.path.join(self._tmp.name, 'tweaks.json')
+        with open(tweaks_path, 'w', encoding='utf-8') as f:
+            json.dump(TWEAKS, f)
+        with redirect_stdout(StringIO()) as self.output:
+            self.catalog = TweakCatalog(tweaks_path)
+        self.backend = FakeRegistryBackend()
+        self.engine = TweakEngine(self.catalog, self.backend)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_catalog(self):
+        self.assertNotIn('broken', self.catalog.tweaks)
+        self.assertIn("Skipping tweak broken", self.output.getvalue())
+        self.assertIn("Tweak flush_dns has no probe", self.output.getvalue())
+        self.assertEqual(self.catalog.resolve_tweak_id("Dark Mode"), 'dark_mode')
+        self.assertEqual(self.catalog.categories["Explorer"], ('show_extensions',))
+
+    def test_bundled_tweaks_all_load(self):
+        with open(os.path.join(ROOT, 'tweaks.json'), 'r', encoding='utf-8') as f:
+            bundled = json.load(f)
+        self.assertEqual(set(TweakCatalog(os.path.join(ROOT, 'tweaks.json')).tweaks), set(bundled))
+
+    def test_apply_once_in_one_session(self):
+        results = self.engine.apply(["show_extensions", "Dark Mode", "disable_hibernation"])
+        self.assertEqual(results, ["Applied Show File Extensions", "Applied Dark Mode", "Applied Disable Hibernation"])
+        self.assertEqual(self.backend.sessions, 1)
+        self.assertEqual(self.backend.get("HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize",
+                                          "SystemUsesLightTheme"), 0)
+        self.assertEqual(self.backend.commands, [["powercfg", "/hibernate", "off"]])
+
+    def test_tweaks_in_place_are_not_applied_again(self):
+        self.engine.apply(["show_extensions", "disable_hibernation"])
+        results = self.engine.apply(["show_extensions", "disable_hibernation"])
+        self.assertEqual(results, ["Already applied Show File Extensions", "Already applied Disable Hibernation"])
+        self.assertEqual(self.backend.sessions, 1)
+        self.assertEqual(self.engine.unchanged, 2)
+
+    def test_partly_applied_tweak_is_applied(self):
+        self.backend.values[self.backend.key(
+            "HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize", "AppsUseLightTheme")] = ('DWORD', 0)
+        self.assertEqual(self.engine.probe(["dark_mode"]), {'dark_mode': False})
+        self.assertEqual(self.engine.apply(["dark_mode"]), ["Applied Dark Mode"])
+        self.assertEqual(self.engine.probe(["dark_mode"]), {'dark_mode': True})
+
+    def test_tweak_without_probe_is_always_applied(self):
+        self.engine.apply(["flush_dns"])
+        self.assertEqual(self.engine.apply(["flush_dns"]), ["Applied Flush DNS"])
+        self.assertEqual(self.backend.sessions, 2)
+        self.assertIsNone(self.engine.probe(["flush_dns"])['flush_dns'])
+
+    def test_force(self):
+        self.engine.apply(["show_extensions"])
+        self.assertEqual(self.engine.apply(["show_extensions"], force=True), ["Applied Show File Extensions"])
+        self.assertEqual(self.backend.sessions, 2)
+
+    def test_failures_and_unknown_tweaks(self):
+        self.backend.failing.add('dark_mode')
+        results = self.engine.apply(["dark_mode", "show_extensions", "no_such_tweak"])
+        self.assertEqual(results, ["Failed to apply Dark Mode: Access is denied.",
+                                   "Applied Show File Extensions", "Unknown tweak no_such_tweak"])
+
+    def test_same_tweak_twice_is_applied_once(self):
+        results = self.engine.apply(["dark_mode", "Dark Mode"])
+        self.assertEqual(results, ["Applied Dark Mode", "Applied Dark Mode"])
+        self.assertEqual(self.backend.sessions, 1)
+
+    def test_nothing_to_do_starts_no_session(self):
+        self.assertEqual(self.engine.apply([]), [])
+        self.assertEqual(self.engine.apply(["no_such_tweak"]), ["Unknown tweak no_such_tweak"])
+        self.assertEqual((self.backend.sessions, self.backend.queries), (0, 0))
+
+
+class PowerShellScriptTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tweaks_path = os.path.join(self._tmp.name, 'tweaks.json')
+        with open(tweaks_path, 'w', encoding='utf-8') as f:
+            json.dump(TWEAKS, f)
+        with redirect_stdout(StringIO()):
+            self.catalog = TweakCatalog(tweaks_path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_quoting(self):
+        self.assertEqual(powershell_quote("it's"), "'it''s'")
+        self.assertEqual(registry_path("HKCU\\Software\\X"), "Registry::HKEY_CURRENT_USER\\Software\\X")
+        self.assertEqual(registry_path("hklm\\Software"), "Registry::HKEY_LOCAL_MACHINE\\Software")
+
+    def test_every_tweak_is_its_own_try(self):
+        tweaks = [self.catalog.get(tweak_id) for tweak_id in ('show_extensions', 'disable_hibernation')]
+        script = compile_script(tweaks, "C:\\Users\\O'Brien\\results.txt")
+        self.assertEqual(script.count("try {"), 2)
+        self.assertIn("-Name 'HideFileExt' -PropertyType DWord -Value 0", script)
+        self.assertIn("& 'powercfg' '/hibernate' 'off'", script)
+        self.assertIn("Set-Content -Path 'C:\\Users\\O''Brien\\results.txt'", script)
+
+    def test_probe_script_skips_unprobeable_tweaks(self):
+        script = compile_probe_script(list(self.catalog.tweaks.values()))
+        self.assertIn("$state['dark_mode']", script)
+        self.assertIn("[bool](-not (Test-Path C:\\hiberfil.sys))", script)
+        self.assertNotIn("flush_dns", script)
+
+
+if __name__ == '__main__':
+    unittest.main()